@@ -2078,41 +2078,118 @@ async function previewThesis() {
         
         // Get preview images from server
         try {
-            const imagesResponse = await axios.get(`${API_BASE_URL}/thesis/preview-images/${currentThesisId}`, {
+            const pagesResponse = await axios.get(`${API_BASE_URL}/thesis/${currentThesisId}/pages`, {
                 headers: { 'Authorization': `Bearer ${authToken}` }
             });
             
-            const images = imagesResponse.data.images;
+            const pages = pagesResponse.data.pages;
             
-            if (images && images.length > 0) {
-                // Display images
+            if (pages && pages.length > 0) {
+                // Page images are fetched as they scroll into view
                 const imageContainer = document.getElementById('imagePreviewContainer');
                 imageContainer.innerHTML = '';
                 
-                images.forEach((imageData, index) => {
+                // Thumbnails strip for navigation; thumbnails also stand in for pages until they load
+                const thumbnailStrip = document.createElement('div');
+                thumbnailStrip.className = 'flex gap-2 overflow-x-auto pb-2 mb-4 border-b border-gray-200';
+                imageContainer.appendChild(thumbnailStrip);
+                
+                const loadPageImage = async (img) => {
+                    if (img.dataset.loaded) return;
+                    img.dataset.loaded = 'true';
+                    try {
+                        const pageResponse = await fetch(`${API_BASE_URL}${img.dataset.url}`, {
+                            headers: { 'Authorization': `Bearer ${authToken}` }
+                        });
+                        if (!pageResponse.ok) {
+                            throw new Error(`Failed to fetch page: ${pageResponse.status}`);
+                        }
+                        img.src = window.URL.createObjectURL(await pageResponse.blob());
+                        img.style.filter = '';
+                        img.onload = () => window.URL.revokeObjectURL(img.src);
+                    } catch (pageError) {
+                        console.error('Failed to load preview page:', pageError);
+                        img.alt = `Page ${img.dataset.page} could not be loaded`;
+                    }
+                };
+                
+                const observer = new IntersectionObserver((entries) => {
+                    entries.forEach(entry => {
+                        if (entry.isIntersecting) {
+                            observer.unobserve(entry.target);
+                            loadPageImage(entry.target);
+                        }
+                    });
+                }, { rootMargin: '400px' });
+                
+                const pageImages = {};
+                pages.forEach(pageData => {
                     const imageDiv = document.createElement('div');
                     imageDiv.className = 'mb-4';
                     imageDiv.innerHTML = `
                         <div class="flex items-center justify-between mb-2">
-                            <h4 class="text-sm font-medium text-gray-700">Page ${imageData.page}</h4>
-                            <span class="text-xs text-gray-500">${imageData.width} × ${imageData.height}</span>
+                            <h4 class="text-sm font-medium text-gray-700">Page ${pageData.page}</h4>
+                            <span class="text-xs text-gray-500">${pageData.page} / ${pages.length}</span>
                         </div>
                         <div class="border border-gray-200 rounded-lg overflow-hidden">
-                            <img src="${imageData.image}" 
-                                 alt="Page ${imageData.page}" 
+                            <img data-url="${pageData.url}" 
+                                 data-page="${pageData.page}" 
+                                 alt="Page ${pageData.page}" 
                                  class="w-full h-auto max-h-96 object-contain"
-                                 style="max-width: 100%;">
+                                 style="max-width: 100%; min-height: 12rem;">
                         </div>
                     `;
                     imageContainer.appendChild(imageDiv);
+                    observer.observe(imageDiv.querySelector('img'));
+                    pageImages[pageData.page] = imageDiv.querySelector('img');
                 });
-                
+
+                // Thumbnails arrive in batches; each fills its strip slot and its page until the page loads
+                const loadThumbnails = async (firstPage) => {
+                    try {
+                        const thumbnailResponse = await axios.get(`${API_BASE_URL}${pagesResponse.data.thumbnails_url}`, {
+                            headers: { 'Authorization': `Bearer ${authToken}` },
+                            params: { first_page: firstPage }
+                        });
+                        thumbnailResponse.data.thumbnails.forEach(thumbnail => {
+                            const pageImage = pageImages[thumbnail.page];
+                            if (pageImage && !pageImage.dataset.loaded) {
+                                pageImage.src = thumbnail.image;
+                                pageImage.style.filter = 'blur(1px)';
+                            }
+                            const thumbnailImage = document.createElement('img');
+                            thumbnailImage.src = thumbnail.image;
+                            thumbnailImage.alt = `Page ${thumbnail.page}`;
+                            thumbnailImage.title = `Page ${thumbnail.page}`;
+                            thumbnailImage.className = 'h-24 w-auto border border-gray-200 rounded cursor-pointer hover:border-blue-500';
+                            thumbnailImage.addEventListener('click', () => {
+                                pageImage.scrollIntoView({ behavior: 'smooth', block: 'start' });
+                                loadPageImage(pageImage);
+                            });
+                            thumbnailStrip.appendChild(thumbnailImage);
+                        });
+                        if (thumbnailResponse.data.next_page) {
+                            await loadThumbnails(thumbnailResponse.data.next_page);
+                        }
+                    } catch (thumbnailError) {
+                        console.error('Failed to load thumbnails:', thumbnailError);
+                    }
+                };
+                if (pagesResponse.data.thumbnails_url) {
+                    loadThumbnails(1);
+                }
+
                 document.getElementById('imagePreview').classList.remove('hidden');
                 document.getElementById('previewLoading').classList.add('hidden');
                 
-                // Store text content if available (for DOC/DOCX)
-                if (images[0].text_content) {
-                    window.currentPreviewText = images[0].text_content;
+                // Keep the text of DOC/DOCX files for copying and saving
+                window.currentPreviewText = null;
+                if (['doc', 'docx'].includes(thesis.filename.split('.').pop().toLowerCase())) {
+                    axios.get(`${API_BASE_URL}/thesis/extract-text/${currentThesisId}`, {
+                        headers: { 'Authorization': `Bearer ${authToken}` }
+                    }).then(textResponse => {
+                        window.currentPreviewText = textResponse.data.text;
+                    }).catch(textError => console.error('Failed to load preview text:', textError));
                 }
                 
             } else {
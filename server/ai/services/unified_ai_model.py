@@ -10,11 +10,27 @@ import aiohttp
 import requests
 from typing import List, Optional, AsyncGenerator, Dict, Any
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 
 from config.config import config
-from file_processing.text_extractor import extract_text_from_file
+from file_processing.blob_store import blob_store
+from file_processing.document_structure import sections_excerpt
 from ai.providers.ai_provider import AIProvider
 
+# Section titles (regular expressions, English and Finnish) each grader reads;
+# None gives the outline and the start of the thesis
+GRADING_SECTIONS = {
+    'formatting_style': None,
+    'purpose_objectives': r'introduction|johdanto|purpose|objective|aim|tarkoitus|tavoit',
+    'theoretical_foundation': r'theor|literature|background|framework|concept|teoria|viitekehys|käsitte',
+    'professional_connection': r'introduction|johdanto|commission|company|organi[sz]ation|working life|toimeksian|yritys|työelämä',
+    'development_task': r'development|task|implementation|kehittämis|toteutus|tehtävä',
+    'conclusions_proposals': r'conclusion|discussion|summary|proposal|recommendation|johtopäätö|pohdinta|yhteenveto|ehdotu',
+    'material_methodology': r'method|material|data|research design|menetelm|aineisto',
+    'treatment_analysis': r'analys|result|findings|analyysi|tulokset',
+    'results_product': r'result|product|outcome|evaluation|tulokset|tuotos|arviointi',
+}
+
 class UnifiedAIModel:
     """Unified interface for different AI providers"""
     
@@ -160,6 +176,15 @@ class UnifiedAIModel:
             print(f"❌ Error with {provider}: {str(e)}")
             yield f"data: {json.dumps({'type': 'error', 'content': f'Error with {provider}: {str(e)}'})}\n\n"
 
+    async def thesis_excerpt(self, file_path: str, section_pattern: Optional[str], max_chars: int) -> str:
+        """The thesis outline and the sections a prompt is about, or the start of the thesis"""
+        try:
+            structure = await run_in_threadpool(blob_store.document_structure, file_path)
+        except Exception as e:
+            print(f"⚠️ Document structure not available, using the start of the text: {str(e)}")
+            return await run_in_threadpool(blob_store.extract_text, file_path, max_chars)
+        return sections_excerpt(structure, section_pattern, max_chars)
+
     async def analyze_thesis_stream(self, file_path: str, custom_instructions: str, 
                                   predefined_questions: List[str], provider: AIProvider = None, 
                                   model: Optional[str] = None) -> AsyncGenerator[str, None]:
@@ -169,7 +194,7 @@ class UnifiedAIModel:
         
         try:
             # Extract text from file
-            text_content = extract_text_from_file(file_path)
+            text_content = await run_in_threadpool(blob_store.extract_text, file_path, 8000)
             
             # Prepare the analysis prompt
             analysis_prompt = f"""
@@ -213,7 +238,7 @@ Format your response in a clear, structured manner with sections and bullet poin
             provider = AIProvider(config.get_active_provider())
         
         try:
-            text_content = extract_text_from_file(file_path)
+            text_content = await self.thesis_excerpt(file_path, GRADING_SECTIONS['formatting_style'], 6000)
             
             grading_prompt = f"""
 You are an expert thesis evaluator. Please grade the FORMATTING AND STYLE aspects of this thesis.
@@ -257,7 +282,7 @@ Format your response with clear sections and bullet points.
             provider = AIProvider(config.get_active_provider())
         
         try:
-            text_content = extract_text_from_file(file_path)
+            text_content = await self.thesis_excerpt(file_path, GRADING_SECTIONS['purpose_objectives'], 6000)
             
             grading_prompt = f"""
 You are an expert thesis evaluator. Please grade the PURPOSE AND OBJECTIVES aspects of this thesis.
@@ -302,7 +327,7 @@ Format your response with clear sections and bullet points.
             provider = AIProvider(config.get_active_provider())
         
         try:
-            text_content = extract_text_from_file(file_path)
+            text_content = await self.thesis_excerpt(file_path, GRADING_SECTIONS['theoretical_foundation'], 6000)
             
             grading_prompt = f"""
 You are an expert thesis evaluator. Please grade the THEORETICAL FOUNDATION aspects of this thesis.
@@ -347,7 +372,7 @@ Format your response with clear sections and bullet points.
             provider = AIProvider(config.get_active_provider())
         
         try:
-            text_content = extract_text_from_file(file_path)
+            text_content = await self.thesis_excerpt(file_path, GRADING_SECTIONS['professional_connection'], 6000)
             
             grading_prompt = f"""
 You are an expert thesis evaluator. Please grade the PROFESSIONAL CONNECTION aspects of this thesis.
@@ -392,7 +417,7 @@ Format your response with clear sections and bullet points.
             provider = AIProvider(config.get_active_provider())
         
         try:
-            text_content = extract_text_from_file(file_path)
+            text_content = await self.thesis_excerpt(file_path, GRADING_SECTIONS['development_task'], 6000)
             
             grading_prompt = f"""
 You are an expert thesis evaluator. Please grade the DEVELOPMENT/RESEARCH TASK aspects of this thesis.
@@ -437,7 +462,7 @@ Format your response with clear sections and bullet points.
             provider = AIProvider(config.get_active_provider())
         
         try:
-            text_content = extract_text_from_file(file_path)
+            text_content = await self.thesis_excerpt(file_path, GRADING_SECTIONS['conclusions_proposals'], 6000)
             
             grading_prompt = f"""
 You are an expert thesis evaluator. Please grade the CONCLUSIONS AND DEVELOPMENT PROPOSALS aspects of this thesis.
@@ -482,7 +507,7 @@ Format your response with clear sections and bullet points.
             provider = AIProvider(config.get_active_provider())
         
         try:
-            text_content = extract_text_from_file(file_path)
+            text_content = await self.thesis_excerpt(file_path, GRADING_SECTIONS['material_methodology'], 6000)
             
             grading_prompt = f"""
 You are an expert thesis evaluator. Please grade the MATERIAL AND METHODOLOGICAL CHOICES aspects of this thesis.
@@ -527,7 +552,7 @@ Format your response with clear sections and bullet points.
             provider = AIProvider(config.get_active_provider())
         
         try:
-            text_content = extract_text_from_file(file_path)
+            text_content = await self.thesis_excerpt(file_path, GRADING_SECTIONS['treatment_analysis'], 6000)
             
             grading_prompt = f"""
 You are an expert thesis evaluator. Please grade the TREATMENT AND ANALYSIS OF MATERIAL aspects of this thesis.
@@ -572,7 +597,7 @@ Format your response with clear sections and bullet points.
             provider = AIProvider(config.get_active_provider())
         
         try:
-            text_content = extract_text_from_file(file_path)
+            text_content = await self.thesis_excerpt(file_path, GRADING_SECTIONS['results_product'], 6000)
             
             grading_prompt = f"""
 You are an expert thesis evaluator. Please grade the RESULTS AND PRODUCT aspects of this thesis.
@@ -0,0 +1,166 @@
+"""
+Cacheable file responses for ThesisAI Tool.
+
+Thesis files never change once uploaded, so a download can be answered with
+304 Not Modified when the client already has the file, and with 206 Partial
+Content when it only asks for a byte range. Range and If-Range are evaluated
+here rather than left to FileResponse, whose support depends on the
+Starlette version. Files in the blob store get a strong ETag from their
+content hash, which stays valid across workers and re-uploads of the same
+file.
+"""
+
+import mimetypes
+import os
+import re
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Optional, Tuple
+
+import aiofiles
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+# Explicit so the answer does not depend on the host's mime.types
+THESIS_MEDIA_TYPES = {
+    '.pdf': 'application/pdf',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.doc': 'application/msword',
+    '.txt': 'text/plain',
+}
+
+BYTE_RANGE_PATTERN = re.compile(r'^bytes=\s*(\d*)\s*-\s*(\d*)\s*$')
+
+# Authenticated content: browsers may keep it but must revalidate each time
+CACHE_CONTROL = 'private, no-cache'
+
+# Rendered from content that never changes, so browsers may reuse it for a day
+PREVIEW_CACHE_CONTROL = 'private, max-age=86400'
+
+def media_type_for(filename: str) -> str:
+    """MIME type of a thesis file from its name"""
+    ext = os.path.splitext(filename)[1].lower()
+    return THESIS_MEDIA_TYPES.get(ext) or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def is_not_modified(request: Request, etag: str, mtime: float) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when there is none"""
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def parse_byte_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """First and last byte of a single-range Range header, or None to send the whole file
+
+    Malformed and multi-range headers are ignored, as RFC 9110 allows.
+    Raises ValueError when the range lies entirely past the end of the file.
+    """
+    match = BYTE_RANGE_PATTERN.match(range_header)
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0:
+            raise ValueError("empty suffix range")
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("range starts past the end of the file")
+    return start, min(int(last), size - 1) if last else size - 1
+
+def if_range_matches(if_range: str, etag: str, mtime: float) -> bool:
+    """Whether an If-Range header still names this file: a strong ETag or its exact date"""
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag and not etag.startswith('W/')
+    try:
+        return int(mtime) == parsedate_to_datetime(if_range).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+async def read_file_range(path: str, start: int, end: int, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """Stream bytes start..end of a file"""
+    async with aiofiles.open(path, 'rb') as f:
+        await f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+async def file_download_response(request: Request, path: str, filename: str,
+                                 content_hash: Optional[str] = None, inline: bool = False) -> Response:
+    """Serve a file with validators, answering conditional and range requests"""
+    stat_result = await run_in_threadpool(os.stat, path)
+    headers = {'cache-control': CACHE_CONTROL, 'accept-ranges': 'bytes'}
+    if content_hash:
+        headers['etag'] = f'"{content_hash}"'
+    # Without a content hash FileResponse derives the ETag from mtime and size
+    response = FileResponse(
+        path=path,
+        filename=filename,
+        media_type=media_type_for(filename),
+        headers=headers,
+        stat_result=stat_result,
+        content_disposition_type='inline' if inline else 'attachment',
+    )
+
+    if is_not_modified(request, response.headers['etag'], stat_result.st_mtime):
+        return Response(status_code=304, headers={
+            name: response.headers[name] for name in ('etag', 'last-modified', 'cache-control')
+        })
+
+    range_header = request.headers.get('range')
+    if range_header is None:
+        return response
+    size = stat_result.st_size
+    if_range = request.headers.get('if-range')
+    if if_range is not None and not if_range_matches(if_range, response.headers['etag'], stat_result.st_mtime):
+        # The client's copy is stale, so it gets the whole current file
+        byte_range = None
+    else:
+        try:
+            byte_range = parse_byte_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={'content-range': f'bytes */{size}',
+                                                      'cache-control': CACHE_CONTROL})
+
+    headers = {name: response.headers[name] for name in
+               ('etag', 'last-modified', 'cache-control', 'accept-ranges', 'content-disposition')}
+    start, end = byte_range or (0, size - 1)
+    headers['content-length'] = str(end - start + 1)
+    if byte_range:
+        headers['content-range'] = f'bytes {start}-{end}/{size}'
+    return StreamingResponse(read_file_range(path, start, end), status_code=206 if byte_range else 200,
+                             headers=headers, media_type=response.media_type)
+
+def not_modified_response(request: Request, etag: Optional[str], cache_control: str) -> Optional[Response]:
+    """304 response when the client already has the representation with this ETag, else None"""
+    if_none_match = request.headers.get('if-none-match')
+    if etag and if_none_match is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={'etag': etag, 'cache-control': cache_control})
+    return None
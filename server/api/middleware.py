@@ -0,0 +1,81 @@
+"""
+ASGI middleware for ThesisAI Tool.
+
+FastAPI parses a multipart body into a spooled temporary file before the
+route (or its auth dependency) runs, so a size check in the route alone
+still lets an oversized upload be received in full. This middleware
+rejects such requests as the body arrives instead.
+"""
+
+import json
+from typing import Iterable
+
+from fastapi import HTTPException
+
+class BodyTooLargeError(HTTPException):
+    """Raised from receive() once a request body passes the limit"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(status_code=413, detail=f"Request body exceeds the limit of {max_bytes} bytes")
+
+class UploadSizeLimitMiddleware:
+    """Reject request bodies larger than max_bytes on the given paths and the paths below them with 413"""
+
+    def __init__(self, app, max_bytes: int, paths: Iterable[str]):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = tuple(paths)
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or not self.max_bytes
+                or not any(scope["path"] == path or scope["path"].startswith(path + "/") for path in self.paths)):
+            await self.app(scope, receive, send)
+            return
+
+        # Refuse a declared oversized body without reading any of it
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    declared = 0
+                if declared > self.max_bytes:
+                    await self._reject(send)
+                    return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # An HTTPException survives FastAPI's body parsing and becomes the 413
+                    raise BodyTooLargeError(self.max_bytes)
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except BodyTooLargeError:
+            if response_started:
+                raise
+            await self._reject(send)
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": BodyTooLargeError(self.max_bytes).detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"connection", b"close")],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -5,14 +5,15 @@ This module contains all AI-related API endpoints.
 """
 
 import json
-import os
 from typing import List, Optional
 from fastapi import APIRouter, Depends, Form, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 
 from auth.auth_service import get_current_active_user
 from core.models import User
-from database.database import thesis_repo, feedback_repo
+from database.async_database import thesis_repo, feedback_repo
+from file_processing.blob_store import blob_store
 from ai.services.unified_ai_model import UnifiedAIModel
 from ai.providers.ai_provider import AIProvider
 
@@ -30,7 +31,7 @@ async def request_ai_feedback(
     current_user: User = Depends(get_current_active_user)
 ):
     """Request AI feedback for a thesis"""
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
@@ -38,7 +39,7 @@ async def request_ai_feedback(
     if current_user.role == "student" and thesis['student_id'] != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    if not os.path.exists(thesis['filepath']):
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
         raise HTTPException(status_code=404, detail="File not found")
     
     async def stream_feedback():
@@ -73,7 +74,7 @@ async def request_ai_feedback_enhanced(
     current_user: User = Depends(get_current_active_user)
 ):
     """Request enhanced AI feedback with provider selection"""
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
@@ -81,7 +82,7 @@ async def request_ai_feedback_enhanced(
     if current_user.role == "student" and thesis['student_id'] != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    if not os.path.exists(thesis['filepath']):
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
         raise HTTPException(status_code=404, detail="File not found")
     
     async def stream_feedback():
@@ -115,11 +116,11 @@ async def grade_formatting_style(
     current_user: User = Depends(get_current_active_user)
 ):
     """Grade formatting and style aspects"""
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
-    if not os.path.exists(thesis['filepath']):
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
         raise HTTPException(status_code=404, detail="File not found")
     
     async def stream_grading():
@@ -149,11 +150,11 @@ async def grade_purpose_objectives(
     current_user: User = Depends(get_current_active_user)
 ):
     """Grade purpose and objectives"""
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
-    if not os.path.exists(thesis['filepath']):
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
         raise HTTPException(status_code=404, detail="File not found")
     
     async def stream_grading():
@@ -183,11 +184,11 @@ async def grade_theoretical_foundation(
     current_user: User = Depends(get_current_active_user)
 ):
     """Grade theoretical foundation"""
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
-    if not os.path.exists(thesis['filepath']):
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
         raise HTTPException(status_code=404, detail="File not found")
     
     async def stream_grading():
@@ -217,11 +218,11 @@ async def grade_professional_connection(
     current_user: User = Depends(get_current_active_user)
 ):
     """Grade professional connection"""
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
-    if not os.path.exists(thesis['filepath']):
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
         raise HTTPException(status_code=404, detail="File not found")
     
     async def stream_grading():
@@ -251,11 +252,11 @@ async def grade_development_task(
     current_user: User = Depends(get_current_active_user)
 ):
     """Grade development task"""
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
-    if not os.path.exists(thesis['filepath']):
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
         raise HTTPException(status_code=404, detail="File not found")
     
     async def stream_grading():
@@ -285,11 +286,11 @@ async def grade_conclusions_proposals(
     current_user: User = Depends(get_current_active_user)
 ):
     """Grade conclusions and proposals"""
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
-    if not os.path.exists(thesis['filepath']):
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
         raise HTTPException(status_code=404, detail="File not found")
     
     async def stream_grading():
@@ -319,11 +320,11 @@ async def grade_material_methodology(
     current_user: User = Depends(get_current_active_user)
 ):
     """Grade material and methodology"""
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
-    if not os.path.exists(thesis['filepath']):
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
         raise HTTPException(status_code=404, detail="File not found")
     
     async def stream_grading():
@@ -353,11 +354,11 @@ async def grade_treatment_analysis(
     current_user: User = Depends(get_current_active_user)
 ):
     """Grade treatment and analysis"""
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
-    if not os.path.exists(thesis['filepath']):
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
         raise HTTPException(status_code=404, detail="File not found")
     
     async def stream_grading():
@@ -387,11 +388,11 @@ async def grade_results_product(
     current_user: User = Depends(get_current_active_user)
 ):
     """Grade results and product"""
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
-    if not os.path.exists(thesis['filepath']):
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
         raise HTTPException(status_code=404, detail="File not found")
     
     async def stream_grading():
@@ -420,7 +421,7 @@ async def save_ai_feedback(
     current_user: User = Depends(get_current_active_user)
 ):
     """Save AI feedback to database"""
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
@@ -436,10 +437,10 @@ async def save_ai_feedback(
         "is_ai_feedback": True
     }
     
-    feedback = feedback_repo.create_feedback(feedback_data)
+    feedback = await feedback_repo.create_feedback(feedback_data)
     
     # Update thesis status
-    thesis_repo.update_thesis_status(thesis_id, "reviewed_by_ai", feedback['id'])
+    await thesis_repo.update_thesis_status(thesis_id, "reviewed_by_ai", feedback['id'])
     
     return {
         "message": "AI feedback saved successfully",
@@ -13,17 +13,18 @@ from auth.auth_service import (
     create_access_token,
     get_current_active_user,
     get_password_hash,
+    run_in_password_executor,
     check_admin
 )
 from core.models import User
-from database.database import user_repo
+from database.async_database import user_repo
 
 router = APIRouter()
 
 @router.post("/token")
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """Login endpoint to get access token"""
-    user = authenticate_user(form_data.username, form_data.password)
+    user = await authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -57,12 +58,12 @@ async def register(
 ):
     """Register a new user"""
     # Check if user already exists
-    existing_user = user_repo.get_user_by_username(username)
+    existing_user = await user_repo.get_user_by_username(username)
     if existing_user:
         raise HTTPException(status_code=400, detail="Username already registered")
     
     # Check if email already exists
-    existing_email = user_repo.get_user_by_email(email)
+    existing_email = await user_repo.get_user_by_email(email)
     if existing_email:
         raise HTTPException(status_code=400, detail="Email already registered")
     
@@ -71,7 +72,7 @@ async def register(
         raise HTTPException(status_code=400, detail="Invalid role")
     
     # Create new user
-    hashed_password = get_password_hash(password)
+    hashed_password = await run_in_password_executor(get_password_hash, password)
     user_data = {
         "username": username,
         "email": email,
@@ -82,7 +83,7 @@ async def register(
         "assigned_students": []
     }
     
-    user_id = user_repo.create_user(user_data)
+    user_id = await user_repo.create_user(user_data)
     
     return {
         "message": "User registered successfully",
@@ -5,92 +5,210 @@ This module contains all thesis-related API endpoints.
 """
 
 import os
-import uuid
 from datetime import datetime
-from typing import List
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Form
-from fastapi.responses import FileResponse
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, File, UploadFile, HTTPException, Form, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import RedirectResponse, Response
 
+from config.config import config
+from api.file_responses import PREVIEW_CACHE_CONTROL, file_download_response, not_modified_response
 from auth.auth_service import get_current_active_user, check_student, check_supervisor
 from core.models import User, Thesis
-from database.database import thesis_repo, user_repo
-from file_processing.text_extractor import extract_text_from_file
-from file_processing.image_converter import convert_document_to_images
+from database.async_database import thesis_repo, search_repo, run_in_db_executor
+from file_processing.image_converter import preview_image_entry, render_error_preview
+from file_processing.blob_store import blob_store
+from file_processing.document_structure import section_text
+from file_processing.preview_cache import preview_cache
+from file_processing.resumable_uploads import resumable_uploads
+from file_processing.upload_storage import UploadTooLargeError
 
 router = APIRouter()
 
-@router.post("/upload")
-async def upload_thesis(
-    file: UploadFile = File(...),
-    current_user: User = Depends(get_current_active_user)
-):
-    """Upload a thesis file"""
-    check_student(current_user)
-    
-    # Validate file type
+# Pages per thumbnail strip request
+THUMBNAIL_BATCH_PAGES = 100
+
+async def index_thesis_text(thesis_id: str, file_path: str):
+    """Extract a thesis's text and add it to the search index"""
+    try:
+        text = await run_in_threadpool(blob_store.extract_text, file_path)
+        await thesis_repo.index_thesis_text(thesis_id, text)
+    except Exception as e:
+        print(f"Error indexing thesis text for {thesis_id}: {str(e)}")
+
+async def prune_blobs():
+    """Remove stored files no thesis references any more"""
+    try:
+        await run_in_db_executor(blob_store.prune, thesis_repo.sync)
+    except Exception as e:
+        print(f"Error pruning unreferenced blobs: {str(e)}")
+
+def check_upload_extension(filename: str) -> str:
+    """Return the lower-case extension of an upload, rejecting unsupported formats"""
     allowed_extensions = ['.pdf', '.docx', '.doc', '.txt']
-    file_ext = os.path.splitext(file.filename)[1].lower()
+    file_ext = os.path.splitext(filename)[1].lower()
     if file_ext not in allowed_extensions:
         raise HTTPException(status_code=400, detail="Unsupported file format")
-    
-    # Create upload directory if it doesn't exist
-    upload_dir = "thesis_uploads"
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    # Generate unique filename
-    unique_filename = f"{uuid.uuid4()}_{file.filename}"
-    file_path = os.path.join(upload_dir, unique_filename)
-    
-    # Save file
-    try:
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error saving file: {str(e)}")
-    
-    # Create thesis record
+    return file_ext
+
+async def create_uploaded_thesis(current_user: User, filename: str, received: dict,
+                                 background_tasks: BackgroundTasks) -> dict:
+    """Create the thesis for a received upload and move the file into the blob store"""
+    check_upload_extension(filename)
+    # Identical content shares one stored file
     thesis_data = {
         "student_id": current_user.id,
-        "filename": file.filename,
-        "filepath": file_path,
+        "filename": filename,
+        "content_hash": received["sha256"],
+        "size": received["size"],
         "upload_date": datetime.now(),
         "status": "pending"
     }
     
-    thesis_id = thesis_repo.create_thesis(thesis_data)
+    try:
+        thesis_id = await blob_store.store(thesis_repo, thesis_data, received["temp_path"])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error saving file: {str(e)}")
+    
+    # Make the text searchable without delaying the upload response
+    background_tasks.add_task(index_thesis_text, thesis_data['id'], thesis_data["filepath"])
     
     return {
         "message": "Thesis uploaded successfully",
         "thesis_id": thesis_id,
-        "filename": file.filename,
+        "filename": filename,
+        "size": received["size"],
+        "sha256": received["sha256"],
         "status": "pending"
     }
 
+@router.post("/upload")
+async def upload_thesis(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Upload a thesis file"""
+    check_student(current_user)
+    check_upload_extension(file.filename)
+    
+    # Stream the file to disk in chunks, hashing it on the way
+    try:
+        received = await blob_store.receive(file, max_bytes=config.MAX_UPLOAD_SIZE,
+                                            chunk_size=config.UPLOAD_CHUNK_SIZE)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error saving file: {str(e)}")
+    
+    return await create_uploaded_thesis(current_user, file.filename, received, background_tasks)
+
+@router.post("/uploads")
+async def start_resumable_upload(
+    filename: str = Form(...),
+    size: int = Form(...),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Start a resumable upload; send the file with PUT /uploads/{upload_id}"""
+    check_student(current_user)
+    check_upload_extension(filename)
+    await run_in_threadpool(resumable_uploads.expire)
+    
+    upload = await resumable_uploads.create(current_user.id, os.path.basename(filename), size,
+                                            max_bytes=config.MAX_RESUMABLE_UPLOAD_SIZE)
+    upload["chunk_size"] = config.RESUMABLE_UPLOAD_CHUNK_SIZE
+    return upload
+
+@router.get("/uploads/{upload_id}")
+async def get_resumable_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the offset to resume a resumable upload from"""
+    return await resumable_uploads.status(upload_id, current_user.id)
+
+@router.put("/uploads/{upload_id}")
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Append the request body to a resumable upload at offset"""
+    return await resumable_uploads.append(upload_id, current_user.id, offset, request.stream(),
+                                          max_chunk_bytes=config.RESUMABLE_UPLOAD_CHUNK_SIZE)
+
+@router.post("/uploads/{upload_id}/complete")
+async def complete_resumable_upload(
+    upload_id: str,
+    background_tasks: BackgroundTasks,
+    sha256: Optional[str] = Form(None),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Create the thesis from a fully sent resumable upload"""
+    check_student(current_user)
+    received = await resumable_uploads.finish(upload_id, current_user.id, sha256=sha256,
+                                              chunk_size=config.UPLOAD_CHUNK_SIZE)
+    try:
+        return await create_uploaded_thesis(current_user, received["filename"], received, background_tasks)
+    finally:
+        await resumable_uploads.discard(upload_id)
+
+@router.delete("/uploads/{upload_id}")
+async def abort_resumable_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Abandon a resumable upload"""
+    await resumable_uploads.abort(upload_id, current_user.id)
+    return {"message": "Upload aborted", "upload_id": upload_id}
+
+@router.delete("/{thesis_id}")
+async def delete_thesis(
+    thesis_id: str,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Delete a thesis with its feedback; its file goes once no other thesis shares it"""
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
+    if not thesis:
+        raise HTTPException(status_code=404, detail="Thesis not found")
+    
+    # Students may delete their own theses, admins any
+    if current_user.role == "supervisor" or (current_user.role == "student" and thesis['student_id'] != current_user.id):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    if not await thesis_repo.delete_thesis(thesis_id):
+        raise HTTPException(status_code=404, detail="Thesis not found")
+    
+    background_tasks.add_task(prune_blobs)
+    return {"message": "Thesis deleted successfully", "thesis_id": thesis_id}
+
 @router.get("/my-theses")
 async def get_my_theses(current_user: User = Depends(get_current_active_user)):
     """Get theses for current user"""
+    # Student names come from the joined listing query
     if current_user.role == "student":
-        theses = thesis_repo.get_theses_by_student(current_user.id)
+        theses = await thesis_repo.get_theses_with_details_by_student(current_user.id)
     elif current_user.role == "supervisor":
-        theses = thesis_repo.get_theses_by_supervisor(current_user.id)
+        theses = await thesis_repo.get_theses_with_details_by_supervisor(current_user.id)
     else:  # admin
-        theses = thesis_repo.get_all_theses()
+        theses = await thesis_repo.get_all_theses_with_details()
     
-    # Add student names to theses
     for thesis in theses:
-        student = user_repo.get_user_by_id(thesis['student_id'])
-        thesis['student_name'] = student['full_name'] if student else "Unknown"
+        thesis['student_name'] = thesis['student_name'] or "Unknown"
     
     return theses
 
 @router.get("/download/{thesis_id}")
 async def download_thesis(
     thesis_id: str,
+    request: Request,
+    inline: bool = Query(False, description="Display in the browser instead of saving"),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Download a thesis file"""
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    """Download a thesis file, supporting byte ranges and conditional requests"""
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
@@ -98,22 +216,74 @@ async def download_thesis(
     if current_user.role == "student" and thesis['student_id'] != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    if not os.path.exists(thesis['filepath']):
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
         raise HTTPException(status_code=404, detail="File not found")
     
-    return FileResponse(
-        path=thesis['filepath'],
-        filename=thesis['filename'],
-        media_type='application/octet-stream'
-    )
+    # Files in object storage are fetched from there directly
+    url = await run_in_threadpool(blob_store.presigned_url, thesis['filepath'], thesis['filename'], inline)
+    if url:
+        return RedirectResponse(url, status_code=307)
+    
+    return await file_download_response(request, thesis['filepath'], thesis['filename'],
+                                        content_hash=thesis.get('content_hash'), inline=inline)
+
+async def preview_image_entries(file_path: str, first_page: int, last_page: int, width: int) -> List[dict]:
+    """Inline images of a page range from the preview cache, rendering missing pages in parallel"""
+    pages = list(range(first_page, last_page + 1))
+    images = await run_in_threadpool(preview_cache.get_pages, file_path, pages, width)
+    return [preview_image_entry(page, images[page], preview_cache.image_format) for page in pages]
 
 @router.get("/preview-images/{thesis_id}")
 async def get_thesis_preview_images(
     thesis_id: str,
+    first_page: int = Query(1, ge=1),
+    last_page: Optional[int] = Query(None, ge=1, description="Defaults to first_page + 4; at most 20 pages"),
+    width: int = Query(config.PREVIEW_WIDTH, ge=40, le=config.PREVIEW_MAX_WIDTH),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get preview images of a page range as base64 (single pages: /{thesis_id}/pages/{page})"""
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
+    if not thesis:
+        raise HTTPException(status_code=404, detail="Thesis not found")
+    
+    # Check permissions
+    if current_user.role == "student" and thesis['student_id'] != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    try:
+        page_count = await run_in_threadpool(preview_cache.page_count, thesis['filepath'])
+        last = min(last_page or first_page + 4, first_page + 19, page_count)
+        images = await preview_image_entries(thesis['filepath'], first_page, last, width)
+    except Exception as e:
+        print(f"Error converting document to images: {str(e)}")
+        images = [preview_image_entry(1, render_error_preview("Error processing document"))]
+    
+    # Word documents are previewed as text
+    if images and os.path.splitext(thesis['filename'])[1].lower() in ['.doc', '.docx']:
+        try:
+            images[0]['text_content'] = await run_in_threadpool(blob_store.extract_text, thesis['filepath'])
+        except Exception as e:
+            print(f"Error extracting preview text for {thesis_id}: {str(e)}")
+    return {"images": images}
+
+@router.get("/{thesis_id}/thumbnails")
+async def get_thesis_thumbnails(
+    thesis_id: str,
+    first_page: int = Query(1, ge=1),
+    last_page: Optional[int] = Query(None, ge=1),
+    width: int = Query(config.PREVIEW_THUMBNAIL_WIDTH, ge=40, le=400),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get preview images for a thesis"""
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    """Get small images of every page for a thumbnail strip
+    
+    At most THUMBNAIL_BATCH_PAGES pages are returned per request; when more
+    follow, next_page is the first_page to ask for next. Uncached pages are
+    rendered in parallel on the preview worker processes.
+    """
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
@@ -121,14 +291,94 @@ async def get_thesis_preview_images(
     if current_user.role == "student" and thesis['student_id'] != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    if not os.path.exists(thesis['filepath']):
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
         raise HTTPException(status_code=404, detail="File not found")
     
     try:
-        images = convert_document_to_images(thesis['filepath'])
-        return {"images": images}
+        page_count = await run_in_threadpool(preview_cache.page_count, thesis['filepath'])
+        last = min(last_page or page_count, first_page + THUMBNAIL_BATCH_PAGES - 1, page_count)
+        thumbnails = await preview_image_entries(thesis['filepath'], first_page, last, width)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating thumbnails: {str(e)}")
+    
+    return {
+        "thesis_id": thesis_id,
+        "page_count": page_count,
+        "width": width,
+        "thumbnails": thumbnails,
+        "next_page": last + 1 if last < min(last_page or page_count, page_count) else None
+    }
+
+@router.get("/{thesis_id}/pages")
+async def list_thesis_preview_pages(
+    thesis_id: str,
+    width: int = Query(config.PREVIEW_WIDTH, ge=100, le=config.PREVIEW_MAX_WIDTH),
+    current_user: User = Depends(get_current_active_user)
+):
+    """List the preview pages of a thesis with the URL of each page image"""
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
+    if not thesis:
+        raise HTTPException(status_code=404, detail="Thesis not found")
+    
+    # Check permissions
+    if current_user.role == "student" and thesis['student_id'] != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    try:
+        page_count = await run_in_threadpool(preview_cache.page_count, thesis['filepath'])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading document: {str(e)}")
+    
+    return {
+        "thesis_id": thesis_id,
+        "page_count": page_count,
+        "width": width,
+        "pages": [{"page": page, "url": f"/thesis/{thesis_id}/pages/{page}?width={width}"}
+                  for page in range(1, page_count + 1)],
+        # Progressive loading: show these first, then fetch full pages as they are viewed
+        "thumbnails_url": f"/thesis/{thesis_id}/thumbnails"
+    }
+
+@router.get("/{thesis_id}/pages/{page}")
+async def get_thesis_preview_page(
+    thesis_id: str,
+    page: int,
+    request: Request,
+    width: int = Query(config.PREVIEW_WIDTH, ge=100, le=config.PREVIEW_MAX_WIDTH),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get one preview page as an image, rendered on first request and cached"""
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
+    if not thesis:
+        raise HTTPException(status_code=404, detail="Thesis not found")
+    
+    # Check permissions
+    if current_user.role == "student" and thesis['student_id'] != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    # The ETag comes from the content hash, so a revalidation needs no rendering
+    etag = preview_cache.etag(thesis['filepath'], page, width)
+    not_modified = not_modified_response(request, etag, PREVIEW_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    try:
+        image = await run_in_threadpool(preview_cache.get_page, thesis['filepath'], page, width)
+    except IndexError:
+        raise HTTPException(status_code=404, detail="Page not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating preview: {str(e)}")
+    
+    headers = {'cache-control': PREVIEW_CACHE_CONTROL}
+    if etag:
+        headers['etag'] = etag
+    return Response(content=image, media_type=preview_cache.media_type, headers=headers)
 
 @router.get("/extract-text/{thesis_id}")
 async def extract_thesis_text(
@@ -136,7 +386,7 @@ async def extract_thesis_text(
     current_user: User = Depends(get_current_active_user)
 ):
     """Extract text from a thesis file"""
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
@@ -144,43 +394,143 @@ async def extract_thesis_text(
     if current_user.role == "student" and thesis['student_id'] != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    if not os.path.exists(thesis['filepath']):
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
         raise HTTPException(status_code=404, detail="File not found")
     
     try:
-        text = extract_text_from_file(thesis['filepath'])
+        text = await run_in_threadpool(blob_store.extract_text, thesis['filepath'])
+        await thesis_repo.index_thesis_text(thesis_id, text)
         return {"text": text}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error extracting text: {str(e)}")
 
+async def get_thesis_structure(thesis_id: str, current_user: User) -> Dict[str, Any]:
+    """The document structure of a thesis the user may read, built on first use"""
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
+    if not thesis:
+        raise HTTPException(status_code=404, detail="Thesis not found")
+
+    # Check permissions
+    if current_user.role == "student" and thesis['student_id'] != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    if not await run_in_threadpool(blob_store.exists, thesis['filepath']):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    try:
+        return await run_in_threadpool(blob_store.document_structure, thesis['filepath'])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading document structure: {str(e)}")
+
+@router.get("/{thesis_id}/structure")
+async def get_thesis_structure_outline(
+    thesis_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the headings, sections, references, captions and pages of a thesis
+
+    Section, caption and page offsets point into the thesis text; the text
+    of a section is at /{thesis_id}/sections/{index}.
+    """
+    structure = await get_thesis_structure(thesis_id, current_user)
+    return {"thesis_id": thesis_id, **{key: value for key, value in structure.items() if key != "text"}}
+
+@router.get("/{thesis_id}/sections/{index}")
+async def get_thesis_section(
+    thesis_id: str,
+    index: int,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get one section of a thesis with its text, subsections included"""
+    structure = await get_thesis_structure(thesis_id, current_user)
+    if not 0 <= index < len(structure["sections"]):
+        raise HTTPException(status_code=404, detail="Section not found")
+    return {
+        "thesis_id": thesis_id,
+        "index": index,
+        "section": structure["sections"][index],
+        "text": section_text(structure, index)
+    }
+
+@router.get("/search")
+async def search_theses(
+    q: str = Query(..., min_length=1, max_length=500),
+    source: Optional[str] = Query(None, pattern="^(feedback|thesis)$"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Full-text search over feedback and thesis text
+    
+    Words are matched together, "quoted phrases" as phrases and word* as a
+    prefix. Results are ranked best first and carry a snippet with the
+    matches wrapped in <mark> tags. Students search their own theses and
+    supervisors those of their assigned students.
+    """
+    student_id = supervisor_id = None
+    if current_user.role == "student":
+        student_id = current_user.id
+    elif current_user.role == "supervisor":
+        supervisor_id = current_user.id
+    
+    try:
+        results = await search_repo.search(
+            q, student_id=student_id, supervisor_id=supervisor_id,
+            sources=[source] if source else None, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    for result in results:
+        result['student_name'] = result['student_name'] or "Unknown"
+    
+    return results
+
 @router.get("/to-review")
 async def get_theses_to_review(current_user: User = Depends(get_current_active_user)):
     """Get theses that need supervisor review"""
     check_supervisor(current_user)
     
-    theses = thesis_repo.get_theses_by_supervisor(current_user.id)
+    # Filter for pending review in SQL, with student names joined in
+    theses = await thesis_repo.get_theses_with_details_by_supervisor(
+        current_user.id, statuses=['pending', 'reviewed_by_ai']
+    )
     
-    # Add student names and filter for pending review
-    reviewed_theses = []
     for thesis in theses:
-        if thesis['status'] == 'pending' or thesis['status'] == 'reviewed_by_ai':
-            student = user_repo.get_user_by_id(thesis['student_id'])
-            thesis['student_name'] = student['full_name'] if student else "Unknown"
-            reviewed_theses.append(thesis)
+        thesis['student_name'] = thesis['student_name'] or "Unknown"
     
-    return reviewed_theses
+    return theses
 
 @router.get("/all")
-async def get_all_theses(current_user: User = Depends(get_current_active_user)):
-    """Get all theses (admin only)"""
+async def get_all_theses(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    supervisor_id: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get all theses (admin only)
+    
+    Without limit/cursor the full filtered list is returned. With them the
+    response is one page: {"items", "next_cursor", "limit"}; pass next_cursor
+    back to get the following page. date_to is exclusive.
+    """
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    theses = thesis_repo.get_all_theses()
+    try:
+        page = await thesis_repo.get_theses_page(
+            limit=limit, cursor=cursor, status=status, supervisor_id=supervisor_id,
+            date_from=date_from, date_to=date_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Add student names
+    theses = page['items']
     for thesis in theses:
-        student = user_repo.get_user_by_id(thesis['student_id'])
-        thesis['student_name'] = student['full_name'] if student else "Unknown"
+        thesis['student_name'] = thesis['student_name'] or "Unknown"
     
-    return theses 
\ No newline at end of file
+    if limit is None and cursor is None:
+        return theses
+    return {"items": theses, "next_cursor": page['next_cursor'], "limit": limit} 
\ No newline at end of file
@@ -4,29 +4,30 @@ User routes for ThesisAI Tool.
 This module contains all user management API endpoints.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, Form, HTTPException
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Form, HTTPException, Query
 
 from auth.auth_service import get_current_active_user, check_admin, check_supervisor
 from core.models import User
-from database.database import user_repo, thesis_repo, feedback_repo
+from database.async_database import user_repo, thesis_repo, feedback_repo
 
 router = APIRouter()
 
 @router.get("/supervisors")
 async def get_supervisors(current_user: User = Depends(get_current_active_user)):
     """Get all supervisors"""
-    return user_repo.get_users_by_role("supervisor")
+    return await user_repo.get_users_by_role("supervisor")
 
 @router.get("/students")
 async def get_students(current_user: User = Depends(get_current_active_user)):
     """Get all students"""
     if current_user.role == "supervisor":
         # Supervisors can only see their assigned students
-        return user_repo.get_assigned_students(current_user.id)
+        return await user_repo.get_assigned_students(current_user.id)
     else:
         # Admins can see all students
-        return user_repo.get_users_by_role("student")
+        return await user_repo.get_users_by_role("student")
 
 @router.get("/supervisor-assignments")
 async def get_supervisor_assignments(current_user: User = Depends(get_current_active_user)):
@@ -34,11 +35,11 @@ async def get_supervisor_assignments(current_user: User = Depends(get_current_ac
     check_supervisor(current_user)
     
     assignments = []
-    assigned_students = user_repo.get_assigned_students(current_user.id)
+    assigned_students = await user_repo.get_assigned_students(current_user.id)
     
     for student in assigned_students:
         # Get theses for this student
-        theses = thesis_repo.get_theses_by_student(student['id'])
+        theses = await thesis_repo.get_theses_by_student(student['id'])
         assignments.append({
             "supervisor_id": current_user.id,
             "supervisor_name": current_user.full_name,
@@ -59,8 +60,8 @@ async def assign_supervisor(
     check_admin(current_user)
     
     # Get student and supervisor
-    student = user_repo.get_user_by_username(student_username)
-    supervisor = user_repo.get_user_by_username(supervisor_username)
+    student = await user_repo.get_user_by_username(student_username)
+    supervisor = await user_repo.get_user_by_username(supervisor_username)
     
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
@@ -72,11 +73,8 @@ async def assign_supervisor(
     if supervisor['role'] != "supervisor":
         raise HTTPException(status_code=400, detail="User is not a supervisor")
     
-    # Update student's supervisor
-    user_repo.update_user_supervisor(student['id'], supervisor['id'])
-    
-    # Update supervisor's assigned students
-    user_repo.add_assigned_student(supervisor['id'], student['id'])
+    # Update student's supervisor (this also moves the supervisor assignment)
+    await user_repo.update_user_supervisor(student['id'], supervisor['id'])
     
     return {
         "message": "Supervisor assigned successfully",
@@ -93,13 +91,12 @@ async def submit_supervisor_feedback(
     """Submit supervisor feedback for a thesis"""
     check_supervisor(current_user)
     
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
     # Check if supervisor is assigned to this student
-    student = user_repo.get_user_by_id(thesis['student_id'])
-    if not student or student['supervisor_id'] != current_user.id:
+    if not await user_repo.is_assigned_student(current_user.id, thesis['student_id']):
         raise HTTPException(status_code=403, detail="Not authorized to review this thesis")
     
     # Create feedback record
@@ -110,10 +107,10 @@ async def submit_supervisor_feedback(
         "is_ai_feedback": False
     }
     
-    feedback_id = feedback_repo.create_feedback(feedback_data)
+    feedback_id = await feedback_repo.create_feedback(feedback_data)
     
     # Update thesis status
-    thesis_repo.update_thesis_status(thesis_id, "reviewed_by_supervisor", feedback_id)
+    await thesis_repo.update_thesis_status(thesis_id, "reviewed_by_supervisor", feedback_id)
     
     return {
         "message": "Supervisor feedback submitted successfully",
@@ -121,21 +118,44 @@ async def submit_supervisor_feedback(
     }
 
 @router.get("/supervisor-feedback")
-async def get_all_supervisor_feedback(current_user: User = Depends(get_current_active_user)):
-    """Get all supervisor feedback"""
+async def get_all_supervisor_feedback(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    include_content: Optional[bool] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get all supervisor feedback
+    
+    Pass limit (and then next_cursor) to page through the feedback newest
+    first; the response is then {"items", "next_cursor", "limit"}. Paged
+    responses leave out the feedback content unless include_content=true;
+    fetch a single item from /supervisor-feedback/{thesis_id} instead.
+    """
     check_supervisor(current_user)
     
-    feedbacks = feedback_repo.get_feedback_by_reviewer(current_user.id)
+    paged = limit is not None or cursor is not None
+    if include_content is None:
+        include_content = not paged
     
-    # Add thesis and student information
+    # Thesis and student information are joined in by the repository
+    try:
+        page = await feedback_repo.get_feedback_page(
+            reviewer_id=current_user.id, limit=limit, cursor=cursor,
+            date_from=date_from, date_to=date_to, include_content=include_content
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    feedbacks = page['items']
     for feedback in feedbacks:
-        thesis = thesis_repo.get_thesis_by_id(feedback['thesis_id'])
-        if thesis:
-            feedback['thesis'] = thesis
-            student = user_repo.get_user_by_id(thesis['student_id'])
-            feedback['student_name'] = student['full_name'] if student else "Unknown"
+        if 'thesis' in feedback:
+            feedback['student_name'] = feedback['student_name'] or "Unknown"
     
-    return feedbacks
+    if not paged:
+        return feedbacks
+    return {"items": feedbacks, "next_cursor": page['next_cursor'], "limit": limit}
 
 @router.get("/supervisor-feedback/{thesis_id}")
 async def get_supervisor_feedback(
@@ -146,17 +166,16 @@ async def get_supervisor_feedback(
     check_supervisor(current_user)
     
     # Get the thesis
-    thesis = thesis_repo.get_thesis_by_id(thesis_id)
+    thesis = await thesis_repo.get_thesis_by_id(thesis_id)
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
     # Check if the thesis belongs to a student assigned to this supervisor
-    student = user_repo.get_user_by_id(thesis['student_id'])
-    if not student or student['supervisor_id'] != current_user.id:
+    if not await user_repo.is_assigned_student(current_user.id, thesis['student_id']):
         raise HTTPException(status_code=403, detail="Not authorized to view this thesis")
     
     # Get supervisor feedback
-    feedback = feedback_repo.get_supervisor_feedback_by_thesis_id(thesis_id)
+    feedback = await feedback_repo.get_supervisor_feedback_by_thesis_id(thesis_id)
     if not feedback:
         raise HTTPException(status_code=404, detail="No supervisor feedback found")
     
@@ -175,23 +194,21 @@ async def delete_user(
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
     
     # Get the user to delete
-    user_to_delete = user_repo.get_user_by_username(username)
+    user_to_delete = await user_repo.get_user_by_username(username)
     if not user_to_delete:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Check if user has any theses
-    theses = thesis_repo.get_theses_by_student_id(user_to_delete['id'])
-    if theses:
+    if await thesis_repo.has_theses_by_student(user_to_delete['id']):
         raise HTTPException(status_code=400, detail="Cannot delete user with existing theses")
     
     # Check if user has any feedback
-    feedback = feedback_repo.get_feedback_by_reviewer(user_to_delete['id'])
-    if feedback:
+    if await feedback_repo.has_feedback_by_reviewer(user_to_delete['id']):
         raise HTTPException(status_code=400, detail="Cannot delete user with existing feedback")
     
     # Delete the user
     try:
-        success = user_repo.delete_user(username)
+        success = await user_repo.delete_user(username)
         if not success:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -215,7 +232,7 @@ async def get_user(
     """Get user details (admin only)"""
     check_admin(current_user)
     
-    user = user_repo.get_user_by_username(username)
+    user = await user_repo.get_user_by_username(username)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -234,7 +251,7 @@ async def update_user(
     check_admin(current_user)
     
     # Get the user to update
-    user_to_update = user_repo.get_user_by_username(username)
+    user_to_update = await user_repo.get_user_by_username(username)
     if not user_to_update:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -251,7 +268,7 @@ async def update_user(
     
     # Handle supervisor assignment
     if role == "student" and supervisor_username:
-        supervisor = user_repo.get_user_by_username(supervisor_username)
+        supervisor = await user_repo.get_user_by_username(supervisor_username)
         if not supervisor:
             raise HTTPException(status_code=404, detail="Supervisor not found")
         if supervisor['role'] != "supervisor":
@@ -262,12 +279,12 @@ async def update_user(
         update_data["supervisor_id"] = None
     
     try:
-        success = user_repo.update_user(username, update_data)
+        success = await user_repo.update_user(username, update_data)
         if not success:
             raise HTTPException(status_code=404, detail="User not found")
         
         # Get updated user data
-        updated_user = user_repo.get_user_by_username(username)
+        updated_user = await user_repo.get_user_by_username(username)
         
         return {
             "message": f"User {username} updated successfully",
@@ -277,7 +294,30 @@ async def update_user(
         raise HTTPException(status_code=500, detail=f"Failed to update user: {str(e)}")
 
 @router.get("/users")
-async def get_users(current_user: User = Depends(get_current_active_user)):
-    """Get all users (admin only)"""
+async def get_users(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    role: Optional[str] = None,
+    supervisor_id: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get all users (admin only)
+    
+    Without limit/cursor the full filtered list is returned. With them the
+    response is one page: {"items", "next_cursor", "limit"}.
+    """
     check_admin(current_user)
-    return user_repo.get_all_users() 
\ No newline at end of file
+    
+    try:
+        page = await user_repo.get_users_page(
+            limit=limit, cursor=cursor, role=role, supervisor_id=supervisor_id,
+            date_from=date_from, date_to=date_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if limit is None and cursor is None:
+        return page['items']
+    return {"items": page['items'], "next_cursor": page['next_cursor'], "limit": limit} 
\ No newline at end of file
@@ -1312,7 +1312,7 @@ async def request_ai_feedback(
     if current_user.role == "student" and thesis['student_id'] != current_user.id:
         raise HTTPException(status_code=403, detail="Not your thesis")
     
-    if current_user.role == "supervisor" and thesis['student_id'] not in current_user.assigned_students:
+    if current_user.role == "supervisor" and not user_repo.is_assigned_student(current_user.id, thesis['student_id']):
         raise HTTPException(status_code=403, detail="Not your assigned student")
     
     # Parse selected options if provided
@@ -1411,7 +1411,7 @@ async def submit_supervisor_feedback(
     if not thesis:
         raise HTTPException(status_code=404, detail="Thesis not found")
     
-    if thesis['student_id'] not in current_user.assigned_students:
+    if not user_repo.is_assigned_student(current_user.id, thesis['student_id']):
         raise HTTPException(status_code=403, detail="Not your assigned student")
     
     feedback = Feedback(
@@ -1443,7 +1443,7 @@ async def get_supervisor_feedback(
     if current_user.role == "student" and thesis['student_id'] != current_user.id:
         raise HTTPException(status_code=403, detail="Not your thesis")
     
-    if current_user.role == "supervisor" and thesis['student_id'] not in current_user.assigned_students:
+    if current_user.role == "supervisor" and not user_repo.is_assigned_student(current_user.id, thesis['student_id']):
         raise HTTPException(status_code=403, detail="Not your assigned student")
     
     if not thesis['supervisor_feedback_id']:
@@ -1459,74 +1459,47 @@ async def get_supervisor_feedback(
 async def get_all_supervisor_feedback(current_user: User = Depends(get_current_active_user)):
     """Get all supervisor feedback for the current user"""
     if current_user.role == "student":
-        # Get all theses for this student that have supervisor feedback
-        theses = thesis_repo.get_theses_by_student_id(current_user.id)
-        feedback_list = []
-        
-        for thesis in theses:
-            if thesis.get('supervisor_feedback_id'):
-                feedback = feedback_repo.get_feedback_by_id(thesis['supervisor_feedback_id'])
-                if feedback:
-                    # Get supervisor name
-                    supervisor = user_repo.get_user_by_id(feedback['reviewer_id'])
-                    supervisor_name = supervisor['full_name'] if supervisor else 'Unknown Supervisor'
-                    
-                    feedback_list.append({
-                        'thesis_id': thesis['id'],
-                        'thesis_title': thesis['filename'],
-                        'feedback_text': feedback['content'],
-                        'feedback_date': feedback['created_at'],
-                        'supervisor_name': supervisor_name
-                    })
-        
-        return feedback_list
+        # Theses of this student that have supervisor feedback, joined with the supervisor name
+        rows = feedback_repo.get_supervisor_feedback_overview(student_id=current_user.id)
+        return [
+            {
+                'thesis_id': row['thesis_id'],
+                'thesis_title': row['thesis_title'],
+                'feedback_text': row['feedback_text'],
+                'feedback_date': row['feedback_date'],
+                'supervisor_name': row['supervisor_name'] or 'Unknown Supervisor'
+            }
+            for row in rows
+        ]
     elif current_user.role == "supervisor":
-        # Get all theses for students assigned to this supervisor that have supervisor feedback
-        theses = thesis_repo.get_theses_by_supervisor(current_user.username)
-        feedback_list = []
-        
-        for thesis in theses:
-            if thesis.get('supervisor_feedback_id'):
-                feedback = feedback_repo.get_feedback_by_id(thesis['supervisor_feedback_id'])
-                if feedback and feedback['reviewer_id'] == current_user.id:
-                    # Get student name
-                    student = user_repo.get_user_by_id(thesis['student_id'])
-                    student_name = student['full_name'] if student else 'Unknown Student'
-                    
-                    feedback_list.append({
-                        'thesis_id': thesis['id'],
-                        'thesis_title': thesis['filename'],
-                        'feedback_text': feedback['content'],
-                        'feedback_date': feedback['created_at'],
-                        'student_name': student_name
-                    })
-        
-        return feedback_list
+        # Feedback this supervisor gave on theses of their assigned students
+        rows = feedback_repo.get_supervisor_feedback_overview(
+            supervisor_id=current_user.id, reviewer_id=current_user.id
+        )
+        return [
+            {
+                'thesis_id': row['thesis_id'],
+                'thesis_title': row['thesis_title'],
+                'feedback_text': row['feedback_text'],
+                'feedback_date': row['feedback_date'],
+                'student_name': row['student_name'] or 'Unknown Student'
+            }
+            for row in rows
+        ]
     else:
         # Admin can see all supervisor feedback
-        all_theses = thesis_repo.get_all_theses()
-        feedback_list = []
-        
-        for thesis in all_theses:
-            if thesis.get('supervisor_feedback_id'):
-                feedback = feedback_repo.get_feedback_by_id(thesis['supervisor_feedback_id'])
-                if feedback:
-                    # Get supervisor and student names
-                    supervisor = user_repo.get_user_by_id(feedback['reviewer_id'])
-                    student = user_repo.get_user_by_id(thesis['student_id'])
-                    supervisor_name = supervisor['full_name'] if supervisor else 'Unknown Supervisor'
-                    student_name = student['full_name'] if student else 'Unknown Student'
-                    
-                    feedback_list.append({
-                        'thesis_id': thesis['id'],
-                        'thesis_title': thesis['filename'],
-                        'feedback_text': feedback['content'],
-                        'feedback_date': feedback['created_at'],
-                        'supervisor_name': supervisor_name,
-                        'student_name': student_name
-                    })
-        
-        return feedback_list
+        rows = feedback_repo.get_supervisor_feedback_overview()
+        return [
+            {
+                'thesis_id': row['thesis_id'],
+                'thesis_title': row['thesis_title'],
+                'feedback_text': row['feedback_text'],
+                'feedback_date': row['feedback_date'],
+                'supervisor_name': row['supervisor_name'] or 'Unknown Supervisor',
+                'student_name': row['student_name'] or 'Unknown Student'
+            }
+            for row in rows
+        ]
 
 @app.post("/assign-supervisor")
 async def assign_supervisor(
@@ -1563,19 +1536,16 @@ async def get_my_theses(current_user: User = Depends(get_current_active_user)):
         for thesis in theses:
             thesis['student_name'] = current_user.full_name
     elif current_user.role == "supervisor":
-        theses = thesis_repo.get_theses_by_supervisor(current_user.username)
+        # Student names are joined in by the repository query
+        theses = thesis_repo.get_theses_with_details_by_supervisor(current_user.id)
         print(f"🔍 Found {len(theses)} theses for supervisor")
-        # Add student names for supervisor's assigned students
         for thesis in theses:
-            student = user_repo.get_user_by_id(thesis['student_id'])
-            thesis['student_name'] = student['full_name'] if student else 'Unknown Student'
+            thesis['student_name'] = thesis['student_name'] or 'Unknown Student'
     else:  # admin
-        theses = thesis_repo.get_all_theses()
+        theses = thesis_repo.get_all_theses_with_details()
         print(f"🔍 Found {len(theses)} theses for admin")
-        # Add student names for all theses
         for thesis in theses:
-            student = user_repo.get_user_by_id(thesis['student_id'])
-            thesis['student_name'] = student['full_name'] if student else 'Unknown Student'
+            thesis['student_name'] = thesis['student_name'] or 'Unknown Student'
     
     print(f"🔍 Returning theses: {[{'id': t['id'], 'filename': t['filename'], 'student_id': t['student_id'], 'student_name': t.get('student_name', 'N/A')} for t in theses]}")
     
@@ -1593,7 +1563,7 @@ async def download_thesis(
     if current_user.role == "student" and thesis['student_id'] != current_user.id:
         raise HTTPException(status_code=403, detail="Not your thesis")
     
-    if current_user.role == "supervisor" and thesis['student_id'] not in current_user.assigned_students:
+    if current_user.role == "supervisor" and not user_repo.is_assigned_student(current_user.id, thesis['student_id']):
         raise HTTPException(status_code=403, detail="Not your assigned student")
     
     if not os.path.exists(thesis['filepath']):
@@ -1610,20 +1580,20 @@ async def get_theses_to_review(current_user: User = Depends(get_current_active_u
     check_supervisor(current_user)
     theses_to_review = []
     
-    # Get theses assigned to this supervisor
-    supervisor_theses = thesis_repo.get_theses_by_supervisor(current_user.username)
+    # Get theses assigned to this supervisor that still need review
+    supervisor_theses = thesis_repo.get_theses_with_details_by_supervisor(
+        current_user.id, statuses=["reviewed_by_ai", "pending"]
+    )
     
     for thesis in supervisor_theses:
-        if thesis['status'] in ["reviewed_by_ai", "pending"]:
-            student = user_repo.get_user_by_id(thesis['student_id'])
-            if student:
-                thesis_data = {
-                    "student_name": student['full_name'],
-                    "filename": thesis['filename'],
-                    "upload_date": thesis['upload_date'],
-                    "status": thesis['status']
-                }
-                theses_to_review.append(thesis_data)
+        if thesis['student_name'] is not None:
+            thesis_data = {
+                "student_name": thesis['student_name'],
+                "filename": thesis['filename'],
+                "upload_date": thesis['upload_date'],
+                "status": thesis['status']
+            }
+            theses_to_review.append(thesis_data)
 
     return theses_to_review
 
@@ -1645,15 +1615,7 @@ async def get_supervisors(current_user: User = Depends(get_current_active_user))
 async def get_students(current_user: User = Depends(get_current_active_user)):
     if current_user.role == "supervisor":
         # Get students assigned to this supervisor
-        supervisor = user_repo.get_user_by_username(current_user.username)
-        if supervisor and supervisor['assigned_students']:
-            students = []
-            for student_username in supervisor['assigned_students']:
-                student = user_repo.get_user_by_username(student_username)
-                if student:
-                    students.append(student)
-        else:
-            students = []
+        students = user_repo.get_assigned_students(current_user.id)
     else:
         check_admin(current_user)
         students = user_repo.get_users_by_role("student")
@@ -1683,14 +1645,11 @@ async def get_all_theses(current_user: User = Depends(get_current_active_user)):
     check_admin(current_user)
     
     theses_with_student_names = []
-    theses = thesis_repo.get_all_theses()
+    theses = thesis_repo.get_all_theses_with_details()
     
     for thesis in theses:
-        student = user_repo.get_user_by_id(thesis['student_id'])
-        if student and student['role'] == "student":
-            thesis_dict = thesis.copy()
-            thesis_dict["student_name"] = student['full_name']
-            theses_with_student_names.append(thesis_dict)
+        if thesis['student_role'] == "student":
+            theses_with_student_names.append(thesis)
     
     return theses_with_student_names
 
@@ -2024,7 +1983,7 @@ async def extract_thesis_text(
     if current_user.role == "student" and thesis['student_id'] != current_user.id:
         raise HTTPException(status_code=403, detail="Not your thesis")
     
-    if current_user.role == "supervisor" and thesis['student_id'] not in current_user.assigned_students:
+    if current_user.role == "supervisor" and not user_repo.is_assigned_student(current_user.id, thesis['student_id']):
         raise HTTPException(status_code=403, detail="Not your assigned student")
     
     if not os.path.exists(thesis['filepath']):
@@ -2121,7 +2080,7 @@ async def get_thesis_preview_images(
     if current_user.role == "student" and thesis['student_id'] != current_user.id:
         raise HTTPException(status_code=403, detail="Not your thesis")
     
-    if current_user.role == "supervisor" and thesis['student_id'] not in current_user.assigned_students:
+    if current_user.role == "supervisor" and not user_repo.is_assigned_student(current_user.id, thesis['student_id']):
         raise HTTPException(status_code=403, detail="Not your assigned student")
     
     if not os.path.exists(thesis['filepath']):
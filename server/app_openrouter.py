@@ -37,6 +37,7 @@ from fastapi.security import (
 from fastapi import HTTPException
 from fastapi.responses import JSONResponse, FileResponse, HTMLResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr, Field
 from passlib.context import CryptContext
 import jwt
@@ -45,6 +46,9 @@ import aiofiles
 
 import traceback
 import logging
+
+from file_processing.blob_store import blob_store
+
 logging.basicConfig(level=logging.DEBUG)
 logging.getLogger("pdfminer").setLevel(logging.WARNING)
 
@@ -409,18 +413,6 @@ class AIModel:
                 "evidence": ""
             }
 
-    def extract_references(self, text):
-        possible_ref_section = text.split('\n')[-300:]  # last 300 lines
-        references = []
-        in_ref_section = False
-        for line in possible_ref_section:
-            if re.search(r'\b(references|bibliography)\b', line, re.I):
-                in_ref_section = True
-            if in_ref_section and line.strip():
-                references.append(line.strip())
-        print(f"Extracted {len(references)} references (raw).")
-        return references
-
     def extract_intext_citations(self, text):
         patterns = [
             r'\(([^()]+?, \d{4}[a-z]?)\)',  # APA-style
@@ -454,19 +446,18 @@ class AIModel:
             return "", False, ""
 
     async def check_ref_validity(self, file_path):
-        full_text = extract_text_from_file(file_path)
+        structure = await run_in_threadpool(blob_store.document_structure, file_path)
+        full_text = structure['text']
         intext_cits = self.extract_intext_citations(full_text)
-        references = self.extract_references(full_text)
+        print(f"Extracted {len(structure['references'])} references.")
 
         data = []
-        for ref in references:
-            if "http" in ref or "www." in ref:
-                url_match = re.search(r'(https?://\S+)', ref)
-                if url_match:
-                    url = url_match.group(1)
-                    plain_text, is_valid, rand_text = await self.fetch_reference_text_from_url(url, file_path)
-                    print(f"URL Checked: {url}, Valid: {is_valid}")
-                    data.append((None, ref, "Yes" if is_valid else "No", rand_text))
+        for reference in structure['references']:
+            ref, url = reference['text'], reference['url']
+            if url:
+                plain_text, is_valid, rand_text = await self.fetch_reference_text_from_url(url, file_path)
+                print(f"URL Checked: {url}, Valid: {is_valid}")
+                data.append((None, ref, "Yes" if is_valid else "No", rand_text))
             else:
                 data.append((None, ref, "N/A", ""))
 
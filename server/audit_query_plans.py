@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Audit the query plans of the repository SQL.
+
+Runs every repository read path (and the writes that look rows up) against
+a throwaway database with sample data, records each statement SQLite
+executes and runs EXPLAIN QUERY PLAN on it. Plans that scan a whole table or
+sort through a temporary B-tree are flagged, since those grow with the data
+rather than with the result.
+
+    python audit_query_plans.py            # report flagged statements
+    python audit_query_plans.py --verbose  # show every plan
+    python audit_query_plans.py --strict   # exit 1 if anything is flagged
+"""
+
+import os
+import random
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database.database import (
+    DatabaseManager, UserRepository, ThesisRepository, FeedbackRepository, SearchRepository
+)
+
+STUDENTS = 300
+SUPERVISORS = 20
+FEEDBACK_PER_THESIS = 3
+
+# Sorts that only ever cover a small, already filtered result
+EXPECTED_SORTS = {
+    "users.get_assigned_students": "sorts one supervisor's students by name",
+    "search.search": "orders matches by bm25() rank, which no index can provide",
+}
+
+def seed(users: UserRepository, theses: ThesisRepository, feedback: FeedbackRepository) -> dict:
+    """Fill the database with a realistic mix of rows and return sample IDs"""
+    start = datetime(2024, 1, 1)
+    with users.db.get_connection() as conn:
+        supervisors = [str(uuid.uuid4()) for _ in range(SUPERVISORS)]
+        students = [str(uuid.uuid4()) for _ in range(STUDENTS)]
+        conn.executemany(
+            'INSERT INTO users (id, username, email, full_name, hashed_password, role, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(uid, f"sup{i}", f"sup{i}@example.com", f"Supervisor {i}", "x", "supervisor", start) for i, uid in enumerate(supervisors)]
+            + [(uid, f"st{i}", f"st{i}@example.com", f"Student {i}", "x", "student", start + timedelta(hours=i))
+               for i, uid in enumerate(students)]
+        )
+        conn.executemany(
+            'INSERT INTO supervisor_assignments (supervisor_id, student_id) VALUES (?, ?)',
+            [(supervisors[i % SUPERVISORS], uid) for i, uid in enumerate(students)]
+        )
+        conn.executemany('UPDATE users SET supervisor_id = ? WHERE id = ?',
+                         [(supervisors[i % SUPERVISORS], uid) for i, uid in enumerate(students)])
+
+        thesis_rows, feedback_rows = [], []
+        for i, student in enumerate(students):
+            thesis_id = str(uuid.uuid4())
+            uploaded = start + timedelta(days=i % 200, minutes=i)
+            thesis_rows.append((thesis_id, student, f"thesis{i}.pdf", f"thesis_uploads/thesis{i}.pdf",
+                                random.choice(['pending', 'reviewed_by_ai', 'reviewed_by_supervisor', 'approved']), uploaded))
+            for j in range(FEEDBACK_PER_THESIS):
+                is_ai = j < FEEDBACK_PER_THESIS - 1
+                reviewer = student if is_ai else supervisors[i % SUPERVISORS]
+                feedback_rows.append((str(uuid.uuid4()), thesis_id, reviewer, f"Feedback {j} on sample size", is_ai,
+                                      uploaded + timedelta(hours=j)))
+        conn.executemany('INSERT INTO theses (id, student_id, filename, filepath, status, upload_date) VALUES (?, ?, ?, ?, ?, ?)', thesis_rows)
+        conn.executemany('INSERT INTO feedback (id, thesis_id, reviewer_id, content, is_ai_feedback, created_at) VALUES (?, ?, ?, ?, ?, ?)', feedback_rows)
+        cursor = conn.cursor()
+        for row in feedback_rows:
+            feedback.db.replace_search_row(cursor, 'feedback_fts', 'feedback_id', row[0], row[3])
+        conn.executemany('UPDATE theses SET supervisor_feedback_id = ? WHERE id = ?',
+                         [(row[0], row[1]) for row in feedback_rows if not row[4]])
+        conn.commit()
+        # Give the planner statistics like a long-running database would have
+        conn.execute('ANALYZE')
+
+    return {
+        "supervisor_id": supervisors[0],
+        "supervisor_username": "sup0",
+        "student_id": students[0],
+        "student_username": "st0",
+        "thesis_id": thesis_rows[0][0],
+        "feedback_id": feedback_rows[0][0],
+        "date_from": start + timedelta(days=10),
+        "date_to": start + timedelta(days=100),
+    }
+
+def workload(users: UserRepository, theses: ThesisRepository, feedback: FeedbackRepository,
+             search: SearchRepository, ids: dict) -> list:
+    """Repository calls to audit, as (label, callable) pairs"""
+    sup, st, th = ids["supervisor_id"], ids["student_id"], ids["thesis_id"]
+    date_from, date_to = ids["date_from"], ids["date_to"]
+    page = users.get_users_page(limit=5)
+    return [
+        ("users.get_user_by_username", lambda: users.get_user_by_username(ids["student_username"])),
+        ("users.get_user_by_id", lambda: users.get_user_by_id(st)),
+        ("users.get_user_by_email", lambda: users.get_user_by_email("st0@example.com")),
+        ("users.get_all_users", lambda: users.get_all_users()),
+        ("users.get_users_by_role", lambda: users.get_users_by_role("student")),
+        ("users.get_users_page", lambda: users.get_users_page(limit=20, cursor=page['next_cursor'])),
+        ("users.get_users_page(role, dates)", lambda: users.get_users_page(limit=20, role="student", date_from=date_from, date_to=date_to)),
+        ("users.get_users_page(supervisor)", lambda: users.get_users_page(limit=20, supervisor_id=sup)),
+        ("users.get_assigned_students", lambda: users.get_assigned_students(sup)),
+        ("users.get_assigned_student_ids", lambda: users.get_assigned_student_ids(sup)),
+        ("users.is_assigned_student", lambda: users.is_assigned_student(sup, st)),
+        ("users.update_user_supervisor", lambda: users.update_user_supervisor(st, sup)),
+        ("users.assign_supervisor", lambda: users.assign_supervisor(ids["student_username"], ids["supervisor_username"])),
+        ("theses.get_thesis_by_id", lambda: theses.get_thesis_by_id(th)),
+        ("theses.get_theses_by_student_id", lambda: theses.get_theses_by_student_id(st)),
+        ("theses.has_theses_by_student", lambda: theses.has_theses_by_student(st)),
+        ("theses.get_theses_by_supervisor", lambda: theses.get_theses_by_supervisor(sup)),
+        ("theses.get_all_theses", lambda: theses.get_all_theses()),
+        ("theses.get_theses_with_details_by_student", lambda: theses.get_theses_with_details_by_student(st)),
+        ("theses.get_theses_with_details_by_supervisor", lambda: theses.get_theses_with_details_by_supervisor(sup, statuses=['pending', 'reviewed_by_ai'])),
+        ("theses.get_all_theses_with_details", lambda: theses.get_all_theses_with_details()),
+        ("theses.get_theses_page", lambda: theses.get_theses_page(limit=20)),
+        ("theses.get_theses_page(status, dates)", lambda: theses.get_theses_page(limit=20, status="pending", date_from=date_from, date_to=date_to)),
+        ("theses.get_theses_page(supervisor)", lambda: theses.get_theses_page(limit=20, supervisor_id=sup)),
+        ("theses.get_theses_page(student)", lambda: theses.get_theses_page(limit=20, student_id=st)),
+        ("theses.index_thesis_text", lambda: theses.index_thesis_text(th, "Sample size and methodology")),
+        ("theses.is_thesis_text_indexed", lambda: theses.is_thesis_text_indexed(th)),
+        ("theses.get_blob", lambda: theses.get_blob("0" * 64)),
+        ("theses.get_unreferenced_blobs", lambda: theses.get_unreferenced_blobs()),
+        ("theses.create_thesis_with_existing_blob", lambda: theses.create_thesis_with_existing_blob(
+            {'student_id': st, 'filename': 'audit.pdf', 'content_hash': "0" * 64})),
+        ("theses.delete_unreferenced_blob", lambda: theses.delete_unreferenced_blob("0" * 64, "audit.pdf")),
+        ("theses.update_thesis_status", lambda: theses.update_thesis_status(th, "reviewed_by_ai", ids["feedback_id"])),
+        ("feedback.get_feedback_by_id", lambda: feedback.get_feedback_by_id(ids["feedback_id"])),
+        ("feedback.get_feedback_by_thesis_id", lambda: feedback.get_feedback_by_thesis_id(th)),
+        ("feedback.get_feedback_summaries_by_thesis_id", lambda: feedback.get_feedback_summaries_by_thesis_id(th)),
+        ("feedback.get_ai_feedback_by_thesis_id", lambda: feedback.get_ai_feedback_by_thesis_id(th)),
+        ("feedback.get_supervisor_feedback_by_thesis_id", lambda: feedback.get_supervisor_feedback_by_thesis_id(th)),
+        ("feedback.get_feedback_by_thesis_and_reviewer(ai)", lambda: feedback.get_feedback_by_thesis_and_reviewer(th, "ai")),
+        ("feedback.get_feedback_by_thesis_and_reviewer(supervisor)", lambda: feedback.get_feedback_by_thesis_and_reviewer(th, "supervisor")),
+        ("feedback.get_feedback_by_reviewer", lambda: feedback.get_feedback_by_reviewer(sup)),
+        ("feedback.has_feedback_by_reviewer", lambda: feedback.has_feedback_by_reviewer(sup)),
+        ("feedback.get_feedback_page", lambda: feedback.get_feedback_page(reviewer_id=sup, limit=20, include_content=False)),
+        ("feedback.get_feedback_page(dates)", lambda: feedback.get_feedback_page(reviewer_id=sup, limit=20, date_from=date_from, date_to=date_to)),
+        ("feedback.get_supervisor_feedback_overview(student)", lambda: feedback.get_supervisor_feedback_overview(student_id=st)),
+        ("feedback.get_supervisor_feedback_overview(reviewer)", lambda: feedback.get_supervisor_feedback_overview(reviewer_id=sup)),
+        ("search.search", lambda: search.search("sample size", supervisor_id=sup)),
+        ("feedback.update_feedback_content", lambda: feedback.update_feedback_content(ids["feedback_id"], "Revised sample size")),
+        ("theses.delete_thesis", lambda: theses.delete_thesis(th)),
+    ]
+
+def flag_plan(plan: list, allow_sort: bool = False) -> list:
+    """Return the plan steps that scan a whole table or sort in a temp B-tree"""
+    flagged = []
+    for detail in plan:
+        # A virtual table scan with an empty index string (FTS5 'INDEX 0:') reads every row;
+        # MATCH and rowid lookups name their constraint after the colon
+        full_scan = (detail.startswith('SCAN') and ' USING ' not in detail and 'CONSTANT ROW' not in detail
+                     and not ('VIRTUAL TABLE' in detail and not detail.endswith(':')))
+        if full_scan or ('USE TEMP B-TREE' in detail and not allow_sort):
+            flagged.append(detail)
+    return flagged
+
+def audit(verbose: bool = False) -> int:
+    """Run the workload and print the audit, returning the number of flagged statements"""
+    with tempfile.TemporaryDirectory() as tmp:
+        # One pooled connection, so a single trace callback sees every statement
+        db = DatabaseManager(os.path.join(tmp, "audit.db"), pool_size=1)
+        users, theses = UserRepository(db), ThesisRepository(db)
+        feedback, search = FeedbackRepository(db), SearchRepository(db)
+        ids = seed(users, theses, feedback)
+
+        statements = []
+        conn = db.pool.acquire()
+        try:
+            def trace(sql):
+                keyword = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+                # FTS5 reads its own shadow tables ('main'.'x_fts_config') when it connects
+                if keyword in ('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'WITH') and "'main'.'" not in sql:
+                    statements.append((current[0], sql))
+            current = [None]
+            conn.set_trace_callback(trace)
+            for label, call in workload(users, theses, feedback, search, ids):
+                current[0] = label
+                call()
+            conn.set_trace_callback(None)
+
+            flagged_count = 0
+            seen = set()
+            print(f"🔍 Auditing {len(statements)} statements...\n")
+            for label, sql in statements:
+                key = (label, sql)
+                if key in seen:
+                    continue
+                seen.add(key)
+                plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql).fetchall()]
+                flagged = flag_plan(plan, allow_sort=label in EXPECTED_SORTS)
+                if flagged:
+                    flagged_count += 1
+                if flagged or verbose:
+                    print(f"{'⚠️ ' if flagged else '✅'} {label}")
+                    if label in EXPECTED_SORTS:
+                        print(f"   ℹ️  Sort expected: {EXPECTED_SORTS[label]}")
+                    print("   " + " ".join(sql.split())[:300])
+                    for detail in plan:
+                        marker = "  <-- " if detail in flagged else ""
+                        print(f"     {detail}{marker}")
+                    print()
+        finally:
+            db.pool.release(conn)
+            db.close()
+
+    if flagged_count:
+        print(f"⚠️  {flagged_count} statements scan a table or sort in a temp B-tree")
+    else:
+        print("✅ Every statement is served by an index")
+    return flagged_count
+
+if __name__ == "__main__":
+    flagged = audit(verbose="--verbose" in sys.argv)
+    if "--strict" in sys.argv and flagged:
+        sys.exit(1)
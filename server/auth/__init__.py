@@ -7,6 +7,9 @@ This package contains all authentication-related modules.
 from .auth_service import (
     verify_password,
     get_password_hash,
+    hash_passwords,
+    run_in_password_executor,
+    password_hashing_stats,
     get_user,
     authenticate_user,
     create_access_token,
@@ -20,6 +23,9 @@ from .auth_service import (
 __all__ = [
     'verify_password',
     'get_password_hash', 
+    'hash_passwords',
+    'run_in_password_executor',
+    'password_hashing_stats',
     'get_user',
     'authenticate_user',
     'create_access_token',
@@ -4,21 +4,33 @@ Authentication service for ThesisAI Tool.
 This module contains all authentication-related functions and utilities.
 """
 
+import asyncio
+import functools
+import os
 import jwt
 from jwt import PyJWTError
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
 
 from core.models import User
-from database.database import user_repo
+from database.database import user_repo, user_cache
+from database.async_database import user_repo as async_user_repo
 from config.config import config
 
 # Security setup
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
+# bcrypt takes 100-300 ms of CPU per call and releases the GIL while it runs.
+# Logins and registrations hash on this executor so the event loop (and the
+# AI feedback streams on it) keeps running; its size caps how many cores
+# password hashing can take at once.
+password_executor = ThreadPoolExecutor(max_workers=config.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_password_jobs = {"pending": 0, "completed": 0, "rejected": 0}
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -27,16 +39,57 @@ def get_password_hash(password: str) -> str:
     """Generate password hash"""
     return pwd_context.hash(password)
 
+def hash_passwords(passwords: List[str], max_workers: Optional[int] = None) -> List[str]:
+    """Hash many passwords across worker processes, keeping their order
+
+    bcrypt is deliberately CPU-bound, so bulk imports spread it over cores
+    instead of hashing one password after another.
+    """
+    if max_workers == 1 or len(passwords) < 2:
+        return [get_password_hash(password) for password in passwords]
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(get_password_hash, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+async def run_in_password_executor(func: Callable, *args) -> Any:
+    """Run a password hashing callable on the bounded password executor
+    
+    Once PASSWORD_HASH_MAX_PENDING calls are queued or running, further calls
+    are refused with 503 rather than queueing without limit.
+    """
+    if _password_jobs["pending"] >= config.PASSWORD_HASH_MAX_PENDING:
+        _password_jobs["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please try again",
+            headers={"Retry-After": "1"},
+        )
+    _password_jobs["pending"] += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, functools.partial(func, *args))
+    finally:
+        _password_jobs["pending"] -= 1
+        _password_jobs["completed"] += 1
+
+def password_hashing_stats() -> Dict[str, Any]:
+    """Get password executor metrics"""
+    return {
+        "workers": config.PASSWORD_HASH_WORKERS,
+        "max_pending": config.PASSWORD_HASH_MAX_PENDING,
+        **_password_jobs,
+    }
+
 def get_user(username: str) -> Optional[dict]:
     """Get user by username"""
     return user_repo.get_user_by_username(username)
 
-def authenticate_user(username: str, password: str) -> Optional[User]:
+async def authenticate_user(username: str, password: str) -> Optional[User]:
     """Authenticate user with username and password"""
-    user_dict = get_user(username)
+    user_dict = await async_user_repo.get_user_by_username(username)
     if not user_dict:
         return None
-    if not verify_password(password, user_dict['hashed_password']):
+    if not await run_in_password_executor(verify_password, password, user_dict['hashed_password']):
         return None
     return User(**user_dict)
 
@@ -62,10 +115,16 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     except PyJWTError:
         raise credentials_exception
     
-    user_dict = get_user(username)
+    user = user_cache.get(username)
+    if user is not None:
+        return user
+    generation = user_cache.generation
+    user_dict = await async_user_repo.get_user_by_username(username)
     if user_dict is None:
         raise credentials_exception
-    return User(**user_dict)
+    user = User(**user_dict)
+    user_cache.set(username, user, generation)
+    return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get current active user"""
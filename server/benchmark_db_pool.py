@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark pooled SQLite connections against a fresh connection per call.
+
+Runs the same primary-key user lookup used by get_current_user in both modes,
+single-threaded and from a thread pool (as FastAPI does for sync work), on a
+throwaway database so the real thesis_ai.db is never touched.
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database.connection_pool import ConnectionPool
+
+USERS = 500
+QUERIES = 5000
+THREADS = 8
+
+def setup_database(db_path: str) -> list:
+    """Create a users table with some rows and return their usernames"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE users (
+            id TEXT PRIMARY KEY,
+            username TEXT UNIQUE NOT NULL,
+            full_name TEXT NOT NULL
+        )
+    ''')
+    usernames = [f"user{i}" for i in range(USERS)]
+    conn.executemany(
+        'INSERT INTO users (id, username, full_name) VALUES (?, ?, ?)',
+        [(str(uuid.uuid4()), name, name.title()) for name in usernames]
+    )
+    conn.commit()
+    conn.close()
+    return usernames
+
+def lookup_per_call(db_path: str, username: str):
+    """Previous behaviour: open, configure row factory, query, close"""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    try:
+        return conn.execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
+    finally:
+        conn.close()
+
+def lookup_pooled(pool: ConnectionPool, username: str):
+    """Pooled behaviour: borrow, query, return"""
+    conn = pool.acquire()
+    try:
+        return conn.execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
+    finally:
+        pool.release(conn)
+
+def run(label: str, fn, usernames: list, threads: int) -> float:
+    """Run QUERIES lookups and print throughput"""
+    names = [usernames[i % len(usernames)] for i in range(QUERIES)]
+    start = time.perf_counter()
+    if threads == 1:
+        for name in names:
+            fn(name)
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(fn, names))
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<32} {elapsed * 1000:9.1f} ms  {QUERIES / elapsed:10.0f} queries/s")
+    return elapsed
+
+def main():
+    print("⏱️  Benchmarking SQLite connection handling...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        usernames = setup_database(db_path)
+        pool = ConnectionPool(db_path, max_size=THREADS)
+
+        for threads in (1, THREADS):
+            print(f"\n🧵 {threads} thread(s), {QUERIES} lookups")
+            per_call = run("connect per call", lambda n: lookup_per_call(db_path, n), usernames, threads)
+            pooled = run("pooled (WAL, mmap, cache)", lambda n: lookup_pooled(pool, n), usernames, threads)
+            print(f"   ➜ speedup: {per_call / pooled:.1f}x")
+
+        print("\n📊 Pool metrics:")
+        for key, value in pool.stats().items():
+            print(f"   - {key}: {value}")
+        pool.close()
+
+if __name__ == "__main__":
+    main()
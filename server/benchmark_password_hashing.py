@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark a login burst against a live stream on the same event loop.
+
+A ticker coroutine stands in for an SSE feedback stream, as in
+test_async_database.py. A burst of concurrent logins verifies bcrypt
+passwords either inline on the event loop (as /auth/token used to) or on the
+bounded password executor. The benchmark reports login throughput and the
+ticker's p50/p99/max lateness for both modes.
+
+    python benchmark_password_hashing.py [logins]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from auth.auth_service import get_password_hash, verify_password, run_in_password_executor
+from config.config import config
+
+TICK = 0.005
+LOGINS = 16
+
+async def ticker(stop: asyncio.Event, lags: list):
+    """Simulated stream: record how late each tick fires"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+async def inline_login(password: str, hashed: str) -> bool:
+    return verify_password(password, hashed)
+
+async def offloaded_login(password: str, hashed: str) -> bool:
+    return await run_in_password_executor(verify_password, password, hashed)
+
+async def measure(login, logins: int, hashed: str) -> dict:
+    """Run a burst of logins alongside the ticker"""
+    stop = asyncio.Event()
+    lags = []
+    stream = asyncio.create_task(ticker(stop, lags))
+    await asyncio.sleep(TICK * 2)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login("correct horse", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await stream
+    assert all(results)
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    return {
+        "logins_per_s": logins / elapsed,
+        "p50_ms": statistics.median(lags_ms),
+        "p99_ms": lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))],
+        "max_ms": lags_ms[-1],
+    }
+
+async def run_benchmark(logins: int):
+    hashed = get_password_hash("correct horse")
+    print(f"🔐 {logins} concurrent logins, stream ticking every {TICK * 1000:.0f} ms, "
+          f"{config.PASSWORD_HASH_WORKERS} hashing threads, {os.cpu_count()} CPUs\n")
+    print(f"{'mode':<22}{'logins/s':>10}{'p50 lag':>12}{'p99 lag':>12}{'max lag':>12}")
+    for label, login in (("inline on event loop", inline_login), ("password executor", offloaded_login)):
+        result = await measure(login, logins, hashed)
+        print(f"{label:<22}{result['logins_per_s']:>10.1f}{result['p50_ms']:>10.1f}ms"
+              f"{result['p99_ms']:>10.1f}ms{result['max_ms']:>10.1f}ms")
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else LOGINS))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark preview page rendering: CPU time and payload size per page.
+
+Compares the previous pipeline (render at 2x, encode PNG, decode it with
+PIL, LANCZOS downscale, encode PNG again) with rendering straight at the
+target width and encoding once as PNG, JPEG and WebP.
+
+    python benchmark_previews.py [thesis.pdf] [--width 800] [--quality 80]
+
+Without a file a sample thesis is generated with text pages, pages with a
+chart and a page with a scanned photo.
+"""
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import fitz
+from PIL import Image
+
+from file_processing.image_converter import render_pdf_page
+
+def previous_pipeline(pdf_page: fitz.Page, max_width: int) -> bytes:
+    """What convert_document_to_images did for each page before"""
+    pix = pdf_page.get_pixmap(matrix=fitz.Matrix(2.0, 2.0))
+    img = Image.open(io.BytesIO(pix.tobytes("png")))
+    if img.width > max_width:
+        img = img.resize((max_width, int(img.height * max_width / img.width)), Image.Resampling.LANCZOS)
+    img_buffer = io.BytesIO()
+    img.save(img_buffer, format='PNG')
+    return img_buffer.getvalue()
+
+def sample_thesis(pages: int = 12) -> fitz.Document:
+    """Text pages, every fourth with a chart, and a photo page at the end"""
+    document = fitz.open()
+    paragraph = ("The results indicate that the proposed method improves the accuracy of the "
+                 "classification task while keeping the computational cost comparable to the baseline. ") * 4
+    for number in range(pages - 1):
+        page = document.new_page()
+        page.insert_text((72, 60), f"{number + 1}  Chapter {number // 4 + 1}", fontsize=14)
+        page.insert_textbox(fitz.Rect(72, 80, 523, 770), paragraph * 5, fontsize=10)
+        if number % 4 == 3:
+            for bar in range(8):
+                height = 40 + (bar * 37) % 120
+                page.draw_rect(fitz.Rect(100 + bar * 45, 700 - height, 130 + bar * 45, 700),
+                               color=(0, 0, 0), fill=(0.2, 0.4, 0.8))
+    photo = Image.effect_noise((600, 800), 60).convert("RGB")
+    photo_buffer = io.BytesIO()
+    photo.save(photo_buffer, format="JPEG", quality=90)
+    document.new_page().insert_image(fitz.Rect(40, 40, 555, 800), stream=photo_buffer.getvalue())
+    return document
+
+def measure(document: fitz.Document, render) -> dict:
+    """CPU milliseconds and bytes per page"""
+    cpu_ms, sizes = [], []
+    for pdf_page in document:
+        start = time.process_time()
+        sizes.append(len(render(pdf_page)))
+        cpu_ms.append((time.process_time() - start) * 1000)
+    return {"cpu_ms": statistics.mean(cpu_ms), "p90_cpu_ms": sorted(cpu_ms)[int(len(cpu_ms) * 0.9)],
+            "kb": statistics.mean(sizes) / 1024, "max_kb": max(sizes) / 1024}
+
+def run_benchmark(path: str, width: int, quality: int):
+    document = fitz.open(path) if path else sample_thesis()
+    print(f"🖼️  {len(document)} pages of {path or 'a generated sample thesis'} at {width}px, "
+          f"quality {quality} for JPEG and WebP\n")
+    pipelines = [
+        ("2x PNG + resize (before)", lambda page: previous_pipeline(page, width)),
+        ("direct PNG", lambda page: render_pdf_page(page, width, 'png')),
+        ("direct JPEG", lambda page: render_pdf_page(page, width, 'jpeg', quality)),
+        ("direct WebP", lambda page: render_pdf_page(page, width, 'webp', quality)),
+    ]
+    print(f"{'pipeline':<26}{'CPU/page':>12}{'p90 CPU':>12}{'size/page':>12}{'max size':>12}")
+    baseline = None
+    for label, render in pipelines:
+        result = measure(document, render)
+        baseline = baseline or result
+        print(f"{label:<26}{result['cpu_ms']:>10.1f}ms{result['p90_cpu_ms']:>10.1f}ms"
+              f"{result['kb']:>10.1f}KB{result['max_kb']:>10.1f}KB"
+              f"   {baseline['cpu_ms'] / result['cpu_ms']:.1f}x faster, {baseline['kb'] / result['kb']:.1f}x smaller")
+    document.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark preview page rendering")
+    parser.add_argument("path", nargs="?", help="PDF to render (default: generated sample)")
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--quality", type=int, default=80)
+    args = parser.parse_args()
+    run_benchmark(args.path, args.width, args.quality)
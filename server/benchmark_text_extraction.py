@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark the PDF text engines: throughput, memory and text fidelity.
+
+    python benchmark_text_extraction.py [thesis.pdf ...] [--engines auto,pymupdf,pdfplumber] [--repeat 3]
+
+Without files a corpus is generated whose text is known exactly:
+
+- prose: 40 pages of running text
+- two-column: 10 pages set in two columns
+- tables: 10 pages of a paragraph and a ruled table
+- scanned: 5 pages that are only an image
+
+Each engine extracts each document in a fresh process, so the peak memory
+of one run does not hide the next; throughput is the best of --repeat runs.
+Fidelity is the word-sequence similarity to the known text (for your own
+files: to pdfplumber's output, the engine used before). "rows" is the share
+of table rows that come out on one line.
+"""
+
+import argparse
+import difflib
+import io
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import fitz
+from PIL import Image
+
+from file_processing.text_extractor import PDF_TEXT_ENGINES, iter_pdf_pages
+
+WORDS = ("thesis method results analysis data students learning model accuracy survey "
+         "research question sample interview framework evaluation literature design "
+         "development process participants findings significant improvement teaching").split()
+
+def sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 16))).capitalize() + "."
+
+def paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(sentence(rng) for _ in range(sentences))
+
+def write_corpus(directory: str) -> dict:
+    """Generate the corpus; returns {path: {"pages": [words per page], "rows": [table rows]}}"""
+    rng = random.Random(42)
+    corpus = {}
+
+    def save(name: str, document: fitz.Document, pages: list, rows: list = ()):
+        path = os.path.join(directory, f"{name}.pdf")
+        document.save(path)
+        document.close()
+        corpus[path] = {"pages": pages, "rows": list(rows)}
+
+    document, pages = fitz.open(), []
+    for _ in range(40):
+        text = paragraph(rng, 30)
+        document.new_page().insert_textbox(fitz.Rect(72, 72, 523, 770), text, fontsize=10)
+        pages.append(text.split())
+    save("prose", document, pages)
+
+    document, pages = fitz.open(), []
+    for _ in range(10):
+        page = document.new_page()
+        left, right = paragraph(rng, 14), paragraph(rng, 14)
+        page.insert_textbox(fitz.Rect(72, 72, 290, 770), left, fontsize=10)
+        page.insert_textbox(fitz.Rect(305, 72, 523, 770), right, fontsize=10)
+        pages.append(left.split() + right.split())
+    save("two-column", document, pages)
+
+    document, pages, rows = fitz.open(), [], []
+    for _ in range(10):
+        page = document.new_page()
+        intro = paragraph(rng, 3)
+        page.insert_textbox(fitz.Rect(72, 72, 523, 160), intro, fontsize=10)
+        table = [[rng.choice(WORDS) for _ in range(4)] for _ in range(12)]
+        for row_number, row in enumerate(table):
+            for column_number, cell in enumerate(row):
+                rect = fitz.Rect(72 + column_number * 110, 180 + row_number * 22,
+                                 182 + column_number * 110, 202 + row_number * 22)
+                page.draw_rect(rect, color=(0, 0, 0))
+                page.insert_text((rect.x0 + 4, rect.y1 - 7), cell, fontsize=10)
+        pages.append(intro.split() + [cell for row in table for cell in row])
+        rows.extend(" ".join(row) for row in table)
+    save("tables", document, pages, rows)
+
+    document, pages = fitz.open(), []
+    for _ in range(5):
+        photo = Image.effect_noise((500, 700), 60).convert("RGB")
+        photo_buffer = io.BytesIO()
+        photo.save(photo_buffer, format="JPEG", quality=85)
+        document.new_page().insert_image(fitz.Rect(40, 40, 555, 800), stream=photo_buffer.getvalue())
+        pages.append([])
+    save("scanned", document, pages)
+    return corpus
+
+def memory_kb(field: str) -> int:
+    """A memory figure of this process from /proc (Linux), e.g. VmRSS or VmHWM"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+def run_engine(engine: str, path: str, repeat: int) -> tuple:
+    """Extract a file in this (fresh) process: best seconds, peak memory growth in MB and page texts"""
+    try:
+        # Reset the peak RSS to the current RSS, so imports do not count
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        baseline_kb = memory_kb("VmRSS")
+        peak_kb = lambda: memory_kb("VmHWM")
+    except OSError:
+        baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_kb = lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    texts = [text for _, text in iter_pdf_pages(path, engine)]
+    peak_mb = (peak_kb() - baseline_kb) / 1024
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in iter_pdf_pages(path, engine):
+            pass
+        timings.append(time.perf_counter() - start)
+    return min(timings), peak_mb, texts
+
+def run_isolated(engine: str, path: str, repeat: int) -> tuple:
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(run_engine, engine, path, repeat).result()
+
+def similarity(expected: list, actual: list) -> float:
+    if not expected and not actual:
+        return 1.0
+    return difflib.SequenceMatcher(None, expected, actual, autojunk=False).ratio()
+
+def run_benchmark(paths: list, engines: list, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        if paths:
+            corpus = {path: None for path in paths}
+            engines = engines if "pdfplumber" in engines else engines + ["pdfplumber"]
+        else:
+            corpus = write_corpus(tmp)
+        print(f"📄 {len(corpus)} documents, engines: {', '.join(engines)}\n")
+        print(f"{'document':<16}{'engine':<12}{'pages/s':>10}{'peak MB':>10}{'fidelity':>10}{'rows':>8}")
+        for path, truth in corpus.items():
+            results = {engine: run_isolated(engine, path, repeat) for engine in engines}
+            if truth is None:
+                reference = [text.split() for text in results["pdfplumber"][2]]
+                truth = {"pages": reference, "rows": []}
+            for engine in engines:
+                seconds, peak_mb, texts = results[engine]
+                fidelity = sum(similarity(expected, text.split())
+                               for expected, text in zip(truth["pages"], texts)) / max(1, len(texts))
+                lines = {line.strip() for text in texts for line in text.splitlines()}
+                rows = (f"{sum(row in lines for row in truth['rows']) / len(truth['rows']):>7.0%}"
+                        if truth["rows"] else f"{'-':>7}")
+                print(f"{os.path.basename(path)[:15]:<16}{engine:<12}{len(texts) / seconds:>10.0f}"
+                      f"{peak_mb:>10.1f}{fidelity:>9.1%} {rows}")
+            print()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the PDF text engines")
+    parser.add_argument("paths", nargs="*", help="PDFs to extract (default: generated corpus)")
+    parser.add_argument("--engines", default=",".join(PDF_TEXT_ENGINES),
+                        help=f"Comma-separated engines (default: {','.join(PDF_TEXT_ENGINES)})")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per engine and document, best counts")
+    args = parser.parse_args()
+    run_benchmark(args.paths, args.engines.split(","), args.repeat)
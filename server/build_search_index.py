@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Add existing thesis files to the full-text search index.
+
+New uploads are indexed when they are saved and feedback is indexed as it is
+written, so this only needs to run once for theses uploaded before search
+existed (or with --all to re-extract every thesis).
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import thesis_repo
+from file_processing.blob_store import blob_store
+
+def build_thesis_index(reindex_all: bool = False):
+    """Extract and index the text of theses missing from the search index"""
+    print("🔎 Building thesis full-text search index...")
+    indexed = skipped = failed = 0
+    for thesis in thesis_repo.get_all_theses():
+        if not reindex_all and thesis_repo.is_thesis_text_indexed(thesis['id']):
+            skipped += 1
+            continue
+        if not blob_store.exists(thesis['filepath']):
+            print(f"   ⚠️  File not found for {thesis['filename']}")
+            failed += 1
+            continue
+        try:
+            thesis_repo.index_thesis_text(thesis['id'], blob_store.extract_text(thesis['filepath']))
+            indexed += 1
+        except Exception as e:
+            print(f"   ❌ Could not index {thesis['filename']}: {str(e)}")
+            failed += 1
+
+    print(f"✅ Indexed {indexed} theses ({skipped} already indexed, {failed} failed)")
+
+if __name__ == "__main__":
+    build_thesis_index(reindex_all="--all" in sys.argv)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Bulk import and export of users and theses as CSV or JSON Lines.
+
+Imports validate every row first, hash passwords across worker processes and
+insert everything in one transaction. Rows whose username or email is
+already taken (or that repeat an earlier row) are skipped and reported
+together at the end. Exports stream the tables page by page, so memory use
+stays flat however large the tables are.
+
+    python bulk_data.py import-users students.csv [--workers 8]
+    python bulk_data.py import-theses theses.jsonl
+    python bulk_data.py export-users users.csv
+    python bulk_data.py export-theses - --format jsonl > theses.jsonl
+
+User rows have username, email, full_name, role and either password
+(plain text, hashed on import) or hashed_password, plus optional id,
+supervisor_id (ID or username) and assigned_students (IDs or usernames,
+separated by ";" in CSV). Thesis rows have student_username or student_id,
+filename, filepath and optional id, status and upload_date.
+
+Exports never include password hashes, so exported users need a password
+column added before they can be imported elsewhere.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from auth import hash_passwords
+from database import user_repo, thesis_repo
+
+USER_ROLES = ('student', 'supervisor', 'admin')
+THESIS_STATUSES = ('pending', 'reviewed_by_ai', 'reviewed_by_supervisor', 'approved')
+USER_EXPORT_FIELDS = ['id', 'username', 'email', 'full_name', 'role', 'disabled', 'supervisor_id',
+                      'assigned_students', 'created_at']
+THESIS_EXPORT_FIELDS = ['id', 'student_id', 'student_username', 'filename', 'filepath', 'status', 'upload_date']
+LIST_SEPARATOR = ';'
+
+def detect_format(path: str, fmt: str = None) -> str:
+    """Pick csv or jsonl from --format or the file extension"""
+    if fmt:
+        return fmt
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+def read_rows(path: str, fmt: str):
+    """Read a file into (line number, record) pairs"""
+    if fmt == 'csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            return [(reader.line_num, {key: value for key, value in record.items() if key and value not in (None, '')})
+                    for record in reader]
+    rows = []
+    with open(path, encoding='utf-8-sig') as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                rows.append((line_number, json.loads(line)))
+    return rows
+
+def as_list(value) -> list:
+    """Read a list column, which CSV stores as separated text"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+    return list(value)
+
+def validate_user(record: dict) -> str:
+    """Return why a user record cannot be imported, or None"""
+    missing = [field for field in ('username', 'email', 'full_name', 'role') if not record.get(field)]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    if record['role'] not in USER_ROLES:
+        return f"unknown role {record['role']!r}"
+    if not record.get('password') and not record.get('hashed_password'):
+        return "missing password or hashed_password"
+    return None
+
+def validate_thesis(record: dict) -> str:
+    """Return why a thesis record cannot be imported, or None"""
+    missing = [field for field in ('filename', 'filepath') if not record.get(field)]
+    if not record.get('student_id') and not record.get('student_username'):
+        missing.insert(0, 'student_username or student_id')
+    if missing:
+        return f"missing {', '.join(missing)}"
+    if record.get('status') and record['status'] not in THESIS_STATUSES:
+        return f"unknown status {record['status']!r}"
+    if record.get('upload_date'):
+        try:
+            record['upload_date'] = datetime.fromisoformat(str(record['upload_date']))
+        except ValueError:
+            return f"invalid upload_date {record['upload_date']!r}"
+    return None
+
+def report_problems(invalid: list, conflicts: list):
+    """Print rejected and conflicting rows in one block"""
+    for line_number, reason in invalid:
+        print(f"   ❌ Line {line_number}: {reason}")
+    for line_number, conflict in conflicts:
+        print(f"   ⚠️  Line {line_number}: {conflict['field']} {conflict['value']!r} already exists")
+
+def import_users(path: str, fmt: str, workers: int = None) -> dict:
+    """Import users from a file, returning the repository result"""
+    print(f"📥 Importing users from {path}...")
+    started = time.perf_counter()
+    users, lines, invalid = [], [], []
+    for line_number, record in read_rows(path, fmt):
+        reason = validate_user(record)
+        if reason:
+            invalid.append((line_number, reason))
+            continue
+        record['assigned_students'] = as_list(record.get('assigned_students'))
+        users.append(record)
+        lines.append(line_number)
+
+    # Only hash passwords of users that will actually be inserted
+    new_users, conflicts = user_repo.split_new_users(users)
+    line_of = {id(user): line for user, line in zip(users, lines)}
+    conflicts = [(lines[conflict['index']], conflict) for conflict in conflicts]
+    to_hash = [user for user in new_users if not user.get('hashed_password')]
+    for user, hashed in zip(to_hash, hash_passwords([user['password'] for user in to_hash], max_workers=workers)):
+        user['hashed_password'] = hashed
+
+    result = user_repo.bulk_create_users(new_users)
+    # Rows taken by another writer since split_new_users
+    conflicts += [(line_of[id(new_users[conflict['index']])], conflict) for conflict in result['conflicts']]
+
+    report_problems(invalid, conflicts)
+    print(f"✅ Imported {len(result['created'])} users in {time.perf_counter() - started:.1f}s "
+          f"({len(to_hash)} passwords hashed, {len(conflicts)} conflicts, {len(invalid)} invalid rows)")
+    return result
+
+def import_theses(path: str, fmt: str) -> dict:
+    """Import theses from a file, returning the repository result"""
+    print(f"📥 Importing theses from {path}...")
+    started = time.perf_counter()
+    theses, lines, invalid = [], [], []
+    for line_number, record in read_rows(path, fmt):
+        reason = validate_thesis(record)
+        if reason:
+            invalid.append((line_number, reason))
+            continue
+        theses.append(record)
+        lines.append(line_number)
+
+    result = thesis_repo.bulk_create_theses(theses)
+    conflicts = []
+    for conflict in result['conflicts']:
+        if conflict['field'] == 'student':
+            invalid.append((lines[conflict['index']], f"unknown student {conflict['value']!r}"))
+        else:
+            conflicts.append((lines[conflict['index']], conflict))
+
+    report_problems(invalid, conflicts)
+    print(f"✅ Imported {len(result['created'])} theses in {time.perf_counter() - started:.1f}s "
+          f"({len(conflicts)} conflicts, {len(invalid)} invalid rows)")
+    return result
+
+def export_value(value, fmt: str):
+    """Convert a column value for the output format"""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, list) and fmt == 'csv':
+        return LIST_SEPARATOR.join(value)
+    return value
+
+def export_records(records, fields: list, path: str, fmt: str) -> int:
+    """Write records to a file (or stdout for "-") as they arrive, returning the count"""
+    out = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+    count = 0
+    try:
+        writer = csv.DictWriter(out, fieldnames=fields, extrasaction='ignore') if fmt == 'csv' else None
+        if writer:
+            writer.writeheader()
+        for record in records:
+            row = {field: export_value(record.get(field), fmt) for field in fields}
+            if writer:
+                writer.writerow(row)
+            else:
+                out.write(json.dumps(row, default=str) + '\n')
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return count
+
+def export_users(path: str, fmt: str, batch_size: int) -> int:
+    """Stream every user to a file"""
+    return export_records(user_repo.iter_users(batch_size), USER_EXPORT_FIELDS, path, fmt)
+
+def export_theses(path: str, fmt: str, batch_size: int) -> int:
+    """Stream every thesis to a file"""
+    return export_records(thesis_repo.iter_theses_with_details(batch_size), THESIS_EXPORT_FIELDS, path, fmt)
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import and export of users and theses")
+    parser.add_argument('command', choices=['import-users', 'import-theses', 'export-users', 'export-theses'])
+    parser.add_argument('path', help='CSV or JSONL file ("-" exports to stdout)')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help='file format (default: from the extension)')
+    parser.add_argument('--workers', type=int, help='password hashing processes (default: CPU count)')
+    parser.add_argument('--batch-size', type=int, default=500, help='rows per database page when exporting')
+    args = parser.parse_args()
+    fmt = detect_format(args.path, args.format)
+
+    if args.command == 'import-users':
+        import_users(args.path, fmt, args.workers)
+    elif args.command == 'import-theses':
+        import_theses(args.path, fmt)
+    else:
+        export = export_users if args.command == 'export-users' else export_theses
+        count = export(args.path, fmt, args.batch_size)
+        # Keep stdout clean when it carries the export
+        print(f"✅ Exported {count} {args.command.split('-')[1]}", file=sys.stderr if args.path == '-' else sys.stdout)
+
+if __name__ == "__main__":
+    main()
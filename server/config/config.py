@@ -13,6 +13,8 @@ class Config:
         self.SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-secret-key-here')
         self.ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
         self.ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv('JWT_ACCESS_TOKEN_EXPIRE_MINUTES', '30'))
+        self.PASSWORD_HASH_WORKERS = max(1, int(os.getenv('PASSWORD_HASH_WORKERS', '2')))
+        self.PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', '64'))
         
         # AI Provider API Keys
         self.OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
@@ -36,6 +38,54 @@ class Config:
         self.UPLOAD_DIR = os.getenv('UPLOAD_DIR', 'thesis_uploads')
         self.FEEDBACK_DIR = os.getenv('FEEDBACK_DIR', 'feedback_files')
         self.AI_RESPONSES_DIR = os.getenv('AI_RESPONSES_DIR', 'ai_responses')
+        self.MAX_UPLOAD_SIZE_MB = float(os.getenv('MAX_UPLOAD_SIZE_MB', '50'))
+        self.MAX_UPLOAD_SIZE = int(self.MAX_UPLOAD_SIZE_MB * 1024 * 1024)
+        self.UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(1024 * 1024)))
+        # Resumable uploads are for thesis packages too large for a single request
+        self.MAX_RESUMABLE_UPLOAD_SIZE_MB = float(os.getenv('MAX_RESUMABLE_UPLOAD_SIZE_MB', '200'))
+        self.MAX_RESUMABLE_UPLOAD_SIZE = int(self.MAX_RESUMABLE_UPLOAD_SIZE_MB * 1024 * 1024)
+        self.RESUMABLE_UPLOAD_CHUNK_SIZE = int(os.getenv('RESUMABLE_UPLOAD_CHUNK_SIZE', str(8 * 1024 * 1024)))
+        self.RESUMABLE_UPLOAD_TTL_HOURS = float(os.getenv('RESUMABLE_UPLOAD_TTL_HOURS', '24'))
+        self.STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'local').lower()
+        self.STORAGE_CACHE_DIR = os.getenv('STORAGE_CACHE_DIR', 'storage_cache')
+        self.STORAGE_CACHE_MAX_MB = int(os.getenv('STORAGE_CACHE_MAX_MB', '2048'))
+        self.S3_BUCKET = os.getenv('S3_BUCKET', '')
+        self.S3_PREFIX = os.getenv('S3_PREFIX', '')
+        self.S3_ENDPOINT_URL = os.getenv('S3_ENDPOINT_URL', '')
+        self.S3_REGION = os.getenv('S3_REGION', '')
+        self.S3_ACCESS_KEY_ID = os.getenv('S3_ACCESS_KEY_ID', '')
+        self.S3_SECRET_ACCESS_KEY = os.getenv('S3_SECRET_ACCESS_KEY', '')
+        self.S3_PRESIGNED_URL_EXPIRY = int(os.getenv('S3_PRESIGNED_URL_EXPIRY', '300'))
+        
+        # Preview Configuration
+        self.PREVIEW_WIDTH = int(os.getenv('PREVIEW_WIDTH', '800'))
+        self.PREVIEW_MAX_WIDTH = int(os.getenv('PREVIEW_MAX_WIDTH', '1600'))
+        self.PREVIEW_FORMAT = os.getenv('PREVIEW_FORMAT', 'webp').lower()
+        self.PREVIEW_QUALITY = int(os.getenv('PREVIEW_QUALITY', '80'))
+        self.PREVIEW_THUMBNAIL_WIDTH = int(os.getenv('PREVIEW_THUMBNAIL_WIDTH', '160'))
+        self.PREVIEW_WORKERS = max(0, int(os.getenv('PREVIEW_WORKERS', str(min(4, os.cpu_count() or 1)))))
+        self.LIBREOFFICE_PATH = os.getenv('LIBREOFFICE_PATH', '')
+        self.OFFICE_CONVERSION_TIMEOUT = int(os.getenv('OFFICE_CONVERSION_TIMEOUT', '120'))
+        self.OFFICE_CONVERSION_WORKERS = int(os.getenv('OFFICE_CONVERSION_WORKERS', '2'))
+        
+        # Text Extraction Configuration
+        self.PDF_TEXT_ENGINE = os.getenv('PDF_TEXT_ENGINE', 'auto').lower()
+        
+        # Database Configuration
+        self.DB_BACKEND = os.getenv('DB_BACKEND', 'sqlite').lower()
+        self.DATABASE_URL = os.getenv('DATABASE_URL', '')
+        self.DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))
+        self.DB_PATH = os.getenv('DB_PATH', 'thesis_ai.db')
+        self.DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+        self.DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+        self.DB_BUSY_TIMEOUT_MS = int(os.getenv('DB_BUSY_TIMEOUT_MS', '5000'))
+        self.DB_CACHE_SIZE_KB = int(os.getenv('DB_CACHE_SIZE_KB', '16384'))
+        self.DB_MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', '268435456'))
+        self.DB_MIGRATION_BATCH_SIZE = int(os.getenv('DB_MIGRATION_BATCH_SIZE', '5000'))
+        self.FEEDBACK_COMPRESSION = os.getenv('FEEDBACK_COMPRESSION', 'false').lower() == 'true'
+        self.FEEDBACK_COMPRESSION_MIN_BYTES = int(os.getenv('FEEDBACK_COMPRESSION_MIN_BYTES', '1024'))
+        self.USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', '30'))
+        self.USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '1024'))
         
         # AI Configuration
         self.AI_MAX_TOKENS = int(os.getenv('AI_MAX_TOKENS', '18000'))
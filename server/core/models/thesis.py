@@ -18,4 +18,5 @@ class Thesis(BaseModel):
     upload_date: datetime = Field(default_factory=datetime.now)
     status: str = "pending"  # pending, reviewed_by_ai, reviewed_by_supervisor, approved
     ai_feedback_id: Optional[str] = None
-    supervisor_feedback_id: Optional[str] = None 
\ No newline at end of file
+    supervisor_feedback_id: Optional[str] = None
+    content_hash: Optional[str] = None  # blob shared by theses with identical content 
\ No newline at end of file
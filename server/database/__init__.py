@@ -4,11 +4,25 @@ Database package for ThesisAI Tool.
 This package contains all database-related modules including repositories.
 """
 
-from .database import db_manager, user_repo, thesis_repo, feedback_repo
+from .database import db_manager, user_repo, thesis_repo, feedback_repo, search_repo, user_cache
+from .async_database import (
+    user_repo as async_user_repo,
+    thesis_repo as async_thesis_repo,
+    feedback_repo as async_feedback_repo,
+    search_repo as async_search_repo,
+    run_in_db_executor
+)
 
 __all__ = [
     'db_manager',
     'user_repo', 
     'thesis_repo',
-    'feedback_repo'
+    'feedback_repo',
+    'search_repo',
+    'user_cache',
+    'async_user_repo',
+    'async_thesis_repo',
+    'async_feedback_repo',
+    'async_search_repo',
+    'run_in_db_executor'
 ] 
\ No newline at end of file
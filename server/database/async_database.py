@@ -0,0 +1,61 @@
+"""
+Async database access for ThesisAI Tool.
+
+The repositories in database.py are synchronous. Calling them straight from
+async endpoints blocks the event loop that also carries the AI feedback
+streams, so this module wraps each repository so that every public method
+returns an awaitable that runs on a dedicated database thread executor.
+Method names and return values are unchanged.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from config.config import config
+from .database import (
+    user_repo as sync_user_repo,
+    thesis_repo as sync_thesis_repo,
+    feedback_repo as sync_feedback_repo,
+    search_repo as sync_search_repo
+)
+
+# One worker per pooled connection, so queued queries wait here rather than
+# holding a thread while blocked on the connection pool.
+db_executor = ThreadPoolExecutor(max_workers=config.DB_POOL_SIZE, thread_name_prefix="db")
+
+async def run_in_db_executor(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking database callable on the database executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(func, *args, **kwargs))
+
+class AsyncRepository:
+    """Awaitable view of a synchronous repository"""
+
+    def __init__(self, repository: Any):
+        self._repository = repository
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._repository, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def method(*args, **kwargs):
+            return await run_in_db_executor(attr, *args, **kwargs)
+
+        # Cache the wrapper so later lookups skip __getattr__
+        setattr(self, name, method)
+        return method
+
+    @property
+    def sync(self) -> Any:
+        """The wrapped synchronous repository"""
+        return self._repository
+
+# Global async repository instances
+user_repo = AsyncRepository(sync_user_repo)
+thesis_repo = AsyncRepository(sync_thesis_repo)
+feedback_repo = AsyncRepository(sync_feedback_repo)
+search_repo = AsyncRepository(sync_search_repo)
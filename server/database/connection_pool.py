@@ -0,0 +1,243 @@
+"""
+SQLite connection pool for ThesisAI Tool.
+
+This module keeps a bounded set of long-lived SQLite connections that are
+configured once (WAL journal, synchronous mode, cache and mmap sizes, busy
+timeout) and shared between FastAPI's worker threads.
+
+A thread that already holds a connection gets it again for nested
+repository calls. When the outer scope has a transaction open, the nested
+scope works in a SAVEPOINT, so its commit() or rollback() settles only its
+own statements and the outer scope still decides about the transaction.
+"""
+
+import sqlite3
+import threading
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes available in time"""
+
+class NestedConnection:
+    """The held connection as seen by a nested scope inside an open transaction
+
+    commit() releases the scope's savepoint into the outer transaction and
+    rollback() undoes the scope's statements only; everything else goes to
+    the underlying connection.
+    """
+
+    def __init__(self, conn, savepoint: str):
+        self._conn = conn
+        self._savepoint = savepoint
+        conn.execute(f"SAVEPOINT {savepoint}")
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def commit(self) -> None:
+        self._conn.execute(f"RELEASE SAVEPOINT {self._savepoint}")
+        self._conn.execute(f"SAVEPOINT {self._savepoint}")
+
+    def rollback(self) -> None:
+        self._conn.execute(f"ROLLBACK TO SAVEPOINT {self._savepoint}")
+
+    def close_scope(self) -> None:
+        """Hand the scope's remaining work to the outer transaction"""
+        self._conn.execute(f"RELEASE SAVEPOINT {self._savepoint}")
+
+class ConnectionPool:
+    """Thread-safe bounded pool of configured SQLite connections"""
+
+    def __init__(
+        self,
+        db_path: str,
+        max_size: int = 5,
+        timeout: float = 30.0,
+        busy_timeout_ms: int = 5000,
+        cache_size_kb: int = 16384,
+        mmap_size: int = 268435456,
+        journal_mode: str = "WAL",
+        synchronous: str = "NORMAL",
+    ):
+        self.db_path = db_path
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+
+        self._idle: List[sqlite3.Connection] = []
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        # Connection held by the current thread, so nested repository calls
+        # (e.g. create_user -> get_user_by_username) reuse it instead of
+        # taking a second slot and risking pool exhaustion.
+        self._local = threading.local()
+
+        # Metrics
+        self._created = 0
+        self._acquired = 0
+        self._reused = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+        self._discarded = 0
+
+    def _create_connection(self) -> sqlite3.Connection:
+        """Open and configure a new connection"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        # Negative cache_size is expressed in KiB rather than pages
+        conn.execute(f"PRAGMA cache_size={-abs(int(self.cache_size_kb))}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _in_transaction(self, conn) -> bool:
+        """Whether a transaction is open on the connection"""
+        return conn.in_transaction
+
+    def _reset_connection(self, conn) -> None:
+        """Make a returned connection safe to hand out again"""
+        # Never hand out a connection with a half-finished transaction
+        if conn.in_transaction:
+            conn.rollback()
+
+    def acquire(self) -> sqlite3.Connection:
+        """Take a connection from the pool, opening one if below max_size"""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            with self._cond:
+                self._reused += 1
+            self._local.depth += 1
+            if self._in_transaction(held):
+                # Keep nested commits and rollbacks out of the caller's transaction
+                return NestedConnection(held, f"nested_{self._local.depth}")
+            return held
+
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            waited = False
+            start = time.monotonic()
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # Reserve the slot before releasing the lock to connect
+                    self._size += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.timeout}s waiting for a database connection"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+            if waited:
+                self._waits += 1
+                self._wait_time += time.monotonic() - start
+            self._acquired += 1
+
+        if conn is None:
+            try:
+                conn = self._create_connection()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._created += 1
+
+        self._local.conn = conn
+        self._local.depth = 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a connection to the pool"""
+        if isinstance(conn, NestedConnection):
+            try:
+                conn.close_scope()
+            except Exception as e:
+                # The outer transaction was aborted; the outer scope rolls it back
+                logger.warning(f"Could not release nested savepoint: {e}")
+            finally:
+                self._local.depth -= 1
+            return
+        if getattr(self._local, "conn", None) is conn:
+            self._local.depth -= 1
+            if self._local.depth > 0:
+                return
+            self._local.conn = None
+
+        healthy = True
+        try:
+            self._reset_connection(conn)
+        except Exception as e:
+            logger.warning(f"Discarding pooled connection after rollback failure: {e}")
+            healthy = False
+
+        with self._cond:
+            if healthy and not self._closed:
+                self._idle.append(conn)
+            else:
+                self._size -= 1
+                self._discarded += 1
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._cond.notify()
+
+    def close(self) -> None:
+        """Close all idle connections; in-use connections close on release"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn = self._idle.pop()
+                self._size -= 1
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool metrics"""
+        with self._cond:
+            return {
+                "db_path": self.db_path,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "created": self._created,
+                "acquired": self._acquired,
+                "reused_in_thread": self._reused,
+                "waits": self._waits,
+                "avg_wait_ms": round(self._wait_time / self._waits * 1000, 3) if self._waits else 0.0,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "journal_mode": self.journal_mode,
+                "synchronous": self.synchronous,
+            }
@@ -1,102 +1,110 @@
 import sqlite3
 import os
+import re
 import json
+import base64
+import zlib
+import threading
 import uuid
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from contextlib import contextmanager
 import logging
 
+from config.config import config
+from .connection_pool import ConnectionPool
+from .migrations import MigrationRunner
+from .user_cache import UserCache
+
 logger = logging.getLogger(__name__)
 
+# Values per IN (...) lookup in bulk operations
+BULK_CHUNK_SIZE = 500
+
+# Filter on theses (alias t) of the students assigned to a supervisor ID
+ASSIGNED_TO_SUPERVISOR = (
+    "EXISTS (SELECT 1 FROM supervisor_assignments sa WHERE sa.student_id = t.student_id AND sa.supervisor_id = ?)"
+)
+
+def decode_feedback_content(content) -> str:
+    """Return feedback content as text, decompressing zlib blobs"""
+    if isinstance(content, bytes):
+        return zlib.decompress(content).decode('utf-8')
+    return content
+
 class DatabaseManager:
-    """Production-ready SQLite database manager with proper connection handling"""
+    """Production-ready SQLite database manager with pooled connection handling"""
     
-    def __init__(self, db_path: str = "thesis_ai.db"):
+    # Repositories check this where SQLite and PostgreSQL need different SQL
+    dialect = 'sqlite'
+    
+    def __init__(self, db_path: str = "thesis_ai.db", pool_size: int = 5, pool_timeout: float = 30.0,
+                 busy_timeout_ms: int = 5000, cache_size_kb: int = 16384, mmap_size: int = 268435456,
+                 migration_batch_size: int = 5000):
         self.db_path = db_path
-        self._init_database()
+        self.migration_batch_size = migration_batch_size
+        self.pool = ConnectionPool(
+            db_path,
+            max_size=pool_size,
+            timeout=pool_timeout,
+            busy_timeout_ms=busy_timeout_ms,
+            cache_size_kb=cache_size_kb,
+            mmap_size=mmap_size,
+        )
+        self._migrated = False
+        self._migration_lock = threading.Lock()
+    
+    def migrate(self) -> List[int]:
+        """Bring the database schema up to the latest version, returning the versions applied
+        
+        Nothing is migrated when the manager is created, so importing the
+        app leaves the database file alone. The app migrates on startup;
+        any other user migrates on its first connection.
+        """
+        with self._migration_lock:
+            if self._migrated:
+                return []
+            conn = self.pool.acquire()
+            try:
+                applied = self._run_migrations(conn)
+            finally:
+                self.pool.release(conn)
+            self._migrated = True
+        if applied:
+            logger.info(f"Database schema of {self.db_path} migrated to version {applied[-1]}")
+        return applied
     
-    def _init_database(self):
-        """Initialize database with tables"""
+    def _run_migrations(self, conn) -> List[int]:
+        return MigrationRunner(conn, batch_size=self.migration_batch_size).migrate()
+    
+    def schema_version(self) -> int:
+        """Get the schema version recorded in the database"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Users table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    id TEXT PRIMARY KEY,
-                    username TEXT UNIQUE NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    full_name TEXT NOT NULL,
-                    hashed_password TEXT NOT NULL,
-                    role TEXT NOT NULL CHECK (role IN ('student', 'supervisor', 'admin')),
-                    disabled BOOLEAN DEFAULT FALSE,
-                    supervisor_id TEXT,
-                    assigned_students TEXT DEFAULT '[]',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (supervisor_id) REFERENCES users (username)
-                )
-            ''')
-            
-            # Theses table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS theses (
-                    id TEXT PRIMARY KEY,
-                    student_id TEXT NOT NULL,
-                    filename TEXT NOT NULL,
-                    filepath TEXT NOT NULL,
-                    upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    status TEXT DEFAULT 'pending' CHECK (status IN ('pending', 'reviewed_by_ai', 'reviewed_by_supervisor', 'approved')),
-                    ai_feedback_id TEXT,
-                    supervisor_feedback_id TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (student_id) REFERENCES users (id),
-                    FOREIGN KEY (ai_feedback_id) REFERENCES feedback (id),
-                    FOREIGN KEY (supervisor_feedback_id) REFERENCES feedback (id)
-                )
-            ''')
-            
-            # Feedback table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS feedback (
-                    id TEXT PRIMARY KEY,
-                    thesis_id TEXT NOT NULL,
-                    reviewer_id TEXT NOT NULL,
-                    content TEXT NOT NULL,
-                    is_ai_feedback BOOLEAN NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (thesis_id) REFERENCES theses (id),
-                    FOREIGN KEY (reviewer_id) REFERENCES users (id)
-                )
-            ''')
-            
-            # Create indexes for better performance
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_theses_student_id ON theses(student_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_theses_status ON theses(status)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_feedback_thesis_id ON feedback(thesis_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_feedback_reviewer_id ON feedback(reviewer_id)')
-            
-            conn.commit()
+            return MigrationRunner(conn).current_version()
     
     @contextmanager
     def get_connection(self):
-        """Get database connection with proper error handling"""
+        """Borrow a pooled database connection with proper error handling"""
+        if not self._migrated:
+            self.migrate()
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            conn.row_factory = sqlite3.Row  # Enable dict-like access
+            conn = self.pool.acquire()
             yield conn
         except sqlite3.Error as e:
             logger.error(f"Database error: {e}")
             raise
         finally:
             if conn:
-                conn.close()
+                self.pool.release(conn)
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool metrics"""
+        return self.pool.stats()
+    
+    def close(self):
+        """Close all pooled connections"""
+        self.pool.close()
     
     def dict_from_row(self, row) -> Dict[str, Any]:
         """Convert sqlite3.Row to dict"""
@@ -116,12 +124,145 @@ class DatabaseManager:
     def json_from_list(self, lst: List[str]) -> str:
         """Convert list to JSON string"""
         return json.dumps(lst) if lst else '[]'
+    
+    def format_timestamp(self, value) -> Optional[str]:
+        """Convert a datetime or date string to SQLite's CURRENT_TIMESTAMP format"""
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            return value.strftime('%Y-%m-%d %H:%M:%S')
+        return str(value)
+    
+    def encode_cursor(self, sort_value: Any, row_id: str) -> str:
+        """Encode the last row of a page as an opaque keyset cursor"""
+        raw = json.dumps([sort_value, row_id]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+    
+    def decode_cursor(self, cursor: str) -> List[Any]:
+        """Decode a keyset cursor, raising ValueError if it is malformed"""
+        try:
+            sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (ValueError, TypeError, UnicodeError) as e:
+            raise ValueError("Invalid pagination cursor") from e
+        return [sort_value, row_id]
+    
+    # Full-text rows are found through fts_rowids: an FTS5 table can only look
+    # up rows by rowid or MATCH, and a WHERE on its ID column reads every row
+    def replace_search_row(self, cursor, table: str, key: str, row_id: str, content: str):
+        """Index content under row_id in a full-text table, replacing its earlier row"""
+        self.delete_search_rows(cursor, table, key, '= ?', (row_id,))
+        cursor.execute(f'INSERT INTO {table} ({key}, content) VALUES (?, ?)', (row_id, content))
+        cursor.execute('INSERT INTO fts_rowids (fts_table, source_id, fts_rowid) VALUES (?, ?, ?)',
+                       (table, row_id, cursor.lastrowid))
+    
+    def delete_search_rows(self, cursor, table: str, key: str, condition: str, params: tuple):
+        """Remove the full-text rows whose ID matches condition (e.g. '= ?' or 'IN (SELECT ...)')"""
+        cursor.execute(f'''
+            DELETE FROM {table} WHERE rowid IN (
+                SELECT fts_rowid FROM fts_rowids WHERE fts_table = ? AND source_id {condition}
+            )
+        ''', (table, *params))
+        cursor.execute(f'DELETE FROM fts_rowids WHERE fts_table = ? AND source_id {condition}', (table, *params))
+    
+    def has_search_row(self, cursor, table: str, key: str, row_id: str) -> bool:
+        """Check whether row_id is indexed in a full-text table"""
+        cursor.execute('SELECT 1 FROM fts_rowids WHERE fts_table = ? AND source_id = ?', (table, row_id))
+        return cursor.fetchone() is not None
+    
+    def fetch_keyset_page(self, query: str, clauses: List[str], values: List[Any], sort_column: str,
+                          id_column: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                          convert=None) -> Dict[str, Any]:
+        """Run a newest-first listing query with keyset (cursor) pagination
+        
+        Rows are ordered by (sort_column, id_column) descending. When limit is
+        set, one extra row is fetched to tell whether a next page exists.
+        """
+        clauses = list(clauses)
+        values = list(values)
+        if cursor:
+            clauses.append(f"({sort_column}, {id_column}) < (?, ?)")
+            values.extend(self.decode_cursor(cursor))
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += f" ORDER BY {sort_column} DESC, {id_column} DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            values.append(limit + 1)
+        
+        with self.get_connection() as conn:
+            cursor_obj = conn.cursor()
+            cursor_obj.execute(query, values)
+            rows = cursor_obj.fetchall()
+        
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = self.encode_cursor(last[sort_column.split('.')[-1]], last[id_column.split('.')[-1]])
+        
+        convert = convert or self.dict_from_row
+        return {"items": [convert(row) for row in rows], "next_cursor": next_cursor}
 
 class UserRepository:
     """Repository for user operations"""
     
-    def __init__(self, db_manager: DatabaseManager):
+    # assigned_students is derived from supervisor_assignments; the legacy JSON
+    # column of the same name is no longer read or written.
+    USER_SELECT = '''
+        SELECT u.id, u.username, u.email, u.full_name, u.hashed_password, u.role,
+               u.disabled, u.supervisor_id, u.created_at, u.updated_at,
+               (SELECT json_group_array(sa.student_id) FROM supervisor_assignments sa
+                WHERE sa.supervisor_id = u.id) AS assigned_students
+        FROM users u
+    '''
+    
+    # List views never need the password hash, so they skip it
+    USER_LIST_SELECT = '''
+        SELECT u.id, u.username, u.email, u.full_name, u.role,
+               u.disabled, u.supervisor_id, u.created_at, u.updated_at,
+               (SELECT json_group_array(sa.student_id) FROM supervisor_assignments sa
+                WHERE sa.supervisor_id = u.id) AS assigned_students
+        FROM users u
+    '''
+    
+    def __init__(self, db_manager: DatabaseManager, cache: Optional[UserCache] = None):
         self.db = db_manager
+        # Authenticated-user cache; every write below drops the entries it affects
+        self.cache = cache
+    
+    def _invalidate_cached(self, username: Optional[str] = None):
+        """Drop a cached user, or every cached user when no username is given"""
+        if self.cache is None:
+            return
+        if username:
+            self.cache.invalidate(username)
+        else:
+            self.cache.clear()
+    
+    def _user_from_row(self, row) -> Dict[str, Any]:
+        """Convert a USER_SELECT or USER_LIST_SELECT row to a user dict"""
+        user_dict = self.db.dict_from_row(row)
+        user_dict['assigned_students'] = self.db.list_from_json(user_dict['assigned_students'])
+        return user_dict
+    
+    def _set_student_supervisor(self, cursor, student_id: str, supervisor_ref: Optional[str]):
+        """Point a student's assignment at one supervisor (by ID or username)"""
+        cursor.execute('DELETE FROM supervisor_assignments WHERE student_id = ?', (student_id,))
+        if supervisor_ref:
+            cursor.execute('''
+                INSERT INTO supervisor_assignments (supervisor_id, student_id)
+                SELECT id, ? FROM users WHERE id = ? OR username = ?
+                ON CONFLICT DO NOTHING
+            ''', (student_id, supervisor_ref, supervisor_ref))
+    
+    def _add_assignments(self, cursor, supervisor_id: str, student_refs: List[str]) -> int:
+        """Link students (by ID or username) to a supervisor, returning the number of new links"""
+        cursor.executemany('''
+            INSERT INTO supervisor_assignments (supervisor_id, student_id)
+            SELECT ?, id FROM users WHERE id = ? OR username = ?
+            ON CONFLICT DO NOTHING
+        ''', [(supervisor_id, ref, ref) for ref in student_refs])
+        return cursor.rowcount
     
     def create_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new user"""
@@ -132,8 +273,8 @@ class UserRepository:
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                INSERT INTO users (id, username, email, full_name, hashed_password, role, supervisor_id, assigned_students)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO users (id, username, email, full_name, hashed_password, role, supervisor_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
             ''', (
                 user_data['id'],
                 user_data['username'],
@@ -141,61 +282,72 @@ class UserRepository:
                 user_data['full_name'],
                 user_data['hashed_password'],
                 user_data['role'],
-                user_data.get('supervisor_id'),
-                self.db.json_from_list(user_data.get('assigned_students', []))
+                user_data.get('supervisor_id')
             ))
+            if user_data.get('assigned_students'):
+                self._add_assignments(cursor, user_data['id'], user_data['assigned_students'])
+            if user_data['role'] == 'student' and user_data.get('supervisor_id'):
+                self._set_student_supervisor(cursor, user_data['id'], user_data['supervisor_id'])
             conn.commit()
+            if user_data.get('assigned_students') or user_data.get('supervisor_id'):
+                # A supervisor's assigned_students changed
+                self._invalidate_cached()
             return self.get_user_by_username(user_data['username'])
     
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM users WHERE username = ?', (username,))
+            cursor.execute(self.USER_SELECT + ' WHERE u.username = ?', (username,))
             row = cursor.fetchone()
-            if row:
-                user_dict = self.db.dict_from_row(row)
-                user_dict['assigned_students'] = self.db.list_from_json(user_dict['assigned_students'])
-                return user_dict
-            return None
+            return self._user_from_row(row) if row else None
     
     def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user by ID"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
+            cursor.execute(self.USER_SELECT + ' WHERE u.id = ?', (user_id,))
             row = cursor.fetchone()
-            if row:
-                user_dict = self.db.dict_from_row(row)
-                user_dict['assigned_students'] = self.db.list_from_json(user_dict['assigned_students'])
-                return user_dict
-            return None
+            return self._user_from_row(row) if row else None
     
     def get_all_users(self) -> List[Dict[str, Any]]:
         """Get all users"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM users ORDER BY created_at DESC')
+            cursor.execute(self.USER_LIST_SELECT + ' ORDER BY u.created_at DESC')
             rows = cursor.fetchall()
-            users = []
-            for row in rows:
-                user_dict = self.db.dict_from_row(row)
-                user_dict['assigned_students'] = self.db.list_from_json(user_dict['assigned_students'])
-                users.append(user_dict)
-            return users
+            return [self._user_from_row(row) for row in rows]
+    
+    def get_users_page(self, limit: Optional[int] = None, cursor: Optional[str] = None,
+                       role: Optional[str] = None, supervisor_id: Optional[str] = None,
+                       date_from=None, date_to=None) -> Dict[str, Any]:
+        """Get users newest first, filtered and paginated by created_at"""
+        clauses = []
+        values = []
+        if role:
+            clauses.append("u.role = ?")
+            values.append(role)
+        if supervisor_id:
+            clauses.append("EXISTS (SELECT 1 FROM supervisor_assignments sa WHERE sa.student_id = u.id AND sa.supervisor_id = ?)")
+            values.append(supervisor_id)
+        if date_from:
+            clauses.append("u.created_at >= ?")
+            values.append(self.db.format_timestamp(date_from))
+        if date_to:
+            clauses.append("u.created_at < ?")
+            values.append(self.db.format_timestamp(date_to))
+        return self.db.fetch_keyset_page(
+            self.USER_LIST_SELECT, clauses, values, "u.created_at", "u.id",
+            limit=limit, cursor=cursor, convert=self._user_from_row
+        )
     
     def get_users_by_role(self, role: str) -> List[Dict[str, Any]]:
         """Get users by role"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM users WHERE role = ? ORDER BY full_name', (role,))
+            cursor.execute(self.USER_LIST_SELECT + ' WHERE u.role = ? ORDER BY u.full_name', (role,))
             rows = cursor.fetchall()
-            users = []
-            for row in rows:
-                user_dict = self.db.dict_from_row(row)
-                user_dict['assigned_students'] = self.db.list_from_json(user_dict['assigned_students'])
-                users.append(user_dict)
-            return users
+            return [self._user_from_row(row) for row in rows]
     
     def update_user(self, username: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Update user"""
@@ -207,14 +359,20 @@ class UserRepository:
             values = []
             
             for key, value in updates.items():
-                if key == 'assigned_students':
-                    set_clauses.append(f"{key} = ?")
-                    values.append(self.db.json_from_list(value))
-                elif key in ['username', 'email', 'full_name', 'hashed_password', 'role', 'supervisor_id', 'disabled']:
+                if key in ['username', 'email', 'full_name', 'hashed_password', 'role', 'supervisor_id', 'disabled']:
                     set_clauses.append(f"{key} = ?")
                     values.append(value)
             
+            if 'assigned_students' in updates:
+                cursor.execute('SELECT id FROM users WHERE username = ?', (username,))
+                user = cursor.fetchone()
+                if user:
+                    cursor.execute('DELETE FROM supervisor_assignments WHERE supervisor_id = ?', (user['id'],))
+                    self._add_assignments(cursor, user['id'], updates['assigned_students'] or [])
+            
             if not set_clauses:
+                conn.commit()
+                self._invalidate_cached(username)
                 return self.get_user_by_username(username)
             
             set_clauses.append("updated_at = CURRENT_TIMESTAMP")
@@ -223,6 +381,8 @@ class UserRepository:
             query = f"UPDATE users SET {', '.join(set_clauses)} WHERE username = ?"
             cursor.execute(query, values)
             conn.commit()
+            # Renames and supervisor changes reach other cached users
+            self._invalidate_cached(None if {'username', 'supervisor_id'} & updates.keys() else username)
             
             return self.get_user_by_username(username)
     
@@ -231,120 +391,226 @@ class UserRepository:
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
             
-            # Get current supervisor
-            cursor.execute('SELECT supervisor_id FROM users WHERE username = ?', (student_username,))
-            current_supervisor = cursor.fetchone()
-            
-            # Remove student from previous supervisor's assigned_students
-            if current_supervisor and current_supervisor['supervisor_id']:
-                cursor.execute('SELECT assigned_students FROM users WHERE username = ?', (current_supervisor['supervisor_id'],))
-                prev_supervisor = cursor.fetchone()
-                if prev_supervisor:
-                    assigned_students = self.db.list_from_json(prev_supervisor['assigned_students'])
-                    if student_username in assigned_students:
-                        assigned_students.remove(student_username)
-                        cursor.execute('UPDATE users SET assigned_students = ? WHERE username = ?', 
-                                     (self.db.json_from_list(assigned_students), current_supervisor['supervisor_id']))
-            
             # Update student's supervisor
             cursor.execute('UPDATE users SET supervisor_id = ? WHERE username = ?', (supervisor_username, student_username))
             
-            # Add student to new supervisor's assigned_students
-            cursor.execute('SELECT assigned_students FROM users WHERE username = ?', (supervisor_username,))
-            supervisor = cursor.fetchone()
-            if supervisor:
-                assigned_students = self.db.list_from_json(supervisor['assigned_students'])
-                if student_username not in assigned_students:
-                    assigned_students.append(student_username)
-                    cursor.execute('UPDATE users SET assigned_students = ? WHERE username = ?', 
-                                 (self.db.json_from_list(assigned_students), supervisor_username))
+            # Move the student's assignment to the new supervisor
+            cursor.execute('''
+                DELETE FROM supervisor_assignments
+                WHERE student_id = (SELECT id FROM users WHERE username = ?)
+            ''', (student_username,))
+            cursor.execute('''
+                INSERT INTO supervisor_assignments (supervisor_id, student_id)
+                SELECT sup.id, st.id FROM users sup, users st
+                WHERE sup.username = ? AND st.username = ?
+                ON CONFLICT DO NOTHING
+            ''', (supervisor_username, student_username))
             
             conn.commit()
+            self._invalidate_cached()
             return True
     
+    def assign_students_to_supervisor(self, supervisor_id: str, student_ids: List[str]) -> int:
+        """Assign many students to one supervisor in a single transaction"""
+        if not student_ids:
+            return 0
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            updated = 0
+            # Chunked to stay under SQLite's host parameter limit
+            for start in range(0, len(student_ids), BULK_CHUNK_SIZE):
+                chunk = student_ids[start:start + BULK_CHUNK_SIZE]
+                placeholders = ', '.join('?' for _ in chunk)
+                cursor.execute(f'DELETE FROM supervisor_assignments WHERE student_id IN ({placeholders})', chunk)
+                cursor.executemany(
+                    'INSERT INTO supervisor_assignments (supervisor_id, student_id) VALUES (?, ?) ON CONFLICT DO NOTHING',
+                    [(supervisor_id, student_id) for student_id in chunk]
+                )
+                cursor.execute(
+                    f'UPDATE users SET supervisor_id = ?, updated_at = CURRENT_TIMESTAMP WHERE id IN ({placeholders})',
+                    [supervisor_id, *chunk]
+                )
+                updated += cursor.rowcount
+            conn.commit()
+            self._invalidate_cached()
+            return updated
+    
     def add_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Add a new user (alias for create_user)"""
         return self.create_user(user_data)
     
+    def split_new_users(self, users_data: List[Dict[str, Any]]):
+        """Separate users that can be created from ones whose username or email is taken
+        
+        A user conflicts if the database already has its username or email,
+        or an earlier entry of users_data does. Returns (new_users, conflicts);
+        each conflict records the user's position in users_data.
+        """
+        taken = {'username': set(), 'email': set()}
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            for column in taken:
+                values = sorted({user[column] for user in users_data})
+                # Chunked to stay under SQLite's host parameter limit
+                for start in range(0, len(values), BULK_CHUNK_SIZE):
+                    chunk = values[start:start + BULK_CHUNK_SIZE]
+                    placeholders = ', '.join('?' for _ in chunk)
+                    cursor.execute(f'SELECT {column} FROM users WHERE {column} IN ({placeholders})', chunk)
+                    taken[column].update(row[column] for row in cursor.fetchall())
+        
+        new_users, conflicts = [], []
+        for index, user in enumerate(users_data):
+            clash = next((field for field in ('username', 'email') if user[field] in taken[field]), None)
+            if clash:
+                conflicts.append({'index': index, 'username': user['username'], 'field': clash, 'value': user[clash]})
+                continue
+            taken['username'].add(user['username'])
+            taken['email'].add(user['email'])
+            new_users.append(user)
+        return new_users, conflicts
+    
+    def bulk_create_users(self, users_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Create many users in one transaction
+        
+        Conflicting users (see split_new_users) are skipped and returned in
+        "conflicts". Supervisor links are resolved after every row is
+        inserted, so they may point at users created in the same batch.
+        """
+        new_users, conflicts = self.split_new_users(users_data)
+        rows = [dict(user, id=user.get('id') or str(uuid.uuid4())) for user in new_users]
+        
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO users (id, username, email, full_name, hashed_password, role, supervisor_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [(user['id'], user['username'], user['email'], user['full_name'], user['hashed_password'],
+                   user['role'], user.get('supervisor_id')) for user in rows])
+            cursor.executemany('''
+                INSERT INTO supervisor_assignments (supervisor_id, student_id)
+                SELECT id, ? FROM users WHERE id = ? OR username = ?
+                ON CONFLICT DO NOTHING
+            ''', [(user['id'], user['supervisor_id'], user['supervisor_id']) for user in rows
+                  if user['role'] == 'student' and user.get('supervisor_id')])
+            cursor.executemany('''
+                INSERT INTO supervisor_assignments (supervisor_id, student_id)
+                SELECT ?, id FROM users WHERE id = ? OR username = ?
+                ON CONFLICT DO NOTHING
+            ''', [(user['id'], ref, ref) for user in rows for ref in user.get('assigned_students') or []])
+            conn.commit()
+        self._invalidate_cached()
+        return {'created': [user['username'] for user in rows], 'conflicts': conflicts}
+    
+    def iter_users(self, batch_size: int = 500):
+        """Yield every user (without password hash), newest first, one page at a time"""
+        cursor = None
+        while True:
+            page = self.get_users_page(limit=batch_size, cursor=cursor)
+            yield from page['items']
+            cursor = page['next_cursor']
+            if not cursor:
+                return
+    
     def add_assigned_student(self, supervisor_id: str, student_username: str) -> bool:
-        """Add a student to supervisor's assigned students"""
+        """Add a student (by ID or username) to supervisor's assigned students"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT assigned_students FROM users WHERE id = ?', (supervisor_id,))
-            supervisor = cursor.fetchone()
-            if supervisor:
-                assigned_students = self.db.list_from_json(supervisor['assigned_students'])
-                if student_username not in assigned_students:
-                    assigned_students.append(student_username)
-                    cursor.execute('UPDATE users SET assigned_students = ? WHERE id = ?', 
-                                 (self.db.json_from_list(assigned_students), supervisor_id))
-                    conn.commit()
-                    return True
-            return False
+            cursor.execute('''
+                INSERT INTO supervisor_assignments (supervisor_id, student_id)
+                SELECT sup.id, st.id FROM users sup, users st
+                WHERE sup.id = ? AND (st.id = ? OR st.username = ?)
+                ON CONFLICT DO NOTHING
+            ''', (supervisor_id, student_username, student_username))
+            conn.commit()
+            self._invalidate_cached()
+            return cursor.rowcount > 0
     
     def remove_assigned_student(self, supervisor_id: str, student_username: str) -> bool:
-        """Remove a student from supervisor's assigned students"""
+        """Remove a student (by ID or username) from supervisor's assigned students"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                DELETE FROM supervisor_assignments
+                WHERE supervisor_id = ?
+                  AND student_id IN (SELECT id FROM users WHERE id = ? OR username = ?)
+            ''', (supervisor_id, student_username, student_username))
+            conn.commit()
+            self._invalidate_cached()
+            return cursor.rowcount > 0
+    
+    def is_assigned_student(self, supervisor_id: str, student_id: str) -> bool:
+        """Check whether a student is assigned to a supervisor"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT assigned_students FROM users WHERE id = ?', (supervisor_id,))
-            supervisor = cursor.fetchone()
-            if supervisor:
-                assigned_students = self.db.list_from_json(supervisor['assigned_students'])
-                if student_username in assigned_students:
-                    assigned_students.remove(student_username)
-                    cursor.execute('UPDATE users SET assigned_students = ? WHERE id = ?', 
-                                 (self.db.json_from_list(assigned_students), supervisor_id))
-                    conn.commit()
-                    return True
-            return False
+            cursor.execute(
+                'SELECT 1 FROM supervisor_assignments WHERE supervisor_id = ? AND student_id = ? LIMIT 1',
+                (supervisor_id, student_id)
+            )
+            return cursor.fetchone() is not None
+    
+    def get_assigned_student_ids(self, supervisor_id: str) -> List[str]:
+        """Get IDs of students assigned to a supervisor"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT student_id FROM supervisor_assignments WHERE supervisor_id = ?', (supervisor_id,))
+            return [row['student_id'] for row in cursor.fetchall()]
     
     def update_student_supervisor(self, student_id: str, supervisor_username: str) -> bool:
         """Update student's supervisor"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('UPDATE users SET supervisor_id = ? WHERE id = ?', (supervisor_username, student_id))
+            self._set_student_supervisor(cursor, student_id, supervisor_username)
             conn.commit()
+            self._invalidate_cached()
             return True
     
     def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM users WHERE email = ?', (email,))
+            cursor.execute(self.USER_SELECT + ' WHERE u.email = ?', (email,))
             row = cursor.fetchone()
-            if row:
-                user_dict = self.db.dict_from_row(row)
-                user_dict['assigned_students'] = self.db.list_from_json(user_dict['assigned_students'])
-                return user_dict
-            return None
+            return self._user_from_row(row) if row else None
     
     def get_assigned_students(self, supervisor_id: str) -> List[Dict[str, Any]]:
         """Get students assigned to a supervisor"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM users WHERE supervisor_id = ? AND role = "student" ORDER BY full_name', (supervisor_id,))
+            cursor.execute(
+                self.USER_LIST_SELECT + '''
+                JOIN supervisor_assignments a ON a.student_id = u.id
+                WHERE a.supervisor_id = ? AND u.role = 'student'
+                ORDER BY u.full_name
+                ''',
+                (supervisor_id,)
+            )
             rows = cursor.fetchall()
-            students = []
-            for row in rows:
-                user_dict = self.db.dict_from_row(row)
-                user_dict['assigned_students'] = self.db.list_from_json(user_dict['assigned_students'])
-                students.append(user_dict)
-            return students
+            return [self._user_from_row(row) for row in rows]
     
     def update_user_supervisor(self, student_id: str, supervisor_id: str) -> bool:
         """Update user's supervisor"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('UPDATE users SET supervisor_id = ? WHERE id = ?', (supervisor_id, student_id))
+            self._set_student_supervisor(cursor, student_id, supervisor_id)
             conn.commit()
+            self._invalidate_cached()
             return True
     
     def delete_user(self, username: str) -> bool:
         """Delete a user by username"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute('''
+                DELETE FROM supervisor_assignments
+                WHERE supervisor_id IN (SELECT id FROM users WHERE username = ?)
+                   OR student_id IN (SELECT id FROM users WHERE username = ?)
+            ''', (username, username))
             cursor.execute('DELETE FROM users WHERE username = ?', (username,))
             conn.commit()
+            # Removed from its supervisor's assigned_students as well
+            self._invalidate_cached()
             return cursor.rowcount > 0
     
     def update_user(self, username: str, update_data: dict) -> bool:
@@ -357,6 +623,8 @@ class UserRepository:
             values = []
             
             for key, value in update_data.items():
+                if key == 'assigned_students':
+                    continue  # Managed through supervisor_assignments
                 if value is not None:  # Only update non-None values
                     set_clauses.append(f"{key} = ?")
                     values.append(value)
@@ -368,8 +636,20 @@ class UserRepository:
             query = f"UPDATE users SET {', '.join(set_clauses)} WHERE username = ?"
             
             cursor.execute(query, values)
+            updated = cursor.rowcount > 0
+            
+            # Keep the assignment relation in step with the student's supervisor
+            if updated and update_data.get('supervisor_id') is not None:
+                cursor.execute("SELECT id FROM users WHERE username = ? AND role = 'student'", (username,))
+                student = cursor.fetchone()
+                if student:
+                    self._set_student_supervisor(cursor, student['id'], update_data['supervisor_id'])
+            
             conn.commit()
-            return cursor.rowcount > 0
+            if updated:
+                # Renames and supervisor changes reach other cached users
+                self._invalidate_cached(None if {'username', 'supervisor_id'} & update_data.keys() else username)
+            return updated
 
 class ThesisRepository:
     """Repository for thesis operations"""
@@ -385,19 +665,116 @@ class ThesisRepository:
         
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
+            content_hash = thesis_data.get('content_hash')
+            if content_hash:
+                # Identical content shares one blob; the first upload decides its path
+                thesis_data['filepath'] = self._acquire_blob(cursor, content_hash, thesis_data['filepath'],
+                                                             thesis_data.get('size', 0))
             cursor.execute('''
-                INSERT INTO theses (id, student_id, filename, filepath, status)
-                VALUES (?, ?, ?, ?, ?)
+                INSERT INTO theses (id, student_id, filename, filepath, status, content_hash)
+                VALUES (?, ?, ?, ?, ?, ?)
             ''', (
                 thesis_data['id'],
                 thesis_data['student_id'],
                 thesis_data['filename'],
                 thesis_data['filepath'],
-                thesis_data.get('status', 'pending')
+                thesis_data.get('status', 'pending'),
+                content_hash
             ))
             conn.commit()
             return self.get_thesis_by_id(thesis_data['id'])
     
+    def create_thesis_with_existing_blob(self, thesis_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Create a thesis sharing the stored file of its content_hash, or return None if there is none"""
+        if 'id' not in thesis_data:
+            thesis_data['id'] = str(uuid.uuid4())
+        
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            # Blobs awaiting prune are not reused, their file may be deleted any moment
+            cursor.execute('UPDATE blobs SET ref_count = ref_count + 1 WHERE content_hash = ? AND ref_count > 0',
+                           (thesis_data['content_hash'],))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                return None
+            cursor.execute('SELECT filepath FROM blobs WHERE content_hash = ?', (thesis_data['content_hash'],))
+            thesis_data['filepath'] = cursor.fetchone()['filepath']
+            cursor.execute('''
+                INSERT INTO theses (id, student_id, filename, filepath, status, content_hash)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (
+                thesis_data['id'],
+                thesis_data['student_id'],
+                thesis_data['filename'],
+                thesis_data['filepath'],
+                thesis_data.get('status', 'pending'),
+                thesis_data['content_hash']
+            ))
+            conn.commit()
+            return self.get_thesis_by_id(thesis_data['id'])
+    
+    def _acquire_blob(self, cursor, content_hash: str, filepath: str, size: int) -> str:
+        """Add a reference to a blob, creating it if new, and return its file path
+        
+        A blob awaiting prune is taken over with the new file, so prune only
+        ever deletes the file it found unreferenced.
+        """
+        cursor.execute('''
+            INSERT INTO blobs (content_hash, filepath, size, ref_count)
+            VALUES (?, ?, ?, 1)
+            ON CONFLICT (content_hash) DO UPDATE SET
+                filepath = CASE WHEN blobs.ref_count > 0 THEN blobs.filepath ELSE excluded.filepath END,
+                ref_count = CASE WHEN blobs.ref_count > 0 THEN blobs.ref_count + 1 ELSE 1 END
+        ''', (content_hash, filepath, size))
+        cursor.execute('SELECT filepath FROM blobs WHERE content_hash = ?', (content_hash,))
+        return cursor.fetchone()['filepath']
+    
+    def get_blob(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Get a blob by content hash"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM blobs WHERE content_hash = ?', (content_hash,))
+            row = cursor.fetchone()
+            return self.db.dict_from_row(row) if row else None
+    
+    def delete_thesis(self, thesis_id: str) -> bool:
+        """Delete a thesis with its feedback and search text, releasing its blob"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT content_hash FROM theses WHERE id = ?', (thesis_id,))
+            row = cursor.fetchone()
+            if not row:
+                return False
+            # theses and feedback reference each other, so unlink them before deleting either
+            cursor.execute('UPDATE theses SET ai_feedback_id = NULL, supervisor_feedback_id = NULL WHERE id = ?',
+                           (thesis_id,))
+            self.db.delete_search_rows(cursor, 'feedback_fts', 'feedback_id',
+                                       'IN (SELECT id FROM feedback WHERE thesis_id = ?)', (thesis_id,))
+            cursor.execute('DELETE FROM feedback WHERE thesis_id = ?', (thesis_id,))
+            self.db.delete_search_rows(cursor, 'thesis_text_fts', 'thesis_id', '= ?', (thesis_id,))
+            cursor.execute('DELETE FROM theses WHERE id = ?', (thesis_id,))
+            if row['content_hash']:
+                cursor.execute('UPDATE blobs SET ref_count = ref_count - 1 WHERE content_hash = ?',
+                               (row['content_hash'],))
+            conn.commit()
+            return True
+    
+    def get_unreferenced_blobs(self) -> List[Dict[str, Any]]:
+        """Get blobs no thesis references any more"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM blobs WHERE ref_count <= 0')
+            return [self.db.dict_from_row(row) for row in cursor.fetchall()]
+    
+    def delete_unreferenced_blob(self, content_hash: str, filepath: str) -> bool:
+        """Delete a blob row if it is still unreferenced and unchanged (an upload may have reclaimed it)"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM blobs WHERE content_hash = ? AND filepath = ? AND ref_count <= 0',
+                           (content_hash, filepath))
+            conn.commit()
+            return cursor.rowcount > 0
+    
     def get_thesis_by_id(self, thesis_id: str) -> Optional[Dict[str, Any]]:
         """Get thesis by ID"""
         with self.db.get_connection() as conn:
@@ -414,18 +791,65 @@ class ThesisRepository:
             rows = cursor.fetchall()
             return [self.db.dict_from_row(row) for row in rows]
     
-    def get_theses_by_supervisor(self, supervisor_username: str) -> List[Dict[str, Any]]:
-        """Get theses assigned to a supervisor"""
+    def bulk_create_theses(self, theses_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Create many theses in one transaction
+        
+        Each thesis names its student by 'student_id' or 'student_username'.
+        Theses whose student does not exist or whose ID is already taken are
+        returned in "conflicts" instead of being inserted.
+        """
+        refs = sorted({thesis.get('student_id') or thesis.get('student_username') for thesis in theses_data} - {None})
+        ids = [thesis['id'] for thesis in theses_data if thesis.get('id')]
+        students, taken_ids = {}, set()
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT t.* FROM theses t
-                JOIN users u ON t.student_id = u.id
-                WHERE u.supervisor_id = ?
-                ORDER BY t.upload_date DESC
-            ''', (supervisor_username,))
-            rows = cursor.fetchall()
-            return [self.db.dict_from_row(row) for row in rows]
+            # Each reference is bound twice, so half a chunk stays within SQLite's 999 variables
+            for start in range(0, len(refs), BULK_CHUNK_SIZE // 2):
+                chunk = refs[start:start + BULK_CHUNK_SIZE // 2]
+                placeholders = ', '.join('?' for _ in chunk)
+                cursor.execute(
+                    f'SELECT id, username FROM users WHERE id IN ({placeholders}) OR username IN ({placeholders})',
+                    chunk + chunk
+                )
+                for row in cursor.fetchall():
+                    students[row['id']] = students[row['username']] = row['id']
+            for start in range(0, len(ids), BULK_CHUNK_SIZE):
+                chunk = ids[start:start + BULK_CHUNK_SIZE]
+                cursor.execute(f"SELECT id FROM theses WHERE id IN ({', '.join('?' for _ in chunk)})", chunk)
+                taken_ids.update(row['id'] for row in cursor.fetchall())
+        
+        rows, conflicts = [], []
+        for index, thesis in enumerate(theses_data):
+            student_ref = thesis.get('student_id') or thesis.get('student_username')
+            if student_ref not in students:
+                conflicts.append({'index': index, 'filename': thesis['filename'], 'field': 'student', 'value': student_ref})
+                continue
+            if thesis.get('id') in taken_ids:
+                conflicts.append({'index': index, 'filename': thesis['filename'], 'field': 'id', 'value': thesis['id']})
+                continue
+            thesis_id = thesis.get('id') or str(uuid.uuid4())
+            taken_ids.add(thesis_id)
+            rows.append((thesis_id, students[student_ref], thesis['filename'], thesis['filepath'],
+                         thesis.get('status') or 'pending', self.db.format_timestamp(thesis.get('upload_date'))))
+        
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO theses (id, student_id, filename, filepath, status, upload_date)
+                VALUES (?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            ''', rows)
+            conn.commit()
+        return {'created': [row[0] for row in rows], 'conflicts': conflicts}
+    
+    def iter_theses_with_details(self, batch_size: int = 500):
+        """Yield every thesis with student and latest feedback details, newest first, one page at a time"""
+        cursor = None
+        while True:
+            page = self.get_theses_page(limit=batch_size, cursor=cursor)
+            yield from page['items']
+            cursor = page['next_cursor']
+            if not cursor:
+                return
     
     def get_all_theses(self) -> List[Dict[str, Any]]:
         """Get all theses"""
@@ -487,14 +911,33 @@ class ThesisRepository:
         """Get theses by student ID (alias for get_theses_by_student_id)"""
         return self.get_theses_by_student_id(student_id)
     
+    def index_thesis_text(self, thesis_id: str, text: str):
+        """Store a thesis's extracted text in the search index, replacing any earlier version"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            self.db.replace_search_row(cursor, 'thesis_text_fts', 'thesis_id', thesis_id, text)
+            conn.commit()
+    
+    def is_thesis_text_indexed(self, thesis_id: str) -> bool:
+        """Check whether a thesis's text is in the search index"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            return self.db.has_search_row(cursor, 'thesis_text_fts', 'thesis_id', thesis_id)
+    
+    def has_theses_by_student(self, student_id: str) -> bool:
+        """Check whether a student has uploaded any theses"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT 1 FROM theses WHERE student_id = ? LIMIT 1', (student_id,))
+            return cursor.fetchone() is not None
+    
     def get_theses_by_supervisor(self, supervisor_id: str) -> List[Dict[str, Any]]:
         """Get theses assigned to a supervisor by supervisor ID"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
+            cursor.execute(f'''
                 SELECT t.* FROM theses t
-                JOIN users u ON t.student_id = u.id
-                WHERE u.supervisor_id = ?
+                WHERE {ASSIGNED_TO_SUPERVISOR}
                 ORDER BY t.upload_date DESC
             ''', (supervisor_id,))
             rows = cursor.fetchall()
@@ -515,12 +958,127 @@ class ThesisRepository:
             cursor.execute('UPDATE theses SET supervisor_feedback_id = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (feedback_id, thesis_id))
             conn.commit()
             return True
+    
+    # Thesis rows joined with student/supervisor names and the latest feedback
+    # metadata, so listing endpoints need a single query instead of one user
+    # lookup per thesis.
+    THESIS_DETAILS_QUERY = '''
+        SELECT t.*,
+               s.full_name AS student_name,
+               s.username AS student_username,
+               s.role AS student_role,
+               sup.id AS student_supervisor_id,
+               sup.full_name AS supervisor_name,
+               lf.id AS latest_feedback_id,
+               lf.is_ai_feedback AS latest_feedback_is_ai,
+               lf.reviewer_id AS latest_feedback_reviewer_id,
+               lf.created_at AS latest_feedback_at
+        FROM theses t
+        LEFT JOIN users s ON s.id = t.student_id
+        LEFT JOIN users sup ON sup.id = (
+            SELECT sa.supervisor_id FROM supervisor_assignments sa
+            WHERE sa.student_id = t.student_id
+            ORDER BY sa.assigned_at, sa.supervisor_id
+            LIMIT 1
+        )
+        LEFT JOIN feedback lf ON lf.id = (
+            SELECT f.id FROM feedback f
+            WHERE f.thesis_id = t.id
+            ORDER BY f.created_at DESC
+            LIMIT 1
+        )
+    '''
+    
+    def _get_theses_with_details(self, where: str = "", params: tuple = (),
+                                 statuses: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Run the joined thesis listing query with an optional filter"""
+        clauses = [where] if where else []
+        values = list(params)
+        if statuses:
+            clauses.append(f"t.status IN ({', '.join('?' for _ in statuses)})")
+            values.extend(statuses)
+        
+        query = self.THESIS_DETAILS_QUERY
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY t.upload_date DESC"
+        
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, values)
+            rows = cursor.fetchall()
+            return [self.db.dict_from_row(row) for row in rows]
+    
+    def get_theses_with_details_by_student(self, student_id: str,
+                                           statuses: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get a student's theses with names and latest feedback metadata"""
+        return self._get_theses_with_details("t.student_id = ?", (student_id,), statuses)
+    
+    def get_theses_with_details_by_supervisor(self, supervisor_id: str,
+                                              statuses: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get theses of a supervisor's students with names and latest feedback metadata"""
+        return self._get_theses_with_details(ASSIGNED_TO_SUPERVISOR, (supervisor_id,), statuses)
+    
+    def get_all_theses_with_details(self, statuses: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get all theses with names and latest feedback metadata"""
+        return self._get_theses_with_details(statuses=statuses)
+    
+    def get_theses_page(self, limit: Optional[int] = None, cursor: Optional[str] = None,
+                        status: Optional[str] = None, supervisor_id: Optional[str] = None,
+                        student_id: Optional[str] = None, date_from=None, date_to=None) -> Dict[str, Any]:
+        """Get theses with details newest first, filtered and paginated by upload_date"""
+        clauses = []
+        values = []
+        if status:
+            clauses.append("t.status = ?")
+            values.append(status)
+        if supervisor_id:
+            clauses.append(ASSIGNED_TO_SUPERVISOR)
+            values.append(supervisor_id)
+        if student_id:
+            clauses.append("t.student_id = ?")
+            values.append(student_id)
+        if date_from:
+            clauses.append("t.upload_date >= ?")
+            values.append(self.db.format_timestamp(date_from))
+        if date_to:
+            clauses.append("t.upload_date < ?")
+            values.append(self.db.format_timestamp(date_to))
+        return self.db.fetch_keyset_page(
+            self.THESIS_DETAILS_QUERY, clauses, values, "t.upload_date", "t.id",
+            limit=limit, cursor=cursor
+        )
 
 class FeedbackRepository:
     """Repository for feedback operations"""
     
-    def __init__(self, db_manager: DatabaseManager):
+    # Full feedback rows (including the potentially multi-kilobyte content) are
+    # only loaded on detail fetches; list views use this summary projection.
+    SUMMARY_COLUMNS = 'f.id, f.thesis_id, f.reviewer_id, f.is_ai_feedback, f.created_at, f.updated_at'
+    
+    def __init__(self, db_manager: DatabaseManager, compress_content: bool = False,
+                 compression_min_bytes: int = 1024):
         self.db = db_manager
+        # PostgreSQL compresses large text values itself (TOAST)
+        self.compress_content = compress_content and db_manager.dialect == 'sqlite'
+        self.compression_min_bytes = compression_min_bytes
+    
+    def _encode_content(self, content: str):
+        """Store large feedback bodies as zlib-compressed blobs when compression is enabled"""
+        if self.compress_content and content and len(content) >= self.compression_min_bytes:
+            return zlib.compress(content.encode('utf-8'), 6)
+        return content
+    
+    def _feedback_from_row(self, row) -> Dict[str, Any]:
+        """Convert a full feedback row to a dict with decoded content"""
+        feedback = self.db.dict_from_row(row)
+        if 'content' in feedback:
+            feedback['content'] = decode_feedback_content(feedback['content'])
+        return feedback
+    
+    def _index_feedback(self, cursor, feedback_id: str, content: str):
+        """Replace a feedback entry's row in the search index"""
+        self.db.replace_search_row(cursor, 'feedback_fts', 'feedback_id', feedback_id, content)
     
     def create_feedback(self, feedback_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create new feedback"""
@@ -537,19 +1095,34 @@ class FeedbackRepository:
                 feedback_data['id'],
                 feedback_data['thesis_id'],
                 feedback_data['reviewer_id'],
-                feedback_data['content'],
+                self._encode_content(feedback_data['content']),
                 feedback_data['is_ai_feedback']
             ))
+            self._index_feedback(cursor, feedback_data['id'], feedback_data['content'])
             conn.commit()
             return self.get_feedback_by_id(feedback_data['id'])
     
+    def update_feedback_content(self, feedback_id: str, content: str) -> bool:
+        """Replace the content of existing feedback"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'UPDATE feedback SET content = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                (self._encode_content(content), feedback_id)
+            )
+            if cursor.rowcount == 0:
+                return False
+            self._index_feedback(cursor, feedback_id, content)
+            conn.commit()
+            return True
+    
     def get_feedback_by_id(self, feedback_id: str) -> Optional[Dict[str, Any]]:
         """Get feedback by ID"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM feedback WHERE id = ?', (feedback_id,))
             row = cursor.fetchone()
-            return self.db.dict_from_row(row) if row else None
+            return self._feedback_from_row(row) if row else None
     
     def get_feedback_by_thesis_id(self, thesis_id: str) -> List[Dict[str, Any]]:
         """Get all feedback for a thesis"""
@@ -557,6 +1130,14 @@ class FeedbackRepository:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM feedback WHERE thesis_id = ? ORDER BY created_at DESC', (thesis_id,))
             rows = cursor.fetchall()
+            return [self._feedback_from_row(row) for row in rows]
+    
+    def get_feedback_summaries_by_thesis_id(self, thesis_id: str) -> List[Dict[str, Any]]:
+        """Get feedback metadata (without content) for a thesis"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT {self.SUMMARY_COLUMNS} FROM feedback f WHERE f.thesis_id = ? ORDER BY f.created_at DESC', (thesis_id,))
+            rows = cursor.fetchall()
             return [self.db.dict_from_row(row) for row in rows]
     
     def get_ai_feedback_by_thesis_id(self, thesis_id: str) -> Optional[Dict[str, Any]]:
@@ -565,7 +1146,7 @@ class FeedbackRepository:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM feedback WHERE thesis_id = ? AND is_ai_feedback = TRUE ORDER BY created_at DESC LIMIT 1', (thesis_id,))
             row = cursor.fetchone()
-            return self.db.dict_from_row(row) if row else None
+            return self._feedback_from_row(row) if row else None
     
     def get_supervisor_feedback_by_thesis_id(self, thesis_id: str) -> Optional[Dict[str, Any]]:
         """Get supervisor feedback for a thesis"""
@@ -573,7 +1154,7 @@ class FeedbackRepository:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM feedback WHERE thesis_id = ? AND is_ai_feedback = FALSE ORDER BY created_at DESC LIMIT 1', (thesis_id,))
             row = cursor.fetchone()
-            return self.db.dict_from_row(row) if row else None
+            return self._feedback_from_row(row) if row else None
     
     def add_feedback(self, feedback_data: Dict[str, Any]) -> Dict[str, Any]:
         """Add new feedback (alias for create_feedback)"""
@@ -585,7 +1166,14 @@ class FeedbackRepository:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM feedback WHERE reviewer_id = ? ORDER BY created_at DESC', (reviewer_id,))
             rows = cursor.fetchall()
-            return [self.db.dict_from_row(row) for row in rows]
+            return [self._feedback_from_row(row) for row in rows]
+    
+    def has_feedback_by_reviewer(self, reviewer_id: str) -> bool:
+        """Check whether a reviewer has given any feedback"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT 1 FROM feedback WHERE reviewer_id = ? LIMIT 1', (reviewer_id,))
+            return cursor.fetchone() is not None
     
     def get_feedback_by_thesis_and_reviewer(self, thesis_id: str, reviewer_type: str) -> Optional[Dict[str, Any]]:
         """Get feedback by thesis ID and reviewer type (ai or supervisor)"""
@@ -598,10 +1186,233 @@ class FeedbackRepository:
             else:
                 return None
             row = cursor.fetchone()
-            return self.db.dict_from_row(row) if row else None
+            return self._feedback_from_row(row) if row else None
+    
+    def get_feedback_with_thesis_by_reviewer(self, reviewer_id: str) -> List[Dict[str, Any]]:
+        """Get a reviewer's feedback joined with its thesis and student name"""
+        return self.get_feedback_page(reviewer_id=reviewer_id)['items']
+    
+    def _feedback_with_thesis_from_row(self, row) -> Dict[str, Any]:
+        """Split a joined feedback row into the feedback and a nested thesis dict"""
+        row_dict = self._feedback_from_row(row)
+        feedback = {k: v for k, v in row_dict.items() if not k.startswith('thesis__')}
+        if row_dict['thesis__id'] is not None:
+            feedback['thesis'] = {k[len('thesis__'):]: v for k, v in row_dict.items() if k.startswith('thesis__')}
+        else:
+            feedback.pop('student_name')
+        return feedback
+    
+    def get_feedback_page(self, reviewer_id: Optional[str] = None, limit: Optional[int] = None,
+                          cursor: Optional[str] = None, is_ai_feedback: Optional[bool] = None,
+                          date_from=None, date_to=None, include_content: bool = True) -> Dict[str, Any]:
+        """Get feedback joined with thesis and student name, newest first, paginated by created_at
+        
+        With include_content=False only the summary columns are read, so the
+        feedback bodies never leave the database.
+        """
+        clauses = []
+        values = []
+        if reviewer_id is not None:
+            clauses.append("f.reviewer_id = ?")
+            values.append(reviewer_id)
+        if is_ai_feedback is not None:
+            clauses.append("f.is_ai_feedback = ?")
+            values.append(is_ai_feedback)
+        if date_from:
+            clauses.append("f.created_at >= ?")
+            values.append(self.db.format_timestamp(date_from))
+        if date_to:
+            clauses.append("f.created_at < ?")
+            values.append(self.db.format_timestamp(date_to))
+        feedback_columns = 'f.*' if include_content else self.SUMMARY_COLUMNS
+        query = f'''
+            SELECT {feedback_columns},
+                   t.id AS thesis__id,
+                   t.student_id AS thesis__student_id,
+                   t.filename AS thesis__filename,
+                   t.filepath AS thesis__filepath,
+                   t.upload_date AS thesis__upload_date,
+                   t.status AS thesis__status,
+                   t.ai_feedback_id AS thesis__ai_feedback_id,
+                   t.supervisor_feedback_id AS thesis__supervisor_feedback_id,
+                   t.created_at AS thesis__created_at,
+                   t.updated_at AS thesis__updated_at,
+                   s.full_name AS student_name
+            FROM feedback f
+            LEFT JOIN theses t ON t.id = f.thesis_id
+            LEFT JOIN users s ON s.id = t.student_id
+        '''
+        return self.db.fetch_keyset_page(
+            query, clauses, values, "f.created_at", "f.id",
+            limit=limit, cursor=cursor, convert=self._feedback_with_thesis_from_row
+        )
+    
+    def get_supervisor_feedback_overview(self, student_id: Optional[str] = None,
+                                         supervisor_id: Optional[str] = None,
+                                         reviewer_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the current supervisor feedback of each thesis with student and supervisor names"""
+        clauses = []
+        values = []
+        if student_id is not None:
+            clauses.append("t.student_id = ?")
+            values.append(student_id)
+        if supervisor_id is not None:
+            clauses.append(ASSIGNED_TO_SUPERVISOR)
+            values.append(supervisor_id)
+        if reviewer_id is not None:
+            clauses.append("f.reviewer_id = ?")
+            values.append(reviewer_id)
+        
+        query = '''
+            SELECT t.id AS thesis_id,
+                   t.filename AS thesis_title,
+                   f.content AS feedback_text,
+                   f.created_at AS feedback_date,
+                   f.reviewer_id,
+                   r.full_name AS supervisor_name,
+                   s.full_name AS student_name
+            FROM theses t
+            JOIN feedback f ON f.id = t.supervisor_feedback_id
+            LEFT JOIN users r ON r.id = f.reviewer_id
+            LEFT JOIN users s ON s.id = t.student_id
+        '''
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY t.upload_date DESC"
+        
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, values)
+            rows = cursor.fetchall()
+            overview = [self.db.dict_from_row(row) for row in rows]
+        for item in overview:
+            item['feedback_text'] = decode_feedback_content(item['feedback_text'])
+        return overview
+
+class SearchRepository:
+    """Repository for full-text search over feedback and thesis text"""
+    
+    SOURCES = ('feedback', 'thesis')
+    
+    FEEDBACK_SEARCH_QUERY = '''
+        SELECT 'feedback' AS source,
+               t.id AS thesis_id, t.filename, t.status, t.student_id,
+               s.full_name AS student_name,
+               f.id AS feedback_id, f.is_ai_feedback, f.created_at,
+               snippet(feedback_fts, 1, ?, ?, '…', ?) AS snippet,
+               bm25(feedback_fts) AS rank
+        FROM feedback_fts
+        JOIN feedback f ON f.id = feedback_fts.feedback_id
+        JOIN theses t ON t.id = f.thesis_id
+        LEFT JOIN users s ON s.id = t.student_id
+        WHERE feedback_fts MATCH ?
+    '''
+    
+    THESIS_SEARCH_QUERY = '''
+        SELECT 'thesis' AS source,
+               t.id AS thesis_id, t.filename, t.status, t.student_id,
+               s.full_name AS student_name,
+               NULL AS feedback_id, NULL AS is_ai_feedback, t.upload_date AS created_at,
+               snippet(thesis_text_fts, 1, ?, ?, '…', ?) AS snippet,
+               bm25(thesis_text_fts) AS rank
+        FROM thesis_text_fts
+        JOIN theses t ON t.id = thesis_text_fts.thesis_id
+        LEFT JOIN users s ON s.id = t.student_id
+        WHERE thesis_text_fts MATCH ?
+    '''
+    
+    def __init__(self, db_manager: DatabaseManager):
+        self.db = db_manager
+    
+    @staticmethod
+    def build_match_query(text: str) -> str:
+        """Turn user input into a safe FTS5 query
+        
+        Words are ANDed together, "quoted phrases" match as phrases and a
+        trailing * makes a prefix search. Everything else is quoted, so FTS5
+        operators in the input are searched for literally.
+        """
+        terms = []
+        for phrase, word in re.findall(r'"([^"]+)"|(\S+)', text):
+            term = phrase or word
+            prefix = not phrase and len(term) > 1 and term.endswith('*')
+            if prefix:
+                term = term[:-1]
+            term = term.replace('"', '').strip()
+            if term:
+                terms.append(f'"{term}"' + ('*' if prefix else ''))
+        if not terms:
+            raise ValueError("Search query is empty")
+        return ' '.join(terms)
+    
+    def _access_clauses(self, student_id: Optional[str], supervisor_id: Optional[str]):
+        """WHERE clauses limiting results to theses the caller may see"""
+        clauses = []
+        values = []
+        if student_id is not None:
+            clauses.append("t.student_id = ?")
+            values.append(student_id)
+        if supervisor_id is not None:
+            clauses.append(ASSIGNED_TO_SUPERVISOR)
+            values.append(supervisor_id)
+        return clauses, values
+    
+    def search(self, text: str, student_id: Optional[str] = None, supervisor_id: Optional[str] = None,
+               sources: Optional[List[str]] = None, limit: int = 20,
+               highlight: tuple = ('<mark>', '</mark>'), snippet_tokens: int = 16) -> List[Dict[str, Any]]:
+        """Search feedback and thesis text, best matches first
+        
+        student_id restricts results to one student's theses and supervisor_id
+        to the theses of a supervisor's assigned students.
+        """
+        match = self.build_match_query(text)
+        clauses, values = self._access_clauses(student_id, supervisor_id)
+        
+        selects = []
+        params = []
+        for source, query in (('feedback', self.FEEDBACK_SEARCH_QUERY), ('thesis', self.THESIS_SEARCH_QUERY)):
+            if sources and source not in sources:
+                continue
+            selects.append(query + ''.join(f" AND {clause}" for clause in clauses))
+            params.extend([highlight[0], highlight[1], snippet_tokens, match, *values])
+        if not selects:
+            return []
+        
+        # bm25() is lower for better matches
+        query = ' UNION ALL '.join(selects) + ' ORDER BY rank LIMIT ?'
+        params.append(limit)
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            return [self.db.dict_from_row(row) for row in rows]
 
 # Global database instance
-db_manager = DatabaseManager()
-user_repo = UserRepository(db_manager)
+if config.DB_BACKEND == 'postgresql':
+    from .postgres import PostgresDatabaseManager, PostgresSearchRepository
+    db_manager = PostgresDatabaseManager(
+        config.DATABASE_URL,
+        pool_size=config.DB_POOL_SIZE,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        statement_timeout_ms=config.DB_STATEMENT_TIMEOUT_MS,
+    )
+    search_repo = PostgresSearchRepository(db_manager)
+else:
+    db_manager = DatabaseManager(
+        config.DB_PATH,
+        pool_size=config.DB_POOL_SIZE,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        busy_timeout_ms=config.DB_BUSY_TIMEOUT_MS,
+        cache_size_kb=config.DB_CACHE_SIZE_KB,
+        mmap_size=config.DB_MMAP_SIZE,
+        migration_batch_size=config.DB_MIGRATION_BATCH_SIZE,
+    )
+    search_repo = SearchRepository(db_manager)
+user_cache = UserCache(max_size=config.USER_CACHE_SIZE, ttl=config.USER_CACHE_TTL)
+user_repo = UserRepository(db_manager, cache=user_cache)
 thesis_repo = ThesisRepository(db_manager)
-feedback_repo = FeedbackRepository(db_manager) 
\ No newline at end of file
+feedback_repo = FeedbackRepository(
+    db_manager,
+    compress_content=config.FEEDBACK_COMPRESSION,
+    compression_min_bytes=config.FEEDBACK_COMPRESSION_MIN_BYTES,
+)
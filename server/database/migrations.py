@@ -0,0 +1,376 @@
+"""
+Schema migrations for ThesisAI Tool.
+
+The schema version is stored in SQLite's PRAGMA user_version. Each migration
+moves the schema forward by one version and is recorded only once it has
+fully succeeded, so startup applies exactly the migrations a database is
+missing.
+
+Most migrations run in a single transaction. Migrations that build indexes
+or backfill data on large tables are registered with transactional=False and
+use build_index / backfill_in_batches, which commit in small steps so the
+database is never locked for the whole migration. Those migrations must be
+safe to re-run, because an interrupted run starts again from the beginning.
+"""
+
+import logging
+import sqlite3
+import time
+from typing import Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Porter stemming so "sample sizes" matches "sample size"; diacritics are
+# folded so Finnish text matches with or without them
+FTS_TOKENIZER = 'porter unicode61 remove_diacritics 2'
+
+class MigrationError(sqlite3.DatabaseError):
+    """Raised when a migration fails; the schema stays at the last good version"""
+
+class Migration:
+    """A single forward schema migration"""
+
+    def __init__(self, version: int, description: str, upgrade: Callable[[sqlite3.Connection, int], None],
+                 transactional: bool = True):
+        self.version = version
+        self.description = description
+        self.upgrade = upgrade
+        self.transactional = transactional
+
+    def __repr__(self) -> str:
+        return f"Migration({self.version}, {self.description!r})"
+
+MIGRATIONS: List[Migration] = []
+
+def migration(version: int, description: str, transactional: bool = True):
+    """Register a function as the migration to the given schema version"""
+    def register(upgrade):
+        MIGRATIONS.append(Migration(version, description, upgrade, transactional))
+        return upgrade
+    return register
+
+def build_index(conn: sqlite3.Connection, name: str, table: str, columns: str, where: Optional[str] = None):
+    """Create one index in its own short transaction
+
+    SQLite builds an index in a single pass, so large index sets are split
+    into one transaction per index; readers keep working throughout (WAL)
+    and writers wait for one index at a time rather than the whole set.
+    """
+    start = time.perf_counter()
+    sql = f'CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})'
+    if where:
+        sql += f' WHERE {where}'
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.execute(sql)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    logger.info(f"Built index {name} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+def backfill_in_batches(conn: sqlite3.Connection, select_sql: str, apply: Callable[[sqlite3.Cursor, List[sqlite3.Row]], None],
+                        batch_size: int) -> int:
+    """Run apply over the rows of select_sql, one transaction per batch
+
+    select_sql must select rowid first and accept the last seen rowid and a
+    limit as parameters, e.g. 'SELECT rowid, ... WHERE rowid > ? ORDER BY
+    rowid LIMIT ?'. Returns the number of rows processed.
+    """
+    last_rowid = 0
+    total = 0
+    while True:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            cursor = conn.cursor()
+            rows = cursor.execute(select_sql, (last_rowid, batch_size)).fetchall()
+            if rows:
+                apply(cursor, rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        if not rows:
+            return total
+        total += len(rows)
+        last_rowid = rows[-1][0]
+
+def table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    """Check whether a table (or virtual table) exists"""
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone()
+    return row is not None
+
+class MigrationRunner:
+    """Apply pending migrations to a connection"""
+
+    def __init__(self, conn: sqlite3.Connection, migrations: Optional[Iterable[Migration]] = None,
+                 batch_size: int = 5000):
+        self.conn = conn
+        self.migrations = sorted(MIGRATIONS if migrations is None else migrations, key=lambda m: m.version)
+        self.batch_size = batch_size
+        versions = [m.version for m in self.migrations]
+        if versions != list(range(1, len(versions) + 1)):
+            raise MigrationError(f"Migration versions must be consecutive from 1, got {versions}")
+
+    @property
+    def latest_version(self) -> int:
+        """Version the schema has after all migrations"""
+        return self.migrations[-1].version if self.migrations else 0
+
+    def current_version(self) -> int:
+        """Version recorded in the database"""
+        return self.conn.execute('PRAGMA user_version').fetchone()[0]
+
+    def pending(self) -> List[Migration]:
+        """Migrations not yet applied"""
+        current = self.current_version()
+        return [m for m in self.migrations if m.version > current]
+
+    def migrate(self, target: Optional[int] = None) -> List[int]:
+        """Apply pending migrations up to target (default: latest), returning the versions applied"""
+        current = self.current_version()
+        if current > self.latest_version:
+            raise MigrationError(
+                f"Database schema version {current} is newer than this code supports ({self.latest_version})"
+            )
+
+        applied = []
+        for m in self.pending():
+            if target is not None and m.version > target:
+                break
+            self._apply(m)
+            applied.append(m.version)
+
+        if applied:
+            # Refresh query planner statistics for the new tables and indexes
+            self.conn.execute('PRAGMA optimize')
+        return applied
+
+    def _apply(self, m: Migration):
+        """Run one migration and record its version"""
+        logger.info(f"Applying migration {m.version}: {m.description}")
+        start = time.perf_counter()
+        if self.conn.in_transaction:
+            self.conn.commit()
+        try:
+            if m.transactional:
+                self.conn.execute('BEGIN IMMEDIATE')
+                m.upgrade(self.conn, self.batch_size)
+            else:
+                m.upgrade(self.conn, self.batch_size)
+                self.conn.execute('BEGIN IMMEDIATE')
+            # user_version lives in the database header, so it commits atomically with the migration
+            self.conn.execute(f'PRAGMA user_version = {int(m.version)}')
+            self.conn.commit()
+        except Exception as e:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            raise MigrationError(f"Migration {m.version} ({m.description}) failed: {e}") from e
+        logger.info(f"Migration {m.version} applied in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+# Migrations. Databases created before versioning (user_version 0) already
+# have some of these objects, so migrations up to 4 use IF NOT EXISTS and
+# must be safe to run against them.
+
+@migration(1, "Create users, theses and feedback tables")
+def create_core_tables(conn: sqlite3.Connection, batch_size: int):
+    # Users table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            full_name TEXT NOT NULL,
+            hashed_password TEXT NOT NULL,
+            role TEXT NOT NULL CHECK (role IN ('student', 'supervisor', 'admin')),
+            disabled BOOLEAN DEFAULT FALSE,
+            supervisor_id TEXT,
+            assigned_students TEXT DEFAULT '[]',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (supervisor_id) REFERENCES users (username)
+        )
+    ''')
+
+    # Theses table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS theses (
+            id TEXT PRIMARY KEY,
+            student_id TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            filepath TEXT NOT NULL,
+            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'pending' CHECK (status IN ('pending', 'reviewed_by_ai', 'reviewed_by_supervisor', 'approved')),
+            ai_feedback_id TEXT,
+            supervisor_feedback_id TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (student_id) REFERENCES users (id),
+            FOREIGN KEY (ai_feedback_id) REFERENCES feedback (id),
+            FOREIGN KEY (supervisor_feedback_id) REFERENCES feedback (id)
+        )
+    ''')
+
+    # Feedback table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback (
+            id TEXT PRIMARY KEY,
+            thesis_id TEXT NOT NULL,
+            reviewer_id TEXT NOT NULL,
+            content TEXT NOT NULL,
+            is_ai_feedback BOOLEAN NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (thesis_id) REFERENCES theses (id),
+            FOREIGN KEY (reviewer_id) REFERENCES users (id)
+        )
+    ''')
+
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_theses_student_id ON theses(student_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_theses_status ON theses(status)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_feedback_thesis_id ON feedback(thesis_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_feedback_reviewer_id ON feedback(reviewer_id)')
+
+@migration(2, "Move supervisor assignments into the supervisor_assignments relation")
+def create_supervisor_assignments(conn: sqlite3.Connection, batch_size: int):
+    # Only backfill when the table is new: the legacy JSON column is no
+    # longer maintained and would resurrect removed assignments
+    backfill = not table_exists(conn, 'supervisor_assignments')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS supervisor_assignments (
+            supervisor_id TEXT NOT NULL,
+            student_id TEXT NOT NULL,
+            assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (supervisor_id, student_id),
+            FOREIGN KEY (supervisor_id) REFERENCES users (id),
+            FOREIGN KEY (student_id) REFERENCES users (id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_supervisor_assignments_student ON supervisor_assignments(student_id, supervisor_id)')
+    if not backfill:
+        return
+
+    # assigned_students entries and supervisor_id values are a mix of user IDs and usernames
+    cursor = conn.execute('''
+        INSERT OR IGNORE INTO supervisor_assignments (supervisor_id, student_id)
+        SELECT sup.id, st.id
+        FROM users sup, json_each(CASE WHEN json_valid(sup.assigned_students) THEN sup.assigned_students ELSE '[]' END) j
+        JOIN users st ON st.id = j.value OR st.username = j.value
+        WHERE sup.role = 'supervisor' AND st.role = 'student'
+    ''')
+    migrated = cursor.rowcount
+    cursor = conn.execute('''
+        INSERT OR IGNORE INTO supervisor_assignments (supervisor_id, student_id)
+        SELECT sup.id, st.id
+        FROM users st
+        JOIN users sup ON sup.id = st.supervisor_id OR sup.username = st.supervisor_id
+        WHERE st.role = 'student' AND sup.role = 'supervisor'
+    ''')
+    migrated += cursor.rowcount
+    if migrated:
+        logger.info(f"Migrated {migrated} supervisor assignments into supervisor_assignments")
+
+@migration(3, "Add keyset pagination indexes", transactional=False)
+def create_pagination_indexes(conn: sqlite3.Connection, batch_size: int):
+    # Newest first, ID as tie-breaker
+    build_index(conn, 'idx_theses_upload_date', 'theses', 'upload_date, id')
+    build_index(conn, 'idx_theses_status_upload_date', 'theses', 'status, upload_date, id')
+    build_index(conn, 'idx_users_created_at', 'users', 'created_at, id')
+    build_index(conn, 'idx_feedback_reviewer_created_at', 'feedback', 'reviewer_id, created_at, id')
+
+@migration(4, "Add full-text search tables for feedback and thesis text", transactional=False)
+def create_search_tables(conn: sqlite3.Connection, batch_size: int):
+    from .database import decode_feedback_content
+
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS feedback_fts USING fts5(
+            feedback_id UNINDEXED,
+            content,
+            tokenize = '{FTS_TOKENIZER}'
+        )
+    ''')
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS thesis_text_fts USING fts5(
+            thesis_id UNINDEXED,
+            content,
+            tokenize = '{FTS_TOKENIZER}'
+        )
+    ''')
+
+    # Rebuild the feedback index from scratch so an interrupted run can start over
+    conn.execute('DELETE FROM feedback_fts')
+    conn.commit()
+
+    def index_feedback(cursor: sqlite3.Cursor, rows: List[sqlite3.Row]):
+        cursor.executemany(
+            'INSERT INTO feedback_fts (feedback_id, content) VALUES (?, ?)',
+            [(row[1], decode_feedback_content(row[2])) for row in rows]
+        )
+
+    indexed = backfill_in_batches(
+        conn, 'SELECT rowid, id, content FROM feedback WHERE rowid > ? ORDER BY rowid LIMIT ?',
+        index_feedback, batch_size
+    )
+    if indexed:
+        logger.info(f"Indexed {indexed} feedback entries for full-text search")
+
+@migration(5, "Replace single-column indexes with composite indexes for the feedback, thesis and user access paths", transactional=False)
+def create_access_path_indexes(conn: sqlite3.Connection, batch_size: int):
+    # Latest AI / supervisor feedback for a thesis: equality on both columns, then newest first
+    build_index(conn, 'idx_feedback_thesis_type_created', 'feedback', 'thesis_id, is_ai_feedback, created_at')
+    # Feedback for a thesis newest first; covers the latest-feedback lookup of the listing query
+    build_index(conn, 'idx_feedback_thesis_created', 'feedback', 'thesis_id, created_at, id')
+    build_index(conn, 'idx_theses_student_upload_date', 'theses', 'student_id, upload_date, id')
+    build_index(conn, 'idx_users_role_full_name', 'users', 'role, full_name')
+
+    # Each of these is a prefix of a composite index (or duplicates the
+    # UNIQUE constraint's index), so they only cost writes
+    for name in ('idx_feedback_thesis_id', 'idx_feedback_reviewer_id', 'idx_theses_student_id',
+                 'idx_users_role', 'idx_users_username'):
+        conn.execute(f'DROP INDEX IF EXISTS {name}')
+
+@migration(6, "Add content-addressed blobs referenced by theses")
+def create_blobs(conn: sqlite3.Connection, batch_size: int):
+    # One row per distinct file content; ref_count is the number of theses using it
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS blobs (
+            content_hash TEXT PRIMARY KEY,
+            filepath TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Theses uploaded before this migration keep content_hash NULL and their own file
+    conn.execute('ALTER TABLE theses ADD COLUMN content_hash TEXT')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_theses_content_hash ON theses(content_hash)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_blobs_unreferenced ON blobs(content_hash) WHERE ref_count <= 0')
+
+@migration(7, "Order each student's supervisor assignments by assignment time", transactional=False)
+def create_assignment_order_index(conn: sqlite3.Connection, batch_size: int):
+    # The listing query names a student's first-assigned supervisor; the
+    # (student_id, supervisor_id) index made it sort for every thesis row
+    build_index(conn, 'idx_supervisor_assignments_student_assigned', 'supervisor_assignments',
+                'student_id, assigned_at, supervisor_id')
+    conn.execute('DROP INDEX IF EXISTS idx_supervisor_assignments_student')
+
+@migration(8, "Map full-text rows to the IDs they index")
+def create_fts_rowids(conn: sqlite3.Connection, batch_size: int):
+    # FTS5 finds rows only by rowid or MATCH, so deleting or checking a row
+    # by its UNINDEXED ID column read the whole table; this maps each ID to
+    # its FTS rowid (see DatabaseManager.replace_search_row)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS fts_rowids (
+            fts_table TEXT NOT NULL,
+            source_id TEXT NOT NULL,
+            fts_rowid INTEGER NOT NULL,
+            PRIMARY KEY (fts_table, source_id)
+        ) WITHOUT ROWID
+    ''')
+    for table, key in (('feedback_fts', 'feedback_id'), ('thesis_text_fts', 'thesis_id')):
+        conn.execute(f'''
+            INSERT OR IGNORE INTO fts_rowids (fts_table, source_id, fts_rowid)
+            SELECT ?, {key}, rowid FROM {table}
+        ''', (table,))
@@ -0,0 +1,425 @@
+"""
+PostgreSQL backend for ThesisAI Tool.
+
+Selected with DB_BACKEND=postgresql. It lets several uvicorn workers on
+several hosts share one database. PostgresDatabaseManager has the same
+interface as the SQLite DatabaseManager, so UserRepository, ThesisRepository
+and FeedbackRepository run unchanged on top of it:
+
+- pooled psycopg connections (the same ConnectionPool, so nested repository
+  calls on one thread reuse their connection)
+- cursors that accept the repositories' qmark ("?") placeholders
+- rows returned as dicts
+- the schema, including a json_group_array aggregate and regular tables with
+  tsvector columns standing in for SQLite's JSON1 and FTS5
+
+Requires psycopg 3 (pip install "psycopg[binary]").
+"""
+
+import logging
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from .connection_pool import ConnectionPool
+from .database import DatabaseManager, SearchRepository
+from .migrations import Migration
+
+try:
+    import psycopg
+    from psycopg.rows import dict_row
+    POSTGRES_AVAILABLE = True
+except ImportError:
+    POSTGRES_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration; "english" stems words like SQLite's porter tokenizer
+TEXT_SEARCH_CONFIG = 'english'
+
+# Serialises schema migrations between workers starting at the same time
+MIGRATION_LOCK_ID = 727347
+
+@lru_cache(maxsize=512)
+def qmark_to_format(sql: str) -> str:
+    """Rewrite qmark placeholders as psycopg's %s, leaving quoted text alone"""
+    parts = re.split(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")", sql)
+    for i in range(0, len(parts), 2):
+        parts[i] = parts[i].replace('%', '%%').replace('?', '%s')
+    for i in range(1, len(parts), 2):
+        parts[i] = parts[i].replace('%', '%%')
+    return ''.join(parts)
+
+if POSTGRES_AVAILABLE:
+    class QmarkCursor(psycopg.Cursor):
+        """Cursor accepting the "?" placeholders used throughout the repositories"""
+
+        def execute(self, query, params=None, **kwargs):
+            if isinstance(query, str):
+                query = qmark_to_format(query)
+            return super().execute(query, params, **kwargs)
+
+        def executemany(self, query, params_seq, **kwargs):
+            if isinstance(query, str):
+                query = qmark_to_format(query)
+            return super().executemany(query, params_seq, **kwargs)
+
+class PostgresConnectionPool(ConnectionPool):
+    """Bounded pool of psycopg connections"""
+
+    def __init__(self, dsn: str, max_size: int = 5, timeout: float = 30.0, statement_timeout_ms: int = 30000):
+        super().__init__(dsn, max_size=max_size, timeout=timeout)
+        self.statement_timeout_ms = statement_timeout_ms
+
+    def _create_connection(self):
+        """Open a connection that returns dict rows and takes qmark placeholders"""
+        conn = psycopg.connect(self.db_path, row_factory=dict_row, cursor_factory=QmarkCursor)
+        conn.execute(f"SET statement_timeout = {int(self.statement_timeout_ms)}")
+        # CURRENT_TIMESTAMP in UTC, as SQLite stores it
+        conn.execute("SET TIME ZONE 'UTC'")
+        conn.commit()
+        return conn
+
+    def _in_transaction(self, conn) -> bool:
+        """Whether a transaction is open on the connection"""
+        return conn.info.transaction_status != psycopg.pq.TransactionStatus.IDLE
+
+    def _reset_connection(self, conn) -> None:
+        """Roll back unfinished work and refuse broken connections"""
+        if conn.closed:
+            raise psycopg.OperationalError("Connection is closed")
+        if conn.info.transaction_status != psycopg.pq.TransactionStatus.IDLE:
+            conn.rollback()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool metrics"""
+        stats = super().stats()
+        stats.pop("journal_mode")
+        stats.pop("synchronous")
+        # Never expose the password in the DSN
+        dsn = re.sub(r"(://[^:/@]+:)[^@]*@", r"\1***@", self.db_path)
+        stats["db_path"] = re.sub(r"(password\s*=\s*)\S+", r"\1***", dsn)
+        return stats
+
+class PostgresDatabaseManager(DatabaseManager):
+    """PostgreSQL database manager with pooled connection handling"""
+
+    dialect = 'postgresql'
+
+    def __init__(self, dsn: str, pool_size: int = 5, pool_timeout: float = 30.0, statement_timeout_ms: int = 30000):
+        if not POSTGRES_AVAILABLE:
+            raise RuntimeError('DB_BACKEND=postgresql needs psycopg 3: pip install "psycopg[binary]"')
+        self.db_path = dsn
+        self.pool = PostgresConnectionPool(
+            dsn, max_size=pool_size, timeout=pool_timeout, statement_timeout_ms=statement_timeout_ms
+        )
+        self._migrated = False
+        self._migration_lock = threading.Lock()
+
+    def _run_migrations(self, conn) -> List[int]:
+        return PostgresMigrationRunner(conn).migrate()
+
+    def schema_version(self) -> int:
+        """Get the schema version recorded in the database"""
+        with self.get_connection() as conn:
+            return PostgresMigrationRunner(conn).current_version()
+
+    @contextmanager
+    def get_connection(self):
+        """Borrow a pooled database connection with proper error handling"""
+        if not self._migrated:
+            self.migrate()
+        conn = None
+        try:
+            conn = self.pool.acquire()
+            yield conn
+        except psycopg.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+        finally:
+            if conn:
+                self.pool.release(conn)
+
+    # The full-text tables are ordinary tables with an index on their ID column
+    def replace_search_row(self, cursor, table: str, key: str, row_id: str, content: str):
+        """Index content under row_id in a full-text table, replacing its earlier row"""
+        self.delete_search_rows(cursor, table, key, '= ?', (row_id,))
+        cursor.execute(f'INSERT INTO {table} ({key}, content) VALUES (?, ?)', (row_id, content))
+
+    def delete_search_rows(self, cursor, table: str, key: str, condition: str, params: tuple):
+        """Remove the full-text rows whose ID matches condition (e.g. '= ?' or 'IN (SELECT ...)')"""
+        cursor.execute(f'DELETE FROM {table} WHERE {key} {condition}', params)
+
+    def has_search_row(self, cursor, table: str, key: str, row_id: str) -> bool:
+        """Check whether row_id is indexed in a full-text table"""
+        cursor.execute(f'SELECT 1 FROM {table} WHERE {key} = ? LIMIT 1', (row_id,))
+        return cursor.fetchone() is not None
+
+    def list_from_json(self, json_str) -> List[str]:
+        """Convert a JSON value to list (json_group_array already returns a list)"""
+        if isinstance(json_str, list):
+            return json_str
+        return super().list_from_json(json_str)
+
+    def format_timestamp(self, value) -> Optional[datetime]:
+        """Convert a datetime or ISO date string for a timestamp comparison"""
+        if value is None or isinstance(value, datetime):
+            return value
+        return datetime.fromisoformat(str(value))
+
+    def encode_cursor(self, sort_value: Any, row_id: str) -> str:
+        """Encode the last row of a page as an opaque keyset cursor"""
+        if isinstance(sort_value, datetime):
+            sort_value = sort_value.isoformat()
+        return super().encode_cursor(sort_value, row_id)
+
+    def decode_cursor(self, cursor: str) -> List[Any]:
+        """Decode a keyset cursor, raising ValueError if it is malformed"""
+        sort_value, row_id = super().decode_cursor(cursor)
+        # Every keyset listing sorts on a timestamp column
+        return [self.format_timestamp(sort_value), row_id]
+
+class PostgresSearchRepository(SearchRepository):
+    """Full-text search using PostgreSQL tsvector columns"""
+
+    FEEDBACK_SEARCH_QUERY = f'''
+        SELECT 'feedback' AS source,
+               t.id AS thesis_id, t.filename, t.status, t.student_id,
+               s.full_name AS student_name,
+               f.id AS feedback_id, f.is_ai_feedback, f.created_at,
+               fts.content AS document,
+               -ts_rank_cd(fts.document, to_tsquery('{TEXT_SEARCH_CONFIG}', ?)) AS rank
+        FROM feedback_fts fts
+        JOIN feedback f ON f.id = fts.feedback_id
+        JOIN theses t ON t.id = f.thesis_id
+        LEFT JOIN users s ON s.id = t.student_id
+        WHERE fts.document @@ to_tsquery('{TEXT_SEARCH_CONFIG}', ?)
+    '''
+
+    THESIS_SEARCH_QUERY = f'''
+        SELECT 'thesis' AS source,
+               t.id AS thesis_id, t.filename, t.status, t.student_id,
+               s.full_name AS student_name,
+               NULL AS feedback_id, NULL::boolean AS is_ai_feedback, t.upload_date AS created_at,
+               fts.content AS document,
+               -ts_rank_cd(fts.document, to_tsquery('{TEXT_SEARCH_CONFIG}', ?)) AS rank
+        FROM thesis_text_fts fts
+        JOIN theses t ON t.id = fts.thesis_id
+        LEFT JOIN users s ON s.id = t.student_id
+        WHERE fts.document @@ to_tsquery('{TEXT_SEARCH_CONFIG}', ?)
+    '''
+
+    @staticmethod
+    def build_match_query(text: str) -> str:
+        """Turn user input into a to_tsquery expression with the same rules as the SQLite search"""
+        terms = []
+        for phrase, word in re.findall(r'"([^"]+)"|(\S+)', text):
+            prefix = not phrase and len(word) > 1 and word.endswith('*')
+            words = re.findall(r'\w+', phrase or word)
+            if not words:
+                continue
+            term = ' <-> '.join(words)
+            terms.append(f'{term}:*' if prefix else f'({term})')
+        if not terms:
+            raise ValueError("Search query is empty")
+        return ' & '.join(terms)
+
+    def search(self, text: str, student_id: Optional[str] = None, supervisor_id: Optional[str] = None,
+               sources: Optional[List[str]] = None, limit: int = 20,
+               highlight: tuple = ('<mark>', '</mark>'), snippet_tokens: int = 16) -> List[Dict[str, Any]]:
+        """Search feedback and thesis text, best matches first"""
+        match = self.build_match_query(text)
+        clauses, values = self._access_clauses(student_id, supervisor_id)
+
+        selects = []
+        params = []
+        for source, query in (('feedback', self.FEEDBACK_SEARCH_QUERY), ('thesis', self.THESIS_SEARCH_QUERY)):
+            if sources and source not in sources:
+                continue
+            selects.append(query + ''.join(f" AND {clause}" for clause in clauses))
+            params.extend([match, match, *values])
+        if not selects:
+            return []
+
+        # Highlight only the rows that made the page; ts_headline re-parses the whole document
+        options = (f'StartSel="{highlight[0]}", StopSel="{highlight[1]}", '
+                   f'MaxWords={snippet_tokens}, MinWords={max(1, snippet_tokens // 2)}')
+        query = f'''
+            SELECT source, thesis_id, filename, status, student_id, student_name,
+                   feedback_id, is_ai_feedback, created_at,
+                   ts_headline('{TEXT_SEARCH_CONFIG}', document, to_tsquery('{TEXT_SEARCH_CONFIG}', ?), ?) AS snippet,
+                   rank
+            FROM ({' UNION ALL '.join(selects)} ORDER BY rank LIMIT ?) matches
+            ORDER BY rank
+        '''
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, [match, options, *params, limit])
+            rows = cursor.fetchall()
+            return [self.db.dict_from_row(row) for row in rows]
+
+class PostgresMigrationRunner:
+    """Apply pending PostgreSQL migrations, one transaction each"""
+
+    def __init__(self, conn, migrations: Optional[List[Migration]] = None):
+        self.conn = conn
+        self.migrations = sorted(POSTGRES_MIGRATIONS if migrations is None else migrations, key=lambda m: m.version)
+
+    @property
+    def latest_version(self) -> int:
+        """Version the schema has after all migrations"""
+        return self.migrations[-1].version if self.migrations else 0
+
+    def current_version(self) -> int:
+        """Version recorded in the database"""
+        row = self.conn.execute("SELECT to_regclass('schema_migrations') IS NOT NULL AS present").fetchone()
+        if not row['present']:
+            return 0
+        row = self.conn.execute('SELECT COALESCE(MAX(version), 0) AS version FROM schema_migrations').fetchone()
+        self.conn.commit()
+        return row['version']
+
+    def migrate(self) -> List[int]:
+        """Apply pending migrations, returning the versions applied"""
+        applied = []
+        with self.conn.transaction():
+            # Workers starting together wait here instead of racing the DDL
+            self.conn.execute('SELECT pg_advisory_xact_lock(?)', (MIGRATION_LOCK_ID,))
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            current = self.conn.execute('SELECT COALESCE(MAX(version), 0) AS version FROM schema_migrations').fetchone()['version']
+            for m in self.migrations:
+                if m.version <= current:
+                    continue
+                logger.info(f"Applying migration {m.version}: {m.description}")
+                # PostgreSQL DDL is transactional, so a failure rolls back every migration in this run
+                m.upgrade(self.conn, 0)
+                self.conn.execute('INSERT INTO schema_migrations (version, description) VALUES (?, ?)',
+                                  (m.version, m.description))
+                applied.append(m.version)
+        return applied
+
+def create_schema(conn, batch_size: int):
+    # Same tables as the SQLite schema. The foreign keys SQLite never
+    # enforced (users.supervisor_id holds IDs or usernames, theses and
+    # feedback reference each other) are left out to keep behaviour identical.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            full_name TEXT NOT NULL,
+            hashed_password TEXT NOT NULL,
+            role TEXT NOT NULL CHECK (role IN ('student', 'supervisor', 'admin')),
+            disabled BOOLEAN DEFAULT FALSE,
+            supervisor_id TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS theses (
+            id TEXT PRIMARY KEY,
+            student_id TEXT NOT NULL REFERENCES users (id),
+            filename TEXT NOT NULL,
+            filepath TEXT NOT NULL,
+            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'pending' CHECK (status IN ('pending', 'reviewed_by_ai', 'reviewed_by_supervisor', 'approved')),
+            ai_feedback_id TEXT,
+            supervisor_feedback_id TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback (
+            id TEXT PRIMARY KEY,
+            thesis_id TEXT NOT NULL REFERENCES theses (id),
+            reviewer_id TEXT NOT NULL,
+            content TEXT NOT NULL,
+            is_ai_feedback BOOLEAN NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS supervisor_assignments (
+            supervisor_id TEXT NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            student_id TEXT NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (supervisor_id, student_id)
+        )
+    ''')
+
+    # Full-text search tables with the same columns the repositories write to
+    for table, key in (('feedback_fts', 'feedback_id'), ('thesis_text_fts', 'thesis_id')):
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                {key} TEXT NOT NULL,
+                content TEXT NOT NULL,
+                document TSVECTOR GENERATED ALWAYS AS (to_tsvector('{TEXT_SEARCH_CONFIG}', content)) STORED
+            )
+        ''')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{key} ON {table}({key})')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_document ON {table} USING GIN (document)')
+
+    # SQLite's json_group_array, so the user queries run unchanged
+    conn.execute('''
+        CREATE OR REPLACE FUNCTION json_group_array_step(state JSONB, value ANYELEMENT) RETURNS JSONB
+        LANGUAGE sql IMMUTABLE AS 'SELECT state || jsonb_build_array(value)'
+    ''')
+    conn.execute('''
+        CREATE OR REPLACE AGGREGATE json_group_array(ANYELEMENT) (
+            SFUNC = json_group_array_step, STYPE = JSONB, INITCOND = '[]'
+        )
+    ''')
+
+    # The indexes from the SQLite migrations 1-5
+    for name, table, columns in (
+        ('idx_users_role_full_name', 'users', 'role, full_name'),
+        ('idx_users_created_at', 'users', 'created_at, id'),
+        ('idx_theses_status', 'theses', 'status'),
+        ('idx_theses_upload_date', 'theses', 'upload_date, id'),
+        ('idx_theses_status_upload_date', 'theses', 'status, upload_date, id'),
+        ('idx_theses_student_upload_date', 'theses', 'student_id, upload_date, id'),
+        ('idx_feedback_thesis_type_created', 'feedback', 'thesis_id, is_ai_feedback, created_at'),
+        ('idx_feedback_thesis_created', 'feedback', 'thesis_id, created_at, id'),
+        ('idx_feedback_reviewer_created_at', 'feedback', 'reviewer_id, created_at, id'),
+        ('idx_supervisor_assignments_student', 'supervisor_assignments', 'student_id, supervisor_id'),
+    ):
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})')
+
+def create_blobs(conn, batch_size: int):
+    # SQLite migration 6
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS blobs (
+            content_hash TEXT PRIMARY KEY,
+            filepath TEXT NOT NULL,
+            size BIGINT NOT NULL,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('ALTER TABLE theses ADD COLUMN IF NOT EXISTS content_hash TEXT')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_theses_content_hash ON theses(content_hash)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_blobs_unreferenced ON blobs(content_hash) WHERE ref_count <= 0')
+
+def create_assignment_order_index(conn, batch_size: int):
+    # SQLite migration 7
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_supervisor_assignments_student_assigned '
+                 'ON supervisor_assignments(student_id, assigned_at, supervisor_id)')
+    conn.execute('DROP INDEX IF EXISTS idx_supervisor_assignments_student')
+
+POSTGRES_MIGRATIONS: List[Migration] = [
+    Migration(1, "Create schema", create_schema),
+    Migration(2, "Add content-addressed blobs referenced by theses", create_blobs),
+    Migration(3, "Order each student's supervisor assignments by assignment time", create_assignment_order_index),
+]
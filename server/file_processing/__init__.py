@@ -4,16 +4,23 @@ File processing package for ThesisAI Tool.
 This package contains all file processing-related modules.
 """
 
-from .text_extractor import extract_text_from_file
+from .text_extractor import extract_text_from_file, iter_text_pages
 from .image_converter import (
     convert_document_to_images,
     create_text_preview_image,
     create_error_preview_image
 )
+from .document_structure import extract_document_structure
+from .blob_store import blob_store
+from .preview_cache import preview_cache
 
 __all__ = [
     'extract_text_from_file',
+    'iter_text_pages',
     'convert_document_to_images',
     'create_text_preview_image',
-    'create_error_preview_image'
+    'create_error_preview_image',
+    'extract_document_structure',
+    'blob_store',
+    'preview_cache'
 ] 
\ No newline at end of file
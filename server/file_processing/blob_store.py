@@ -0,0 +1,210 @@
+"""
+Content-addressed storage of thesis files for ThesisAI Tool.
+
+Every upload is stored under the SHA-256 of its content, so students
+re-uploading the same PDF share one file. Files live in the configured
+storage backend (see storage.py):
+
+    blobs/ab/ab12...ef-<nonce>.docx
+    derived/ab12...ef/text.txt
+    derived/ab12...ef/document.pdf
+    derived/ab12...ef/structure-v2.json
+
+Anything computed from a file (extracted text, previews, AI results) can be
+kept in the blob's derived directory, or keyed by the blob path, and is then
+shared by every thesis with that content. The blobs table counts the theses
+that reference each blob. prune() removes files once that count reaches zero.
+
+A stored file is never overwritten: each one gets a key of its own. That
+works the same on a filesystem and on S3, which has no atomic rename. An
+upload racing with prune() stores a new file instead of reviving the one
+being deleted.
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import uuid
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from config.config import config
+from .document_converter import convert_to_pdf, is_office_document
+from .document_structure import STRUCTURE_VERSION, extract_document_structure
+from .storage import LocalStorage, S3_SCHEME, storage
+from .text_extractor import extract_text_from_file, iter_text_pages
+from .upload_storage import receive_upload, discard_upload
+
+logger = logging.getLogger(__name__)
+
+HASH_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+class BlobStore:
+    """Files stored by content hash, with derived artifacts alongside"""
+
+    def __init__(self, storage, local_root: Optional[str] = None):
+        self.storage = storage
+        # Files stored before a switch to S3 stay on the local filesystem
+        self.local = storage if isinstance(storage, LocalStorage) else LocalStorage(local_root or config.UPLOAD_DIR)
+
+    def backend_for(self, location: str):
+        """The backend holding a stored file"""
+        return self.storage if location.startswith(S3_SCHEME) else self.local
+
+    def new_location(self, content_hash: str, ext: str) -> str:
+        """A fresh location for a file with this content; the extension picks the extractor"""
+        return self.storage.location(f"blobs/{content_hash[:2]}/{content_hash}-{uuid.uuid4().hex[:12]}{ext.lower()}")
+
+    def content_hash_of(self, location: str) -> Optional[str]:
+        """Content hash of a stored file, or None for files outside the store"""
+        parts = re.split(r'[\\/]', location)
+        if len(parts) < 3 or parts[-3] != "blobs":
+            return None
+        content_hash = parts[-1][:64]
+        if not HASH_PATTERN.match(content_hash) or parts[-2] != content_hash[:2]:
+            return None
+        return content_hash
+
+    def derived_location(self, location: str, name: str) -> Optional[str]:
+        """Location of an artifact derived from a stored file, or None for files outside the store"""
+        content_hash = self.content_hash_of(location)
+        if not content_hash:
+            return None
+        return self.backend_for(location).location(f"derived/{content_hash}/{name}")
+
+    def exists(self, location: str) -> bool:
+        return self.backend_for(location).exists(location)
+
+    def local_path(self, location: str) -> str:
+        """A local file with the content, for extractors and renderers; raises FileNotFoundError"""
+        return self.backend_for(location).local_path(location)
+
+    def presigned_url(self, location: str, filename: str, inline: bool = False) -> Optional[str]:
+        """URL the client can fetch the file from directly, or None to serve it through the API"""
+        return self.backend_for(location).presigned_url(location, filename, inline=inline)
+
+    async def receive(self, upload: UploadFile, max_bytes: int, chunk_size: int) -> Dict[str, Any]:
+        """Stream an upload into the store's staging area, returning temp_path, size and sha256"""
+        return await receive_upload(upload, self.storage.staging_dir, max_bytes, chunk_size)
+
+    async def store(self, thesis_repo, thesis_data: Dict[str, Any], temp_path: str) -> Dict[str, Any]:
+        """Create the thesis for a received file, storing the file unless its content is already stored
+
+        thesis_repo is the async thesis repository. thesis_data needs
+        content_hash, size and filename; its filepath is set to the
+        location of the stored file. The received file is consumed either way.
+        """
+        try:
+            thesis = await thesis_repo.create_thesis_with_existing_blob(thesis_data)
+            if thesis is not None:
+                return thesis
+            location = self.new_location(thesis_data['content_hash'], os.path.splitext(thesis_data['filename'])[1])
+            await run_in_threadpool(self.storage.save_file, temp_path, location)
+        finally:
+            await discard_upload(temp_path)
+
+        thesis_data['filepath'] = location
+        try:
+            # A copy of this content waiting to be pruned goes first, the new file takes its place
+            stale = await thesis_repo.get_blob(thesis_data['content_hash'])
+            if stale and stale['ref_count'] <= 0:
+                await run_in_threadpool(self._prune_blob, thesis_repo.sync, stale)
+            thesis = await thesis_repo.create_thesis(thesis_data)
+        except BaseException:
+            await run_in_threadpool(self.storage.delete, location)
+            raise
+        if thesis_data['filepath'] != location:
+            # The same content was stored concurrently; use that file
+            await run_in_threadpool(self.storage.delete, location)
+        return thesis
+
+    async def discard(self, temp_path: str):
+        """Remove a received upload that will not be stored"""
+        await discard_upload(temp_path)
+
+    def extract_text(self, location: str, max_chars: Optional[int] = None) -> str:
+        """Extract a file's text, caching it per blob so identical uploads are extracted once
+        
+        With max_chars only the start of the text is returned. It comes from
+        the cache when the text has been extracted before; otherwise
+        extraction stops once the budget is reached and nothing is cached.
+        """
+        backend = self.backend_for(location)
+        cache_location = self.derived_location(location, "text.txt")
+        if not cache_location:
+            return extract_text_from_file(backend.local_path(location), max_chars)
+
+        try:
+            return backend.read_bytes(cache_location).decode("utf-8")[:max_chars]
+        except FileNotFoundError:
+            pass
+
+        if max_chars is not None:
+            return extract_text_from_file(backend.local_path(location), max_chars)
+        text = extract_text_from_file(backend.local_path(location))
+        backend.write_bytes(cache_location, text.encode("utf-8"))
+        return text
+
+    def document_structure(self, location: str) -> Dict[str, Any]:
+        """Headings, sections, references and captions of a file (see document_structure), built once per blob"""
+        backend = self.backend_for(location)
+        cache_location = self.derived_location(location, f"structure-v{STRUCTURE_VERSION}.json")
+        if not cache_location:
+            return extract_document_structure(backend.local_path(location))
+
+        try:
+            return json.loads(backend.read_bytes(cache_location))
+        except FileNotFoundError:
+            pass
+
+        structure = extract_document_structure(backend.local_path(location))
+        backend.write_bytes(cache_location, json.dumps(structure, ensure_ascii=False).encode("utf-8"))
+        return structure
+
+    def iter_text_pages(self, location: str) -> Iterator[Tuple[int, str]]:
+        """Yield (page number, text) for each page of a stored file as it is extracted"""
+        return iter_text_pages(self.local_path(location))
+
+    def pdf_path(self, location: str) -> str:
+        """A local file to render previews from: DOC/DOCX files converted to PDF once per blob, others as they are"""
+        backend = self.backend_for(location)
+        path = backend.local_path(location)
+        cache_location = self.derived_location(location, "document.pdf")
+        if not cache_location or not is_office_document(path):
+            return path
+
+        try:
+            return backend.local_path(cache_location)
+        except FileNotFoundError:
+            pass
+
+        os.makedirs(backend.staging_dir, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=backend.staging_dir) as tmp:
+            backend.save_file(convert_to_pdf(path, os.path.join(tmp, "document.pdf")), cache_location)
+        return backend.local_path(cache_location)
+
+    def _prune_blob(self, thesis_repo, blob: Dict[str, Any]) -> bool:
+        """Delete an unreferenced blob's file once its row is gone, or once an upload has taken the row over"""
+        location = blob['filepath']
+        backend = self.backend_for(location)
+        if thesis_repo.delete_unreferenced_blob(blob['content_hash'], location):
+            backend.delete(location)
+            backend.delete_prefix(backend.location(f"derived/{blob['content_hash']}"))
+            return True
+        current = thesis_repo.get_blob(blob['content_hash'])
+        if current is not None and current['filepath'] != location:
+            backend.delete(location)
+        return False
+
+    def prune(self, thesis_repo) -> int:
+        """Delete blobs (and their derived artifacts) no thesis references, returning the count"""
+        removed = sum(self._prune_blob(thesis_repo, blob) for blob in thesis_repo.get_unreferenced_blobs())
+        if removed:
+            logger.info(f"Pruned {removed} unreferenced blobs")
+        return removed
+
+blob_store = BlobStore(storage)
@@ -0,0 +1,166 @@
+"""
+Office document to PDF conversion for ThesisAI Tool.
+
+Previews of DOC/DOCX files are rendered from a PDF of the document, with the
+same page renderer as PDF theses (see image_converter). blob_store converts
+each stored document once and keeps the PDF with its derived artifacts.
+
+The conversion runs LibreOffice headless when it is installed (or set with
+LIBREOFFICE_PATH), which lays pages out the way Word does. Each conversion
+is a separate soffice process, sandboxed as far as a subprocess allows:
+
+- it works on a copy of the file in a scratch directory, under a fixed name
+- it gets a throwaway user profile and home directory, the host PATH and no
+  other environment, so API keys and database settings are not visible to it
+- it runs in its own session (a new process group on Windows) and the whole
+  group is killed when it exceeds OFFICE_CONVERSION_TIMEOUT
+- at most OFFICE_CONVERSION_WORKERS conversions run at a time
+
+Without LibreOffice, DOCX files are laid out from their paragraphs, headings
+and tables with PyMuPDF. DOC files need LibreOffice.
+"""
+
+import html
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import docx
+import fitz  # PyMuPDF
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+from config.config import config
+
+OFFICE_EXTENSIONS = (".doc", ".docx")
+
+# Page layout of the PyMuPDF fallback: A4 with 2.5cm margins
+FALLBACK_PAGE = fitz.paper_rect("a4")
+FALLBACK_MARGIN = 72
+FALLBACK_CSS = """
+* {font-family: sans-serif; font-size: 11pt; line-height: 1.4;}
+h1 {font-size: 18pt;} h2 {font-size: 15pt;} h3 {font-size: 13pt;}
+table {border-collapse: collapse;} td {border: 1px solid gray; padding: 2pt; font-size: 9pt;}
+"""
+
+_conversion_slots = threading.BoundedSemaphore(max(1, config.OFFICE_CONVERSION_WORKERS))
+
+class DocumentConversionError(Exception):
+    """Raised when a document cannot be converted to PDF"""
+
+def is_office_document(file_path: str) -> bool:
+    return os.path.splitext(file_path)[1].lower() in OFFICE_EXTENSIONS
+
+def find_libreoffice() -> Optional[str]:
+    """Path of the LibreOffice executable, or None when it is not installed"""
+    if config.LIBREOFFICE_PATH:
+        return config.LIBREOFFICE_PATH
+    return shutil.which("soffice") or shutil.which("libreoffice")
+
+def convert_to_pdf(file_path: str, output_path: str) -> str:
+    """Convert a DOC/DOCX file to a PDF at output_path, returning output_path"""
+    soffice = find_libreoffice()
+    if soffice:
+        with _conversion_slots:
+            convert_with_libreoffice(soffice, file_path, output_path)
+    elif os.path.splitext(file_path)[1].lower() == ".docx":
+        convert_docx_with_pymupdf(file_path, output_path)
+    else:
+        raise DocumentConversionError("Previews of DOC files need LibreOffice")
+    return output_path
+
+def sandbox_env(scratch: str) -> Dict[str, str]:
+    """Environment of a conversion: the host PATH and a home inside the scratch directory"""
+    env = {"PATH": os.environ.get("PATH", os.defpath)}
+    if os.name == "nt":
+        # Windows programs fail to start without SYSTEMROOT
+        env.update({"SYSTEMROOT": os.environ.get("SYSTEMROOT", r"C:\Windows"), "USERPROFILE": scratch,
+                    "APPDATA": scratch, "LOCALAPPDATA": scratch, "TEMP": scratch, "TMP": scratch})
+    else:
+        env.update({"HOME": scratch, "LANG": "C.UTF-8"})
+    return env
+
+def process_group_options() -> Dict[str, Any]:
+    """Popen arguments that give the converter a process group of its own"""
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+def kill_process_group(process: subprocess.Popen):
+    """Kill a converter and the processes it started"""
+    if os.name == "nt":
+        # soffice.exe hands the work to soffice.bin, so the whole tree goes
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        process.kill()
+    else:
+        os.killpg(process.pid, signal.SIGKILL)
+
+def convert_with_libreoffice(soffice: str, file_path: str, output_path: str):
+    """Run one sandboxed headless LibreOffice conversion"""
+    with tempfile.TemporaryDirectory(prefix="thesis-convert-") as scratch:
+        source = os.path.join(scratch, "document" + os.path.splitext(file_path)[1].lower())
+        shutil.copyfile(file_path, source)
+        command = [
+            soffice, "--headless", "--norestore", "--nolockcheck", "--nodefault", "--nologo",
+            f"-env:UserInstallation={Path(scratch, 'profile').as_uri()}",
+            "--convert-to", "pdf", "--outdir", os.path.join(scratch, "out"), source,
+        ]
+        process = subprocess.Popen(command, cwd=scratch, env=sandbox_env(scratch), stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, **process_group_options())
+        try:
+            output, _ = process.communicate(timeout=config.OFFICE_CONVERSION_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            kill_process_group(process)
+            process.communicate()
+            raise DocumentConversionError(
+                f"LibreOffice did not finish within {config.OFFICE_CONVERSION_TIMEOUT} seconds")
+
+        converted = os.path.join(scratch, "out", "document.pdf")
+        if process.returncode != 0 or not os.path.exists(converted):
+            message = output.decode("utf-8", errors="replace").strip()[-500:]
+            raise DocumentConversionError(f"LibreOffice conversion failed: {message or process.returncode}")
+        shutil.move(converted, output_path)
+
+def docx_to_html(file_path: str) -> str:
+    """Paragraphs, headings and tables of a DOCX file, in document order"""
+    document = docx.Document(file_path)
+    parts = []
+    for element in document.element.body.iterchildren():
+        if element.tag.endswith("}p"):
+            paragraph = Paragraph(element, document)
+            text = html.escape(paragraph.text)
+            style = paragraph.style.name if paragraph.style is not None else ""
+            if style == "Title":
+                parts.append(f"<h1>{text}</h1>")
+            elif style.startswith("Heading") and style[-1:].isdigit():
+                level = min(int(style.split()[-1]), 3)
+                parts.append(f"<h{level}>{text}</h{level}>")
+            else:
+                parts.append(f"<p>{text or '&nbsp;'}</p>")
+        elif element.tag.endswith("}tbl"):
+            rows = ("<tr>" + "".join(f"<td>{html.escape(cell.text)}</td>" for cell in row.cells) + "</tr>"
+                    for row in Table(element, document).rows)
+            parts.append(f"<table>{''.join(rows)}</table>")
+    return "\n".join(parts)
+
+def convert_docx_with_pymupdf(file_path: str, output_path: str):
+    """Lay out a DOCX file's text on A4 pages when LibreOffice is not available"""
+    try:
+        story = fitz.Story(html=docx_to_html(file_path), user_css=FALLBACK_CSS)
+    except Exception as e:
+        raise DocumentConversionError(f"Cannot read DOCX file: {e}") from e
+    writer = fitz.DocumentWriter(output_path)
+    content = FALLBACK_PAGE + (FALLBACK_MARGIN, FALLBACK_MARGIN, -FALLBACK_MARGIN, -FALLBACK_MARGIN)
+    more = True
+    while more:
+        device = writer.begin_page(FALLBACK_PAGE)
+        more, _ = story.place(content)
+        story.draw(device)
+        writer.end_page()
+    writer.close()
@@ -0,0 +1,462 @@
+"""
+Document structure extraction for ThesisAI Tool.
+
+Turns a thesis into a model that prompts, the reference checker and clients
+can address by section instead of re-scanning flat text:
+
+    {
+        "version": 2,
+        "source": "pdf",
+        "page_count": 48,
+        "pages": [{"page": 1, "start": 0, "end": 1523}, ...],
+        "text": "...",
+        "sections": [{"number": "2.1", "title": "Data collection", "level": 2,
+                      "parent": 3, "start": 20110, "end": 24380,
+                      "page_start": 9, "page_end": 11}, ...],
+        "references": [{"text": "Smith, J. 2020. ...", "page": 45,
+                        "year": "2020", "url": "https://..."}, ...],
+        "captions": [{"kind": "figure", "label": "Figure 3", "number": "3",
+                      "title": "Survey results", "page": 21, "start": 40210}, ...]
+    }
+
+start and end are character offsets into text. Headings come from the
+PDF's outline (bookmarks) when it has one, otherwise from the layout: lines
+set larger or bold than the body text, with their numbering giving the
+level. DOCX headings come from the Heading styles; DOCX and TXT files have
+no fixed pages, so their page fields are None. Running headers, footers and
+page numbers are recognised and left out, so they do not end up inside
+sections or break up headings and reference entries.
+
+Extraction is a single pass over the document; blob_store caches the
+result per blob (see BlobStore.document_structure).
+"""
+
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import docx
+import fitz  # PyMuPDF
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+from .text_extractor import iter_text_pages
+
+# Bump when the output changes, so cached structures are recomputed
+STRUCTURE_VERSION = 2
+
+HEADING_NUMBER = re.compile(r'^((?:\d+\.)*\d+)\.?\s+(\S.*)$')
+REFERENCE_TITLES = re.compile(r'^(references|bibliography|works cited|sources|lähteet|lähdeluettelo)$', re.I)
+FRONT_LIST_TITLES = re.compile(
+    r'^(table of contents|contents|list of (figures|tables)|sisällys(luettelo)?|kuvaluettelo|taulukkoluettelo)$', re.I)
+KNOWN_TITLES = re.compile(
+    r'^(abstract|tiivistelmä|introduction|johdanto|conclusions?|discussion|summary|pohdinta|'
+    r'johtopäätökset|references|bibliography|lähteet|appendi(x|ces)|liitteet)$', re.I)
+CAPTION_PATTERN = re.compile(
+    r'^(figure|fig\.|table|kuva|kuvio|taulukko)\s+(\d+(?:\.\d+)*)\s*[.:\-–]?\s*(.*)$', re.I)
+CAPTION_KINDS = {"figure": "figure", "fig.": "figure", "kuva": "figure", "kuvio": "figure",
+                 "table": "table", "taulukko": "table"}
+DOT_LEADER = re.compile(r'(\.\s?){3,}|…')
+TRAILING_PAGE_NUMBER = re.compile(r'\s\d{1,3}$')
+PAGE_NUMBER = re.compile(r'^(page\s+)?(\d{1,4}|[ivxlc]{1,6})(\s*(/|of)\s*\d{1,4})?$', re.I)
+REFERENCE_START = re.compile(r'^(\[\d+\]|\d{1,3}\.\s|[A-ZÅÄÖ][\w\'’\-]+(\s[A-ZÅÄÖ][\w\'’\-]+)*,\s)')
+YEAR = re.compile(r'\b(1[89]\d\d|20\d\d)[a-z]?\b')
+URL = re.compile(r'(https?://\S+|www\.\S+|doi\.org/\S+)')
+
+# Lines at least this much larger than the body text can be headings
+HEADING_SIZE_RATIO = 1.15
+
+def _line(text: str, page: Optional[int], block: int, size: float = 0.0, bold: bool = False,
+          heading_level: Optional[int] = None) -> Dict[str, Any]:
+    return {"text": text, "page": page, "block": block, "size": size, "bold": bold,
+            "heading_level": heading_level, "furniture": False, "x0": None, "gap": None}
+
+def _pdf_lines(document: fitz.Document) -> List[Dict[str, Any]]:
+    """Lines of a PDF with their font size and weight, marking running headers, footers and page numbers"""
+    lines, block_number = [], 0
+    edge_texts = Counter()
+    for pdf_page in document:
+        height = pdf_page.rect.height or 1
+        seen_on_page = set()
+        previous_bottom = None
+        for block in pdf_page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT)["blocks"]:
+            if block.get("type") != 0:
+                continue
+            block_number += 1
+            for pdf_line in block["lines"]:
+                spans = [span for span in pdf_line["spans"] if span["text"].strip()]
+                if not spans:
+                    continue
+                text = " ".join("".join(span["text"] for span in pdf_line["spans"]).split())
+                letters = sum(len(span["text"].strip()) for span in spans)
+                size = sum(span["size"] * len(span["text"].strip()) for span in spans) / letters
+                bold = all(span["flags"] & fitz.TEXT_FONT_BOLD or "bold" in span["font"].lower()
+                           for span in spans)
+                line = _line(text, pdf_page.number + 1, block_number, round(size, 1), bold)
+                x0, y0, y1 = pdf_line["bbox"][0], pdf_line["bbox"][1], pdf_line["bbox"][3]
+                # Space above the line, relative to its height, tells paragraphs apart
+                line["x0"] = round(x0, 1)
+                if previous_bottom is not None and y1 > y0:
+                    line["gap"] = (y0 - previous_bottom) / (y1 - y0)
+                previous_bottom = y1
+                line["edge"] = y1 < height * 0.08 or y0 > height * 0.92
+                if line["edge"]:
+                    key = re.sub(r'\d+', '#', text.lower())
+                    if key not in seen_on_page:
+                        seen_on_page.add(key)
+                        edge_texts[key] += 1
+                lines.append(line)
+
+    repeated = max(3, int(len(document) * 0.3))
+    for line in lines:
+        if line.pop("edge"):
+            key = re.sub(r'\d+', '#', line["text"].lower())
+            line["furniture"] = edge_texts[key] >= repeated or bool(PAGE_NUMBER.match(line["text"]))
+    return lines
+
+def _docx_lines(file_path: str) -> List[Dict[str, Any]]:
+    """Paragraphs (and table rows) of a DOCX file, with heading levels from their styles"""
+    document = docx.Document(file_path)
+    lines = []
+    for block_number, element in enumerate(document.element.body.iterchildren()):
+        if element.tag.endswith("}p"):
+            paragraph = Paragraph(element, document)
+            text = " ".join(paragraph.text.split())
+            style = paragraph.style.name if paragraph.style is not None else ""
+            level = None
+            if style.startswith("Heading") and style[-1:].isdigit():
+                level = int(style.split()[-1])
+            if text:
+                lines.append(_line(text, None, block_number, heading_level=level))
+        elif element.tag.endswith("}tbl"):
+            for row in Table(element, document).rows:
+                text = " ".join(" ".join(cell.text.split()) for cell in row.cells)
+                if text:
+                    lines.append(_line(text, None, block_number))
+    return lines
+
+def _text_lines(file_path: str) -> List[Dict[str, Any]]:
+    """Lines of a plain text file; blank lines separate blocks"""
+    lines, block_number = [], 0
+    for _, text in iter_text_pages(file_path):
+        for raw_line in text.splitlines():
+            stripped = " ".join(raw_line.split())
+            if not stripped:
+                block_number += 1
+                continue
+            lines.append(_line(stripped, None, block_number))
+    return lines
+
+def _split_number(text: str):
+    """("2.1", "Data collection") for "2.1 Data collection", (None, text) for unnumbered headings"""
+    match = HEADING_NUMBER.match(text)
+    if match and len(match.group(1)) <= 11:
+        return match.group(1), match.group(2)
+    return None, text
+
+def _looks_like_heading_text(text: str) -> bool:
+    if not text or len(text) > 120 or not re.search(r'[^\W\d_]', text):
+        return False
+    if DOT_LEADER.search(text) or CAPTION_PATTERN.match(text) or text.endswith((",", ";")):
+        return False
+    return not (text.endswith(".") and len(text.split()) > 8)
+
+def _headings_from_outline(document: fitz.Document, lines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Headings from the PDF's bookmarks, each matched to its line on the page it points to"""
+    headings = []
+    by_page = {}
+    for index, line in enumerate(lines):
+        by_page.setdefault(line["page"], []).append(index)
+    normalize = lambda text: " ".join(text.lower().split())
+    for level, title, page in document.get_toc(simple=True):
+        title = " ".join(title.split())
+        wanted = normalize(title)
+        match = None
+        for candidate_page in (page, page + 1):
+            for index in by_page.get(candidate_page, []):
+                text = normalize(lines[index]["text"])
+                if text and not lines[index]["furniture"] and (
+                        text.startswith(wanted[:40]) or wanted.startswith(text) and len(text) >= 4):
+                    match = index
+                    break
+            if match is not None:
+                break
+        number, heading_title = _split_number(title)
+        headings.append({"line": match, "page": page if page > 0 else None, "level": level,
+                         "number": number, "title": heading_title})
+    return headings
+
+def _headings_from_layout(lines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Headings from font size, weight and numbering, merging headings that wrap onto a second line"""
+    sizes = Counter()
+    for line in lines:
+        if not line["furniture"]:
+            sizes[line["size"]] += len(line["text"])
+    if not sizes:
+        return []
+    body_size = sizes.most_common(1)[0][0]
+
+    candidates = []
+    for index, line in enumerate(lines):
+        text = line["text"]
+        if line["furniture"] or not _looks_like_heading_text(text):
+            continue
+        larger = line["size"] >= body_size * HEADING_SIZE_RATIO
+        bold = line["bold"] and line["size"] >= body_size * 0.95
+        number, _ = _split_number(text)
+        if larger or bold and (number or len(text.split()) <= 10):
+            previous = candidates[-1] if candidates else None
+            if (previous and previous["last"] == index - 1 and lines[previous["line"]]["block"] == line["block"]
+                    and lines[previous["line"]]["size"] == line["size"] and not number):
+                previous["text"] += " " + text
+                previous["last"] = index
+                continue
+            candidates.append({"line": index, "last": index, "text": text})
+
+    headings = []
+    for candidate in candidates:
+        number, title = _split_number(candidate["text"])
+        if number and TRAILING_PAGE_NUMBER.search(title):
+            continue  # A table of contents entry set in a heading font
+        line = lines[candidate["line"]]
+        headings.append({"line": candidate["line"], "page": line["page"], "number": number, "title": title,
+                         "size": line["size"], "bold": line["bold"],
+                         "level": number.count(".") + 1 if number else None})
+
+    # Unnumbered headings take the level of numbered headings set the same size, or rank by size
+    numbered_sizes = {}
+    for heading in headings:
+        if heading["level"]:
+            numbered_sizes.setdefault(heading["level"], []).append(heading["size"])
+    level_sizes = {level: max(set(values), key=values.count) for level, values in numbered_sizes.items()}
+    ranked = sorted({heading["size"] for heading in headings}, reverse=True)
+    for heading in headings:
+        if heading["level"] is None:
+            if level_sizes:
+                heading["level"] = min(level_sizes, key=lambda level: (abs(level_sizes[level] - heading["size"]),
+                                                                        level))
+            else:
+                heading["level"] = ranked.index(heading["size"]) + 1
+    return headings
+
+def _headings_from_text(lines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Headings of text without font information: short numbered lines and well-known titles"""
+    headings = []
+    for index, line in enumerate(lines):
+        text = line["text"]
+        if line["furniture"] or not _looks_like_heading_text(text):
+            continue
+        number, title = _split_number(text)
+        if number:
+            if (len(title.split()) <= 10 and title[:1].isupper() and not title.endswith(".")
+                    and not TRAILING_PAGE_NUMBER.search(title)):
+                headings.append({"line": index, "page": line["page"], "number": number, "title": title,
+                                 "level": number.count(".") + 1})
+        elif KNOWN_TITLES.match(text):
+            headings.append({"line": index, "page": line["page"], "number": None, "title": text, "level": 1})
+    return headings
+
+def _headings_from_styles(lines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    headings = []
+    for index, line in enumerate(lines):
+        if line["heading_level"]:
+            number, title = _split_number(line["text"])
+            headings.append({"line": index, "page": line["page"], "number": number, "title": title,
+                             "level": line["heading_level"]})
+    return headings
+
+def _page_of(offset: int, pages: List[Dict[str, Any]]) -> Optional[int]:
+    for page in pages:
+        if page["start"] <= offset <= page["end"]:
+            return page["page"]
+    return None
+
+def _starts_reference(line: Dict[str, Any], previous: Dict[str, Any]) -> bool:
+    """Whether a line of a reference list begins a new entry"""
+    # An author or number after a line that finished the previous entry
+    finished = previous["text"].endswith((".", ")", "]")) or URL.search(previous["text"].split()[-1])
+    if REFERENCE_START.match(line["text"]) and finished:
+        return True
+    if line["x0"] is None:
+        return line["block"] != previous["block"]
+    # PDF lines: out of a hanging indent, or spaced apart like paragraphs
+    outdented = line["page"] == previous["page"] and line["x0"] < previous["x0"] - 3
+    return outdented or (line["gap"] or 0) > 0.6
+
+def _absolute_url(url: str) -> str:
+    """References often leave out the scheme (www.oph.fi, doi.org/10...); fetching needs it"""
+    return url if re.match(r'https?://', url) else "https://" + url
+
+def _references(lines: List[Dict[str, Any]], first: int, last: int) -> List[Dict[str, Any]]:
+    """Entries of a reference list, each joined from the lines it wraps over"""
+    entries = []
+    previous = None
+    for line in lines[first:last]:
+        text = line["text"]
+        if line["furniture"] or not text:
+            continue
+        if not entries or _starts_reference(line, previous):
+            entries.append({"text": text, "page": line["page"]})
+        else:
+            joiner = "" if entries[-1]["text"].endswith(("-", "/")) else " "
+            entries[-1]["text"] += joiner + text
+        previous = line
+    for entry in entries:
+        year = YEAR.search(entry["text"])
+        url = URL.search(entry["text"])
+        entry["year"] = year.group(1) if year else None
+        entry["url"] = _absolute_url(url.group(1).rstrip(".,;")) if url else None
+    return entries
+
+def build_structure(lines: List[Dict[str, Any]], headings: List[Dict[str, Any]], source: str,
+                    page_count: Optional[int]) -> Dict[str, Any]:
+    """Assemble the document model from lines and the headings found among them"""
+    # Running headers, footers and page numbers are left out of the text
+    offsets, position = [], 0
+    for line in lines:
+        offsets.append(position)
+        if not line["furniture"]:
+            position += len(line["text"]) + 1
+    text = "\n".join(line["text"] for line in lines if not line["furniture"])
+
+    pages = []
+    if page_count:
+        starts = {}
+        for line, offset in zip(lines, offsets):
+            starts.setdefault(line["page"], offset)
+        for page in range(1, page_count + 1):
+            start = starts.get(page, pages[-1]["end"] if pages else 0)
+            pages.append({"page": page, "start": start, "end": start})
+        for page in pages:
+            following = [other["start"] for other in pages if other["page"] > page["page"]]
+            page["end"] = max(page["start"], (min(following) - 1) if following else len(text))
+
+    headings = sorted(headings, key=lambda heading: offsets[heading["line"]] if heading["line"] is not None
+                      else (pages[heading["page"] - 1]["start"] if heading["page"] and pages else 0))
+    sections = []
+    for heading in headings:
+        if heading["line"] is not None:
+            start = offsets[heading["line"]]
+        else:
+            start = pages[heading["page"] - 1]["start"] if heading["page"] and pages else 0
+        sections.append({"number": heading["number"], "title": heading["title"], "level": heading["level"],
+                         "parent": None, "start": start, "end": len(text),
+                         "page_start": heading["page"] if page_count else None, "page_end": None,
+                         "line": heading["line"]})
+    for index, section in enumerate(sections):
+        for later in sections[index + 1:]:
+            if later["level"] <= section["level"]:
+                section["end"] = max(section["start"], later["start"] - 1)
+                break
+        for earlier in range(index - 1, -1, -1):
+            if sections[earlier]["level"] < section["level"]:
+                section["parent"] = earlier
+                break
+        if page_count:
+            section["page_end"] = _page_of(max(section["start"], section["end"] - 1), pages)
+
+    line_starts = {offset: index for index, offset in enumerate(offsets)}
+    references = []
+    for section in reversed(sections):
+        if REFERENCE_TITLES.match(section["title"]):
+            first = section["line"] + 1 if section["line"] is not None else line_starts.get(section["start"], 0)
+            last = next((index for index, offset in enumerate(offsets) if offset > section["end"]), len(lines))
+            references = _references(lines, first, last)
+            break
+
+    front_lists = [(section["start"], section["end"]) for section in sections
+                   if FRONT_LIST_TITLES.match(section["title"])]
+    captions = {}
+    for index, (line, offset) in enumerate(zip(lines, offsets)):
+        match = CAPTION_PATTERN.match(line["text"])
+        if not match or line["furniture"] or DOT_LEADER.search(line["text"]):
+            continue
+        if any(start <= offset <= end for start, end in front_lists):
+            continue
+        title = match.group(3)
+        if not title and index + 1 < len(lines) and lines[index + 1]["block"] == line["block"]:
+            title = lines[index + 1]["text"]
+        kind = CAPTION_KINDS[match.group(1).lower()]
+        label = f"{match.group(1)} {match.group(2)}"
+        # The last occurrence wins over mentions in lists of figures and tables
+        captions[(kind, match.group(2))] = {"kind": kind, "label": label, "number": match.group(2),
+                                            "title": title, "page": line["page"], "start": offset}
+
+    for section in sections:
+        del section["line"]
+    return {
+        "version": STRUCTURE_VERSION,
+        "source": source,
+        "page_count": page_count,
+        "pages": pages,
+        "text": text,
+        "sections": sections,
+        "references": references,
+        "captions": sorted(captions.values(), key=lambda caption: caption["start"]),
+    }
+
+def extract_document_structure(file_path: str) -> Dict[str, Any]:
+    """Build the structured model of a PDF, DOCX or TXT file"""
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext == ".pdf":
+        with fitz.open(file_path) as document:
+            lines = _pdf_lines(document)
+            headings = _headings_from_outline(document, lines) if len(document.get_toc()) >= 2 else []
+            headings = headings or _headings_from_layout(lines) or _headings_from_text(lines)
+            return build_structure(lines, headings, "pdf", len(document))
+    if file_ext == ".docx":
+        lines = _docx_lines(file_path)
+        return build_structure(lines, _headings_from_styles(lines) or _headings_from_text(lines), "docx", None)
+    if file_ext == ".txt":
+        lines = _text_lines(file_path)
+        return build_structure(lines, _headings_from_text(lines), "txt", None)
+    raise ValueError(f"Unsupported file format: {file_ext}")
+
+def section_text(structure: Dict[str, Any], index: int) -> str:
+    """Text of a section, its heading and subsections included; raises IndexError"""
+    section = structure["sections"][index]
+    return structure["text"][section["start"]:section["end"]]
+
+def outline(structure: Dict[str, Any]) -> str:
+    """The heading hierarchy as indented lines, with page numbers when the document has pages"""
+    lines = []
+    for section in structure["sections"]:
+        heading = f"{section['number']} {section['title']}" if section["number"] else section["title"]
+        page = f" (p. {section['page_start']})" if section["page_start"] else ""
+        lines.append("  " * (section["level"] - 1) + heading + page)
+    return "\n".join(lines)
+
+def sections_excerpt(structure: Dict[str, Any], title_pattern: Optional[str], max_chars: int) -> str:
+    """The outline and the text of the sections whose titles match, within max_chars
+
+    Subsections of a matching section come with it. Without a pattern, or
+    when no title matches, the text is taken from the start of the document.
+    """
+    parts = []
+    document_outline = outline(structure)
+    if document_outline:
+        parts.append("OUTLINE:\n" + document_outline[:max_chars // 4])
+
+    matched = []
+    if title_pattern:
+        pattern = re.compile(title_pattern, re.I)
+        for index, section in enumerate(structure["sections"]):
+            ancestor, inside_match = section["parent"], False
+            while ancestor is not None:
+                inside_match = inside_match or ancestor in matched
+                ancestor = structure["sections"][ancestor]["parent"]
+            if pattern.search(section["title"]) and not inside_match:
+                matched.append(index)
+
+    budget = max_chars - sum(len(part) + 2 for part in parts)
+    if matched:
+        for index in matched:
+            if budget <= 0:
+                break
+            text = section_text(structure, index)[:budget]
+            parts.append(text)
+            budget -= len(text) + 2
+    else:
+        parts.append(structure["text"][:max(budget, 0)])
+    return "\n\n".join(parts)[:max_chars]
@@ -5,12 +5,18 @@ This module handles document to image conversion for preview purposes.
 """
 
 import io
+import os
 import base64
+import tempfile
+from contextlib import contextmanager
+from functools import lru_cache
 import fitz  # PyMuPDF
 import docx
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any, Optional
 from fastapi import HTTPException
 
+from .document_converter import convert_to_pdf, is_office_document
+
 # Image processing imports
 try:
     from PIL import Image, ImageDraw, ImageFont
@@ -22,120 +28,146 @@ except ImportError:
     IMAGE_PROCESSING_AVAILABLE = False
     print("Warning: Image processing libraries not available. Thesis preview as images will be disabled.")
 
-def convert_document_to_images(file_path: str, max_pages: int = 5) -> List[Dict[str, Any]]:
-    """Convert document pages to images for preview"""
+# Fonts for generated images, tried in order; Arial only exists on Windows
+PREVIEW_FONTS = ["DejaVuSans.ttf", "arial.ttf", "LiberationSans-Regular.ttf"]
+
+@lru_cache(maxsize=None)
+def preview_font(size: int) -> "ImageFont.ImageFont":
+    """The first available preview font at a size, loaded once per process"""
+    for font_name in PREVIEW_FONTS:
+        try:
+            return ImageFont.truetype(font_name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+@contextmanager
+def renderable_file(file_path: str) -> Iterator[str]:
+    """The file itself, or a temporary PDF of an office document
+    
+    Stored documents are converted once by blob_store.pdf_path(); this
+    covers files outside the store.
+    """
+    if not is_office_document(file_path):
+        yield file_path
+        return
+    with tempfile.TemporaryDirectory(prefix="thesis-preview-") as tmp:
+        yield convert_to_pdf(file_path, os.path.join(tmp, "document.pdf"))
+
+def count_preview_pages(file_path: str) -> int:
+    """Number of preview pages of a document: every PDF page (DOC/DOCX as converted), one page otherwise"""
+    with renderable_file(file_path) as path:
+        if os.path.splitext(path)[1].lower() != ".pdf":
+            return 1
+        with fitz.open(path) as pdf_document:
+            return len(pdf_document)
+
+# Preview image formats: Pillow format name, media type and file extension
+PREVIEW_FORMATS = {
+    'png': ('PNG', 'image/png', '.png'),
+    'jpeg': ('JPEG', 'image/jpeg', '.jpg'),
+    'webp': ('WEBP', 'image/webp', '.webp'),
+}
+
+def encode_preview_image(img: Image.Image, image_format: str = 'png', quality: int = 80) -> bytes:
+    """Encode a PIL image as a preview in the given format"""
+    img_buffer = io.BytesIO()
+    if image_format == 'png':
+        img.save(img_buffer, format='PNG')
+    else:
+        img.convert('RGB').save(img_buffer, format=PREVIEW_FORMATS[image_format][0], quality=quality)
+    return img_buffer.getvalue()
+
+def render_pdf_page(pdf_page: fitz.Page, max_width: int, image_format: str = 'png', quality: int = 80) -> bytes:
+    """Render a PDF page straight at its preview size and encode it once"""
+    # Zoom to max_width, but not beyond the 2x used for sharp text
+    zoom = min(2.0, max_width / pdf_page.rect.width)
+    pix = pdf_page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    if image_format == 'png':
+        return pix.tobytes("png")
+    if image_format == 'jpeg':
+        return pix.tobytes("jpeg", jpg_quality=quality)
+    # Pillow reads the pixmap's samples in place; only the encoding is done here
+    img = Image.frombuffer("RGB", (pix.width, pix.height), pix.samples, "raw", "RGB", 0, 1)
+    return encode_preview_image(img, image_format, quality)
+
+def render_preview_pages(file_path: str, pages: List[int], max_width: int = 800,
+                         image_format: str = 'png', quality: int = 80) -> List[bytes]:
+    """Render pages (1-based) of a document no wider than max_width, opening it once
+    
+    image_format is a key of PREVIEW_FORMATS; quality applies to JPEG and
+    WebP. Raises IndexError for pages the document does not have.
+    """
     if not IMAGE_PROCESSING_AVAILABLE:
         raise HTTPException(status_code=500, detail="Image processing not available")
     
-    import os
-    file_ext = os.path.splitext(file_path)[1].lower()
-    images = []
+    if is_office_document(file_path):
+        with renderable_file(file_path) as pdf_path:
+            return render_preview_pages(pdf_path, pages, max_width, image_format, quality)
+    
+    if os.path.splitext(file_path)[1].lower() == ".pdf":
+        with fitz.open(file_path) as pdf_document:
+            for page in pages:
+                if not 1 <= page <= len(pdf_document):
+                    raise IndexError(f"Page {page} is out of range")
+            return [render_pdf_page(pdf_document[page - 1], max_width, image_format, quality) for page in pages]
+    
+    if any(page != 1 for page in pages):
+        raise IndexError("Only page 1 exists")
+    if not pages:
+        return []
+    
+    # For unsupported formats, create an error image
+    img = create_error_preview_image("Unsupported file format")
+    return [encode_preview_image(img, image_format, quality)] * len(pages)
+
+def render_preview_page(file_path: str, page: int, max_width: int = 800,
+                        image_format: str = 'png', quality: int = 80) -> bytes:
+    """Render one page (1-based) of a document; see render_preview_pages"""
+    return render_preview_pages(file_path, [page], max_width, image_format, quality)[0]
+
+def render_error_preview(message: str, image_format: str = 'png', quality: int = 80) -> bytes:
+    """Error preview image encoded like rendered pages"""
+    return encode_preview_image(create_error_preview_image(message), image_format, quality)
+
+def preview_image_entry(page: int, image: bytes, image_format: str = 'png') -> Dict[str, Any]:
+    """Inline (base64) form of a rendered page for JSON responses"""
+    img = Image.open(io.BytesIO(image))
+    return {
+        'page': page,
+        'image': f"data:{PREVIEW_FORMATS[image_format][1]};base64,{base64.b64encode(image).decode('utf-8')}",
+        'width': img.width,
+        'height': img.height
+    }
+
+def convert_document_to_images(file_path: str, max_pages: int = 5, first_page: int = 1,
+                               last_page: Optional[int] = None, max_width: int = 800,
+                               image_format: str = 'png', quality: int = 80) -> List[Dict[str, Any]]:
+    """Convert document pages to images for preview
+    
+    Renders pages first_page..last_page (1-based, inclusive, clipped to the
+    document), at most max_pages of them, no wider than max_width. DOC/DOCX
+    files are converted to PDF once for the call.
+    """
+    if not IMAGE_PROCESSING_AVAILABLE:
+        raise HTTPException(status_code=500, detail="Image processing not available")
     
     try:
-        if file_ext == ".pdf":
-            # Convert PDF pages to images
-            pdf_document = fitz.open(file_path)
-            num_pages = min(len(pdf_document), max_pages)
-            
-            for page_num in range(num_pages):
-                page = pdf_document[page_num]
-                # Render page to image with higher resolution
-                mat = fitz.Matrix(2.0, 2.0)  # 2x zoom for better quality
-                pix = page.get_pixmap(matrix=mat)
-                
-                # Convert to PIL Image
-                img_data = pix.tobytes("png")
-                img = Image.open(io.BytesIO(img_data))
-                
-                # Resize for web display (max width 800px)
-                max_width = 800
-                if img.width > max_width:
-                    ratio = max_width / img.width
-                    new_height = int(img.height * ratio)
-                    img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-                
-                # Convert to base64 for web display
-                img_buffer = io.BytesIO()
-                img.save(img_buffer, format='PNG')
-                img_base64 = base64.b64encode(img_buffer.getvalue()).decode('utf-8')
-                
-                images.append({
-                    'page': page_num + 1,
-                    'image': f"data:image/png;base64,{img_base64}",
-                    'width': img.width,
-                    'height': img.height
-                })
-            
-            pdf_document.close()
-            
-        elif file_ext in [".doc", ".docx"]:
-            # For DOC/DOCX, we'll create a simple text-based preview
-            # since converting DOC/DOCX to images is complex
-            try:
-                doc = docx.Document(file_path)
-                text_content = ""
-                for para in doc.paragraphs:
-                    text_content += para.text + "\n"
-                
-                # Create a simple text preview image
-                img = create_text_preview_image(text_content[:2000], "Document Preview")  # First 2000 chars
-                img_buffer = io.BytesIO()
-                img.save(img_buffer, format='PNG')
-                img_base64 = base64.b64encode(img_buffer.getvalue()).decode('utf-8')
-                
-                images.append({
-                    'page': 1,
-                    'image': f"data:image/png;base64,{img_base64}",
-                    'width': img.width,
-                    'height': img.height,
-                    'text_content': text_content
-                })
-                
-            except Exception as e:
-                print(f"Error processing DOC/DOCX: {str(e)}")
-                # Create a fallback image
-                img = create_error_preview_image("Unable to preview document")
-                img_buffer = io.BytesIO()
-                img.save(img_buffer, format='PNG')
-                img_base64 = base64.b64encode(img_buffer.getvalue()).decode('utf-8')
-                
-                images.append({
-                    'page': 1,
-                    'image': f"data:image/png;base64,{img_base64}",
-                    'width': img.width,
-                    'height': img.height
-                })
+        with renderable_file(file_path) as path:
+            last = min(count_preview_pages(path), last_page or first_page + max_pages - 1, first_page + max_pages - 1)
+            pages = list(range(first_page, last + 1))
+            rendered = render_preview_pages(path, pages, max_width, image_format, quality)
+        images = [preview_image_entry(page, image, image_format) for page, image in zip(pages, rendered)]
         
-        else:
-            # For unsupported formats, create an error image
-            img = create_error_preview_image("Unsupported file format")
-            img_buffer = io.BytesIO()
-            img.save(img_buffer, format='PNG')
-            img_base64 = base64.b64encode(img_buffer.getvalue()).decode('utf-8')
-            
-            images.append({
-                'page': 1,
-                'image': f"data:image/png;base64,{img_base64}",
-                'width': img.width,
-                'height': img.height
-            })
+        if images and images[0]['page'] == 1 and os.path.splitext(file_path)[1].lower() == ".docx":
+            doc = docx.Document(file_path)
+            images[0]['text_content'] = "".join(para.text + "\n" for para in doc.paragraphs)
+        return images
     
     except Exception as e:
         print(f"Error converting document to images: {str(e)}")
-        # Create error image
-        img = create_error_preview_image("Error processing document")
-        img_buffer = io.BytesIO()
-        img.save(img_buffer, format='PNG')
-        img_base64 = base64.b64encode(img_buffer.getvalue()).decode('utf-8')
-        
-        images.append({
-            'page': 1,
-            'image': f"data:image/png;base64,{img_base64}",
-            'width': img.width,
-            'height': img.height
-        })
-    
-    return images
+        return [preview_image_entry(1, render_error_preview("Error processing document", image_format, quality),
+                                    image_format)]
 
 def create_text_preview_image(text: str, title: str) -> Image.Image:
     """Create a preview image from text content"""
@@ -143,13 +175,8 @@ def create_text_preview_image(text: str, title: str) -> Image.Image:
     img = Image.new('RGB', (800, 600), color='white')
     draw = ImageDraw.Draw(img)
     
-    # Try to use a default font, fallback to basic if not available
-    try:
-        font = ImageFont.truetype("arial.ttf", 14)
-        title_font = ImageFont.truetype("arial.ttf", 18)
-    except:
-        font = ImageFont.load_default()
-        title_font = ImageFont.load_default()
+    font = preview_font(14)
+    title_font = preview_font(18)
     
     # Draw title
     draw.text((20, 20), title, fill='black', font=title_font)
@@ -159,17 +186,23 @@ def create_text_preview_image(text: str, title: str) -> Image.Image:
     words = text.split()
     current_line = ""
     
+    space_width = font.getlength(" ")
+    line_width = 0
     for word in words:
-        test_line = current_line + " " + word if current_line else word
-        bbox = draw.textbbox((0, 0), test_line, font=font)
-        if bbox[2] > 760:  # 800 - 40 (margins)
+        # Widths are added up per word instead of measuring the whole line again
+        word_width = font.getlength(word)
+        test_width = line_width + space_width + word_width if current_line else word_width
+        if test_width > 760:  # 800 - 40 (margins)
             if current_line:
                 lines.append(current_line)
-                current_line = word
+                current_line, line_width = word, word_width
             else:
                 lines.append(word)
+            if len(lines) > 30:
+                break
         else:
-            current_line = test_line
+            current_line = current_line + " " + word if current_line else word
+            line_width = test_width
     
     if current_line:
         lines.append(current_line)
@@ -192,10 +225,7 @@ def create_error_preview_image(message: str) -> Image.Image:
     img = Image.new('RGB', (400, 200), color='#f8f9fa')
     draw = ImageDraw.Draw(img)
     
-    try:
-        font = ImageFont.truetype("arial.ttf", 16)
-    except:
-        font = ImageFont.load_default()
+    font = preview_font(16)
     
     # Draw error message
     draw.text((20, 80), message, fill='#dc3545', font=font)
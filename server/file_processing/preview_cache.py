@@ -0,0 +1,104 @@
+"""
+Preview image cache for ThesisAI Tool.
+
+Rendering a PDF page and encoding it is the expensive part of a preview, and
+a thesis file never changes, so each rendered page is kept with the blob's
+derived artifacts:
+
+    derived/ab12...ef/previews/<page>-<width>-q80.webp
+
+Pages are rendered when first requested and are shared by
+every thesis with the same content. The name carries the format and
+quality, so changing PREVIEW_FORMAT or PREVIEW_QUALITY renders afresh
+instead of serving old images. prune() removes them with the blob. Files
+outside the blob store are rendered on every request. DOC/DOCX pages are
+rendered from the blob's PDF conversion (see blob_store.pdf_path).
+
+Thumbnail strips need every page of a thesis at once. get_pages() renders
+the missing ones on a pool of PREVIEW_WORKERS processes: PyMuPDF holds the
+GIL while rendering, so threads would not run pages in parallel.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from config.config import config
+from .blob_store import BlobStore, blob_store
+from .image_converter import PREVIEW_FORMATS, count_preview_pages, render_preview_pages
+
+class PreviewCache:
+    """Rendered preview pages keyed by content hash, page, width and encoding"""
+
+    def __init__(self, store: BlobStore, image_format: str = 'png', quality: int = 80, workers: int = 0):
+        if image_format not in PREVIEW_FORMATS:
+            raise RuntimeError(f"PREVIEW_FORMAT must be one of {', '.join(PREVIEW_FORMATS)}, not {image_format!r}")
+        self.store = store
+        self.image_format = image_format
+        self.quality = quality
+        self.media_type = PREVIEW_FORMATS[image_format][1]
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _render_pool(self) -> ProcessPoolExecutor:
+        """Worker processes, started on first use"""
+        if self._pool is None:
+            # Spawned rather than forked: the server process has threads and open connections
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def _name(self, page: int, width: int) -> str:
+        extension = PREVIEW_FORMATS[self.image_format][2]
+        if self.image_format == 'png':
+            return f"{page}-{width}{extension}"
+        return f"{page}-{width}-q{self.quality}{extension}"
+
+    def etag(self, location: str, page: int, width: int) -> Optional[str]:
+        """Strong ETag of a page image, known without rendering it; None for files outside the store"""
+        content_hash = self.store.content_hash_of(location)
+        return f'"{content_hash}-{self._name(page, width)}"' if content_hash else None
+
+    def page_count(self, location: str) -> int:
+        return count_preview_pages(self.store.pdf_path(location))
+
+    def get_page(self, location: str, page: int, width: int) -> bytes:
+        """Image of a page (1-based), rendered on first use; raises IndexError past the last page"""
+        return self.get_pages(location, [page], width)[page]
+
+    def get_pages(self, location: str, pages: List[int], width: int) -> Dict[int, bytes]:
+        """Images of several pages, rendering the uncached ones in parallel; raises IndexError past the last page"""
+        backend = self.store.backend_for(location)
+        cache_locations = {page: self.store.derived_location(location, f"previews/{self._name(page, width)}")
+                           for page in pages}
+        images = {}
+        for page, cache_location in cache_locations.items():
+            if cache_location:
+                try:
+                    images[page] = backend.read_bytes(cache_location)
+                except FileNotFoundError:
+                    pass
+        missing = [page for page in pages if page not in images]
+        if not missing:
+            return images
+
+        path = self.store.pdf_path(location)
+        render_options = {"max_width": width, "image_format": self.image_format, "quality": self.quality}
+        if self.workers and len(missing) > 1:
+            # Contiguous runs of pages, so each worker opens the document once
+            size = -(-len(missing) // self.workers)
+            chunks = [missing[start:start + size] for start in range(0, len(missing), size)]
+            futures = [self._render_pool().submit(render_preview_pages, path, chunk, **render_options)
+                       for chunk in chunks]
+            rendered = [image for future in futures for image in future.result()]
+        else:
+            rendered = render_preview_pages(path, missing, **render_options)
+
+        for page, image in zip(missing, rendered):
+            if cache_locations[page]:
+                backend.write_bytes(cache_locations[page], image)
+            images[page] = image
+        return images
+
+preview_cache = PreviewCache(blob_store, image_format=config.PREVIEW_FORMAT, quality=config.PREVIEW_QUALITY,
+                             workers=config.PREVIEW_WORKERS)
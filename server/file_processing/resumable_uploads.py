@@ -0,0 +1,249 @@
+"""
+Resumable uploads for ThesisAI Tool.
+
+Large theses are sent in pieces, so a dropped connection only costs the
+chunk in flight:
+
+    POST   /thesis/uploads                    -> upload_id, offset 0
+    PUT    /thesis/uploads/{id}?offset=N      append the next chunk
+    GET    /thesis/uploads/{id}               current offset, to resume
+    POST   /thesis/uploads/{id}/complete      hash the file and create the thesis
+    DELETE /thesis/uploads/{id}               abandon the upload
+
+Each upload is a data file plus a small JSON description in
+UPLOAD_DIR/partial, so any worker can continue it and it survives restarts.
+The size of the data file is the offset. A chunk cut off mid-transfer keeps
+the bytes that arrived, and the client resumes from the offset GET reports.
+Chunks are written under an OS lock on the data file (flock on POSIX,
+msvcrt.locking on Windows), so two workers never append to the same upload
+at once.
+Uploads untouched for RESUMABLE_UPLOAD_TTL_HOURS are deleted.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import re
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException
+
+from config.config import config
+from .upload_storage import TEMP_SUFFIX, UploadTooLargeError, hash_file
+
+UPLOAD_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# Windows locks are mandatory, so the lock covers a byte far past any upload's
+# end rather than the data other handles read
+WINDOWS_LOCK_OFFSET = 2 ** 40
+
+def try_lock_file(fd: int) -> bool:
+    """Lock an open file against other processes without waiting; False if it is held"""
+    if os.name == "nt":
+        import msvcrt
+        os.lseek(fd, WINDOWS_LOCK_OFFSET, os.SEEK_SET)
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    import fcntl
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+def unlock_file(fd: int):
+    """Release a lock taken with try_lock_file"""
+    if os.name == "nt":
+        import msvcrt
+        os.lseek(fd, WINDOWS_LOCK_OFFSET, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+class ResumableUploads:
+    """On-disk state of uploads sent in chunks"""
+
+    def __init__(self, directory: str, ttl_seconds: float):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        # Serialises chunks of one upload within this process
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _paths(self, upload_id: str):
+        """Metadata and data file of an upload"""
+        if not UPLOAD_ID_PATTERN.match(upload_id):
+            raise HTTPException(status_code=404, detail="Upload not found")
+        base = os.path.join(self.directory, upload_id)
+        return base + ".json", base + TEMP_SUFFIX
+
+    def _lock(self, upload_id: str) -> asyncio.Lock:
+        return self._locks.setdefault(upload_id, asyncio.Lock())
+
+    @contextlib.asynccontextmanager
+    async def _locked(self, data_path: str):
+        """Open the data file holding an exclusive lock that all workers honour"""
+        try:
+            f = await aiofiles.open(data_path, "r+b")
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Upload not found")
+        if not try_lock_file(f.fileno()):
+            offset = os.fstat(f.fileno()).st_size
+            await f.close()
+            raise HTTPException(status_code=409, detail={"message": "Another chunk of this upload is being written",
+                                                         "offset": offset})
+        try:
+            yield f
+        finally:
+            # Buffered writes go out before the unlock moves the file position
+            await f.flush()
+            unlock_file(f.fileno())
+            await f.close()
+
+    async def _offset(self, data_path: str) -> int:
+        try:
+            return (await aiofiles.os.stat(data_path)).st_size
+        except FileNotFoundError:
+            return 0
+
+    def _status(self, upload: Dict[str, Any], offset: int, modified: float) -> Dict[str, Any]:
+        return {
+            "upload_id": upload["upload_id"],
+            "filename": upload["filename"],
+            "size": upload["size"],
+            "offset": offset,
+            "expires_at": int(modified + self.ttl_seconds),
+        }
+
+    async def create(self, owner_id: str, filename: str, size: int, max_bytes: int) -> Dict[str, Any]:
+        """Start an upload of size bytes"""
+        if size < 0:
+            raise HTTPException(status_code=400, detail="Invalid upload size")
+        if max_bytes and size > max_bytes:
+            raise HTTPException(status_code=413, detail=str(UploadTooLargeError(max_bytes)))
+
+        await aiofiles.os.makedirs(self.directory, exist_ok=True)
+        upload = {"upload_id": uuid.uuid4().hex, "owner_id": owner_id, "filename": filename,
+                  "size": size, "created_at": int(time.time())}
+        meta_path, data_path = self._paths(upload["upload_id"])
+        async with aiofiles.open(data_path, "wb"):
+            pass
+        async with aiofiles.open(meta_path, "w") as f:
+            await f.write(json.dumps(upload))
+        return self._status(upload, 0, time.time())
+
+    async def _load(self, upload_id: str, owner_id: str):
+        """Read an upload's metadata, hiding other users' and expired uploads"""
+        meta_path, data_path = self._paths(upload_id)
+        try:
+            async with aiofiles.open(meta_path, "r") as f:
+                upload = json.loads(await f.read())
+            modified = (await aiofiles.os.stat(data_path)).st_mtime
+        except (FileNotFoundError, ValueError):
+            raise HTTPException(status_code=404, detail="Upload not found")
+        if upload["owner_id"] != owner_id or modified + self.ttl_seconds < time.time():
+            raise HTTPException(status_code=404, detail="Upload not found")
+        return upload, data_path, modified
+
+    async def status(self, upload_id: str, owner_id: str) -> Dict[str, Any]:
+        """Current offset of an upload"""
+        upload, data_path, modified = await self._load(upload_id, owner_id)
+        return self._status(upload, await self._offset(data_path), modified)
+
+    async def append(self, upload_id: str, owner_id: str, offset: int, chunks: AsyncIterator[bytes],
+                     max_chunk_bytes: int) -> Dict[str, Any]:
+        """Write a chunk that starts at offset, returning the new status"""
+        async with self._lock(upload_id):
+            upload, data_path, _ = await self._load(upload_id, owner_id)
+            written = 0
+            async with self._locked(data_path) as out:
+                # Another worker may have appended since the upload was loaded
+                current = os.fstat(out.fileno()).st_size
+                if offset != current:
+                    raise HTTPException(status_code=409, detail={"message": "Offset does not match the upload",
+                                                                 "offset": current})
+                await out.seek(offset)
+                try:
+                    async for chunk in chunks:
+                        written += len(chunk)
+                        if max_chunk_bytes and written > max_chunk_bytes:
+                            raise HTTPException(status_code=413,
+                                                detail=f"Chunks may be at most {max_chunk_bytes} bytes")
+                        if offset + written > upload["size"]:
+                            raise HTTPException(status_code=413, detail="Chunk runs past the declared upload size")
+                        await out.write(chunk)
+                except HTTPException:
+                    # Rejected chunks leave nothing behind; dropped connections keep what arrived
+                    await out.flush()
+                    await out.truncate(offset)
+                    raise
+            return await self.status(upload_id, owner_id)
+
+    async def finish(self, upload_id: str, owner_id: str, sha256: Optional[str] = None,
+                     chunk_size: int = 1024 * 1024) -> Dict[str, Any]:
+        """Check a complete upload, returning filename, temp_path, size and sha256
+
+        The caller moves temp_path into place and then calls discard().
+        """
+        async with self._lock(upload_id):
+            upload, data_path, _ = await self._load(upload_id, owner_id)
+            async with self._locked(data_path) as f:
+                offset = os.fstat(f.fileno()).st_size
+                if offset != upload["size"]:
+                    raise HTTPException(status_code=409, detail={"message": "Upload is incomplete", "offset": offset})
+                digest = await hash_file(data_path, chunk_size)
+            if sha256 and sha256.lower() != digest:
+                raise HTTPException(status_code=422, detail="Uploaded content does not match the given sha256")
+            return {"filename": upload["filename"], "temp_path": data_path, "size": offset, "sha256": digest}
+
+    async def discard(self, upload_id: str):
+        """Remove an upload's files"""
+        for path in self._paths(upload_id):
+            try:
+                await aiofiles.os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._locks.pop(upload_id, None)
+
+    async def abort(self, upload_id: str, owner_id: str):
+        """Abandon an upload"""
+        async with self._lock(upload_id):
+            await self._load(upload_id, owner_id)
+            await self.discard(upload_id)
+
+    def expire(self) -> int:
+        """Delete uploads untouched for longer than the TTL, returning the count"""
+        if not os.path.isdir(self.directory):
+            return 0
+        cutoff = time.time() - self.ttl_seconds
+        expired = 0
+        for name in os.listdir(self.directory):
+            upload_id, ext = os.path.splitext(name)
+            if ext != ".json" or not UPLOAD_ID_PATTERN.match(upload_id):
+                continue
+            meta_path, data_path = self._paths(upload_id)
+            try:
+                modified = max(os.path.getmtime(meta_path), os.path.getmtime(data_path))
+            except FileNotFoundError:
+                modified = 0
+            if modified < cutoff:
+                for path in (meta_path, data_path):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                self._locks.pop(upload_id, None)
+                expired += 1
+        return expired
+
+resumable_uploads = ResumableUploads(os.path.join(config.UPLOAD_DIR, "partial"),
+                                     ttl_seconds=config.RESUMABLE_UPLOAD_TTL_HOURS * 3600)
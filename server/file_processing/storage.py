@@ -0,0 +1,289 @@
+"""
+File storage backends for ThesisAI Tool.
+
+Thesis files are addressed by a location string, which is what
+theses.filepath holds: a local path for LocalStorage, or
+s3://bucket/prefix/key for S3Storage. New files go to the backend chosen by
+STORAGE_BACKEND; files stored locally before a switch to S3 stay readable
+(see BlobStore.backend_for).
+
+Backends are synchronous like the repositories. Async code calls them
+through run_in_threadpool. Extractors and renderers need a real file, so
+local_path() returns one; S3Storage downloads into a local cache for that.
+Files stored under blobs/ are never rewritten in place, so cached copies
+never go stale.
+
+S3Storage needs boto3 and works with any S3-compatible service
+(AWS, MinIO, Ceph) via S3_ENDPOINT_URL.
+
+Only thesis files and what is derived from them go through a backend. The
+text copies of feedback that app.py writes to FEEDBACK_DIR and
+AI_RESPONSES_DIR stay on local disk; the feedback table holds the content.
+"""
+
+import logging
+import mimetypes
+import os
+import shutil
+import uuid
+from typing import Iterator, Optional
+
+from config.config import config
+
+try:
+    import boto3
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import ClientError
+    S3_AVAILABLE = True
+except ImportError:
+    S3_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+S3_SCHEME = "s3://"
+
+class LocalStorage:
+    """Files on a local (or shared network) filesystem under root"""
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def location(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    @property
+    def staging_dir(self) -> str:
+        """Where uploads are received; on the same filesystem, so save_file is a rename"""
+        return os.path.join(self.root, "blobs")
+
+    def save_file(self, local_path: str, location: str):
+        """Move a finished local file to location"""
+        os.makedirs(os.path.dirname(location), exist_ok=True)
+        try:
+            os.replace(local_path, location)
+        except OSError:
+            # Different filesystem
+            shutil.move(local_path, location)
+
+    def write_bytes(self, location: str, data: bytes):
+        os.makedirs(os.path.dirname(location), exist_ok=True)
+        temp_path = f"{location}.{uuid.uuid4().hex}.part"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, location)
+
+    def read_bytes(self, location: str) -> bytes:
+        with open(location, "rb") as f:
+            return f.read()
+
+    def iter_bytes(self, location: str, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        with open(location, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def exists(self, location: str) -> bool:
+        return os.path.isfile(location)
+
+    def delete(self, location: str):
+        try:
+            os.remove(location)
+        except FileNotFoundError:
+            pass
+
+    def delete_prefix(self, location: str):
+        """Delete a directory of files"""
+        shutil.rmtree(location, ignore_errors=True)
+
+    def local_path(self, location: str) -> str:
+        """A local file with the content; raises FileNotFoundError"""
+        if not os.path.isfile(location):
+            raise FileNotFoundError(location)
+        return location
+
+    def presigned_url(self, location: str, filename: str, inline: bool = False) -> Optional[str]:
+        """Local files are served by the API itself"""
+        return None
+
+class S3Storage:
+    """Objects in an S3-compatible bucket, with a local read-through cache"""
+
+    name = "s3"
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None,
+                 region: Optional[str] = None, access_key_id: Optional[str] = None,
+                 secret_access_key: Optional[str] = None, cache_dir: str = "storage_cache",
+                 cache_max_bytes: int = 2 * 1024 ** 3, presign_expiry: int = 300):
+        if not S3_AVAILABLE:
+            raise RuntimeError('STORAGE_BACKEND=s3 requires boto3 (pip install boto3)')
+        if not bucket:
+            raise RuntimeError('STORAGE_BACKEND=s3 requires S3_BUCKET')
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.presign_expiry = presign_expiry
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            aws_access_key_id=access_key_id or None,
+            aws_secret_access_key=secret_access_key or None,
+            # Path-style addressing for MinIO and other self-hosted endpoints
+            config=BotoConfig(signature_version="s3v4",
+                              s3={"addressing_style": "path" if endpoint_url else "auto"}),
+        )
+
+    def location(self, key: str) -> str:
+        return f"{S3_SCHEME}{self.bucket}/{self.prefix}{key}"
+
+    @property
+    def staging_dir(self) -> str:
+        return os.path.join(self.cache_dir, "staging")
+
+    def _key(self, location: str) -> str:
+        bucket, _, key = location[len(S3_SCHEME):].partition("/")
+        if not location.startswith(S3_SCHEME) or bucket != self.bucket or not key:
+            raise ValueError(f"Not a location in bucket {self.bucket}: {location}")
+        return key
+
+    @staticmethod
+    def _is_missing(error: "ClientError") -> bool:
+        return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    def save_file(self, local_path: str, location: str):
+        """Upload a finished local file (multipart for large files), then remove it"""
+        content_type = mimetypes.guess_type(location)[0] or "application/octet-stream"
+        self.client.upload_file(local_path, self.bucket, self._key(location),
+                                ExtraArgs={"ContentType": content_type})
+        os.remove(local_path)
+
+    def write_bytes(self, location: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self._key(location), Body=data)
+
+    def read_bytes(self, location: str) -> bytes:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._key(location))["Body"].read()
+        except ClientError as e:
+            if self._is_missing(e):
+                raise FileNotFoundError(location) from e
+            raise
+
+    def iter_bytes(self, location: str, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        try:
+            body = self.client.get_object(Bucket=self.bucket, Key=self._key(location))["Body"]
+        except ClientError as e:
+            if self._is_missing(e):
+                raise FileNotFoundError(location) from e
+            raise
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def exists(self, location: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(location))
+            return True
+        except ClientError as e:
+            if self._is_missing(e):
+                return False
+            raise
+
+    def delete(self, location: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(location))
+        cached = self._cache_path(location)
+        if os.path.exists(cached):
+            os.remove(cached)
+
+    def delete_prefix(self, location: str):
+        """Delete every object under a key prefix"""
+        prefix = self._key(location).rstrip("/") + "/"
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if objects:
+                self.client.delete_objects(Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True})
+
+    def _cache_path(self, location: str) -> str:
+        return os.path.join(self.cache_dir, self.bucket, *self._key(location).split("/"))
+
+    def local_path(self, location: str) -> str:
+        """Download the object into the local cache once and return the cached file"""
+        path = self._cache_path(location)
+        if os.path.exists(path):
+            os.utime(path)  # Mark as recently used
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.part"
+        try:
+            self.client.download_file(self.bucket, self._key(location), temp_path)
+        except ClientError as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            if self._is_missing(e):
+                raise FileNotFoundError(location) from e
+            raise
+        os.replace(temp_path, path)
+        self._trim_cache()
+        return path
+
+    def _trim_cache(self):
+        """Remove least recently used cached files beyond cache_max_bytes"""
+        root = os.path.join(self.cache_dir, self.bucket)
+        files = []
+        for directory, _, names in os.walk(root):
+            for name in names:
+                if name.endswith(".part"):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.cache_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def presigned_url(self, location: str, filename: str, inline: bool = False) -> Optional[str]:
+        """Time-limited URL the browser can download from directly"""
+        disposition = "inline" if inline else "attachment"
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": self._key(location),
+                "ResponseContentDisposition": f'{disposition}; filename="{filename}"',
+                "ResponseContentType": mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            },
+            ExpiresIn=self.presign_expiry,
+        )
+
+def create_storage():
+    """The backend new files are written to, from STORAGE_BACKEND"""
+    if config.STORAGE_BACKEND == "s3":
+        return S3Storage(
+            config.S3_BUCKET,
+            prefix=config.S3_PREFIX,
+            endpoint_url=config.S3_ENDPOINT_URL,
+            region=config.S3_REGION,
+            access_key_id=config.S3_ACCESS_KEY_ID,
+            secret_access_key=config.S3_SECRET_ACCESS_KEY,
+            cache_dir=config.STORAGE_CACHE_DIR,
+            cache_max_bytes=config.STORAGE_CACHE_MAX_MB * 1024 * 1024,
+            presign_expiry=config.S3_PRESIGNED_URL_EXPIRY,
+        )
+    return LocalStorage(config.UPLOAD_DIR)
+
+storage = create_storage()
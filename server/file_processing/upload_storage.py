@@ -0,0 +1,80 @@
+"""
+Upload storage for ThesisAI Tool.
+
+Uploaded files are copied to disk in fixed-size chunks with async file I/O,
+so neither the whole file nor a blocking write ever sits on the event loop.
+The SHA-256 of the content is computed on the way through. The data lands
+in a temporary file inside the destination directory and is renamed into
+place (see blob_store) only once it is complete, so readers never see a
+partial upload.
+"""
+
+import hashlib
+import os
+import uuid
+from typing import Any, Dict
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+
+TEMP_SUFFIX = ".part"
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        super().__init__(f"File exceeds the maximum upload size of {max_bytes} bytes")
+
+async def receive_upload(upload: UploadFile, dest_dir: str, max_bytes: int,
+                         chunk_size: int = 1024 * 1024) -> Dict[str, Any]:
+    """Stream an upload into a temporary file in dest_dir, returning its temp_path, size and sha256
+
+    The caller moves the file into place with os.replace or removes it.
+    """
+    # Starlette knows the size of the spooled part, so oversized files fail before any copying
+    if max_bytes and upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    os.makedirs(dest_dir, exist_ok=True)
+    # Same directory as the target, so the final rename never crosses filesystems
+    temp_path = os.path.join(dest_dir, f".{uuid.uuid4().hex}{TEMP_SUFFIX}")
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        async with aiofiles.open(temp_path, "wb") as out:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        # Also covers cancellation when the client goes away mid-upload
+        await discard_upload(temp_path)
+        raise
+
+    return {"temp_path": temp_path, "size": size, "sha256": digest.hexdigest()}
+
+async def discard_upload(temp_path: str):
+    """Remove a temporary upload file if it still exists"""
+    try:
+        await aiofiles.os.remove(temp_path)
+    except OSError:
+        pass
+
+async def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file, read in chunks with async file I/O"""
+    digest = hashlib.sha256()
+    async with aiofiles.open(path, "rb") as f:
+        while True:
+            chunk = await f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
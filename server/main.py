@@ -20,9 +20,10 @@ from fastapi.responses import HTMLResponse
 
 # Import our refactored modules using absolute imports
 from config.config import config
-from database.database import user_repo, thesis_repo, feedback_repo
+from database.database import db_manager, user_repo, thesis_repo, feedback_repo, user_cache
+from database.async_database import run_in_db_executor
 from ai.services.unified_ai_model import UnifiedAIModel
-from auth.auth_service import get_current_active_user, check_student
+from auth.auth_service import get_current_active_user, check_student, password_hashing_stats
 from core.models import User, Thesis, Feedback, AIRequest
 from ai.providers.ai_provider import AIProvider
 from file_processing.text_extractor import extract_text_from_file
@@ -33,6 +34,7 @@ from api.routes.auth_routes import router as auth_router
 from api.routes.thesis_routes import router as thesis_router
 from api.routes.ai_routes import router as ai_router
 from api.routes.user_routes import router as user_router
+from api.middleware import UploadSizeLimitMiddleware
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -55,6 +57,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reject oversized uploads while they are still arriving
+# (the multipart envelope adds a little on top of the file itself)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_bytes=config.MAX_UPLOAD_SIZE + 64 * 1024 if config.MAX_UPLOAD_SIZE else 0,
+    paths=["/thesis/upload"],
+)
+
+# Resumable uploads arrive a chunk per request; their total is checked
+# against MAX_RESUMABLE_UPLOAD_SIZE when the upload is started
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_bytes=config.RESUMABLE_UPLOAD_CHUNK_SIZE,
+    paths=["/thesis/uploads"],
+)
+
 # Mount static files from client directory
 import os
 client_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "client")
@@ -131,9 +149,21 @@ async def get_config_status():
             "upload_dir": config.UPLOAD_DIR,
             "feedback_dir": config.FEEDBACK_DIR,
             "ai_responses_dir": config.AI_RESPONSES_DIR
-        }
+        },
+        "storage": {
+            "backend": config.STORAGE_BACKEND,
+            "s3_bucket": config.S3_BUCKET or None
+        },
+        "database": {"schema_version": await run_in_db_executor(db_manager.schema_version), **db_manager.pool_stats()},
+        "user_cache": user_cache.stats(),
+        "password_hashing": password_hashing_stats()
     }
 
+@app.on_event("startup")
+async def migrate_database():
+    """Bring the database schema up to date before serving requests"""
+    await run_in_db_executor(db_manager.migrate)
+
 # AI providers route
 @app.get("/ai-providers")
 async def get_ai_providers():
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Concurrency test for the async database layer.
+
+A ticker coroutine stands in for a live SSE stream: it wakes every few
+milliseconds and records how late it was. The same batch of repository reads
+runs once with the synchronous repository called straight from the event loop
+and once through the awaitable repository. Only the async run should keep the
+ticker on time.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Importing the database package opens the configured database; keep the checked-in one untouched
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="thesis_ai_test_"), "thesis_ai.db")
+
+from database.database import DatabaseManager, UserRepository
+from database.async_database import AsyncRepository
+
+TICK = 0.005
+USERS = 2000
+READS = 40
+
+def create_repository(db_path: str) -> UserRepository:
+    """Create a user repository on a throwaway database with some users"""
+    repo = UserRepository(DatabaseManager(db_path))
+    with repo.db.get_connection() as conn:
+        conn.executemany(
+            'INSERT INTO users (id, username, email, full_name, hashed_password, role) VALUES (?, ?, ?, ?, ?, ?)',
+            [(str(uuid.uuid4()), f"user{i}", f"user{i}@example.com", f"User {i}", "x", "student") for i in range(USERS)]
+        )
+        conn.commit()
+    return repo
+
+async def ticker(stop: asyncio.Event, lags: list):
+    """Simulated stream: record how late each tick fires"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+async def measure(db_work) -> float:
+    """Run db_work alongside the ticker and return the worst tick lag in ms"""
+    stop = asyncio.Event()
+    lags = []
+    stream = asyncio.create_task(ticker(stop, lags))
+    await asyncio.sleep(TICK * 2)
+    await db_work()
+    stop.set()
+    await stream
+    return max(lags) * 1000
+
+async def run_comparison(repo: UserRepository):
+    """Measure stream lag for blocking and awaited repository calls"""
+    async_repo = AsyncRepository(repo)
+
+    async def blocking_reads():
+        for _ in range(READS):
+            repo.get_all_users()
+            await asyncio.sleep(0)
+
+    async def awaited_reads():
+        for _ in range(READS):
+            await async_repo.get_all_users()
+
+    blocking_lag = await measure(blocking_reads)
+    awaited_lag = await measure(awaited_reads)
+    return blocking_lag, awaited_lag
+
+def test_async_repository_keeps_method_names():
+    """Async repositories expose the same methods and results as the sync ones"""
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = create_repository(os.path.join(tmp, "test.db"))
+        async_repo = AsyncRepository(repo)
+        user = asyncio.run(async_repo.get_user_by_username("user1"))
+        assert user == repo.get_user_by_username("user1")
+        repo.db.close()
+
+def test_streams_not_stalled_by_db_work():
+    """Awaited DB work must not stall a concurrent stream the way blocking calls do"""
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = create_repository(os.path.join(tmp, "test.db"))
+        blocking_lag, awaited_lag = asyncio.run(run_comparison(repo))
+        print(f"   Worst stream lag with blocking calls: {blocking_lag:.1f} ms")
+        print(f"   Worst stream lag with awaited calls:  {awaited_lag:.1f} ms")
+        assert awaited_lag < blocking_lag
+        repo.db.close()
+
+if __name__ == "__main__":
+    print("🧪 Testing async database layer...")
+    test_async_repository_keeps_method_names()
+    print("   ✅ Async repository returns the same results")
+    test_streams_not_stalled_by_db_work()
+    print("   ✅ Streams keep ticking while the database works")
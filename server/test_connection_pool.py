@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test the SQLite connection pool: a thread reuses its connection for nested
+calls, and a nested commit or rollback cannot end the caller's transaction.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Importing the database package opens the configured database; keep the checked-in one untouched
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="thesis_ai_test_"), "thesis_ai.db")
+
+from database.connection_pool import ConnectionPool, NestedConnection
+
+def count(pool: ConnectionPool) -> int:
+    conn = pool.acquire()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+    finally:
+        pool.release(conn)
+
+def make_pool(tmp: str) -> ConnectionPool:
+    pool = ConnectionPool(os.path.join(tmp, "pool.db"), max_size=2)
+    conn = pool.acquire()
+    conn.execute("CREATE TABLE notes (text TEXT)")
+    conn.commit()
+    pool.release(conn)
+    return pool
+
+def test_nested_calls_reuse_the_connection():
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = make_pool(tmp)
+        outer = pool.acquire()
+        inner = pool.acquire()
+        assert inner is outer, "no transaction open, so the connection itself is shared"
+        pool.release(inner)
+        pool.release(outer)
+        assert pool.stats()["size"] == 1 and pool.stats()["idle"] == 1
+        pool.close()
+
+def test_nested_commit_leaves_the_outer_transaction_open():
+    """The outer scope's rollback also undoes what a nested scope committed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = make_pool(tmp)
+        outer = pool.acquire()
+        outer.execute("INSERT INTO notes VALUES ('outer')")
+        inner = pool.acquire()
+        assert isinstance(inner, NestedConnection)
+        inner.execute("INSERT INTO notes VALUES ('inner')")
+        inner.commit()
+        pool.release(inner)
+        assert outer.in_transaction
+        outer.rollback()
+        pool.release(outer)
+        assert count(pool) == 0
+        pool.close()
+
+def test_nested_rollback_undoes_only_its_own_work():
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = make_pool(tmp)
+        outer = pool.acquire()
+        outer.execute("INSERT INTO notes VALUES ('outer')")
+        inner = pool.acquire()
+        inner.execute("INSERT INTO notes VALUES ('kept')")
+        inner.commit()
+        inner.execute("INSERT INTO notes VALUES ('undone')")
+        inner.rollback()
+        pool.release(inner)
+        outer.commit()
+        pool.release(outer)
+        conn = pool.acquire()
+        assert [row[0] for row in conn.execute("SELECT text FROM notes ORDER BY rowid")] == ["outer", "kept"]
+        pool.release(conn)
+        pool.close()
+
+if __name__ == "__main__":
+    print("🧪 Testing the connection pool...")
+    test_nested_calls_reuse_the_connection()
+    print("   ✅ Nested calls reuse the thread's connection")
+    test_nested_commit_leaves_the_outer_transaction_open()
+    print("   ✅ Nested commits do not commit the caller's transaction")
+    test_nested_rollback_undoes_only_its_own_work()
+    print("   ✅ Nested rollbacks undo only the nested scope")
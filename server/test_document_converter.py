@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Test DOC/DOCX previews: documents are converted to PDF once per blob, with
+LibreOffice in a sandboxed process when it is configured and with PyMuPDF
+otherwise, and their pages are rendered like PDF pages.
+
+The LibreOffice tests use a stand-in soffice script, so they run without
+LibreOffice installed.
+"""
+
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import docx
+import fitz
+from PIL import Image
+
+from config.config import config
+from file_processing.blob_store import BlobStore
+from file_processing.document_converter import DocumentConversionError, convert_to_pdf, find_libreoffice
+from file_processing.image_converter import convert_document_to_images, preview_font
+from file_processing.preview_cache import PreviewCache
+from file_processing.storage import LocalStorage
+
+FAKE_SOFFICE = """#!{python}
+import json, os, shutil, sys, time
+json.dump(dict(os.environ, ARGS=" ".join(sys.argv[1:]), CWD=os.getcwd()), open({report!r}, "w"))
+time.sleep({delay})
+outdir = sys.argv[sys.argv.index("--outdir") + 1]
+os.makedirs(outdir)
+shutil.copyfile({pdf!r}, os.path.join(outdir, "document.pdf"))
+"""
+
+def make_docx(path: str, paragraphs: int = 80):
+    document = docx.Document()
+    document.add_heading("Thesis title", 0)
+    document.add_heading("1 Introduction", 1)
+    for number in range(paragraphs):
+        document.add_paragraph(f"Paragraph {number + 1}. " + "The results indicate an improvement. " * 12)
+    table = document.add_table(rows=2, cols=2)
+    table.cell(1, 1).text = "Table cell"
+    document.save(path)
+
+def fake_soffice(tmp: str, delay: float = 0) -> str:
+    """A soffice stand-in that records its environment and 'converts' to a 3 page PDF"""
+    pdf = fitz.open()
+    for number in range(3):
+        pdf.new_page().insert_text((72, 72), f"Converted page {number + 1}")
+    pdf_path = os.path.join(tmp, "converted.pdf")
+    pdf.save(pdf_path)
+    script = os.path.join(tmp, "soffice")
+    with open(script, "w") as f:
+        f.write(FAKE_SOFFICE.format(python=sys.executable, report=os.path.join(tmp, "report.json"),
+                                    delay=delay, pdf=pdf_path))
+    os.chmod(script, 0o755)
+    return script
+
+class LibreOfficeSettings:
+    """Temporarily point the converter at a soffice executable"""
+
+    def __init__(self, path: str, timeout: int = 120):
+        self.settings = {"LIBREOFFICE_PATH": path, "OFFICE_CONVERSION_TIMEOUT": timeout}
+
+    def __enter__(self):
+        self.saved = {name: getattr(config, name) for name in self.settings}
+        for name, value in self.settings.items():
+            setattr(config, name, value)
+
+    def __exit__(self, *exc):
+        for name, value in self.saved.items():
+            setattr(config, name, value)
+
+def test_docx_is_laid_out_without_libreoffice():
+    """Without LibreOffice DOCX text is paginated onto A4 pages"""
+    with tempfile.TemporaryDirectory() as tmp, LibreOfficeSettings(""):
+        if find_libreoffice():
+            print("   ⏭️  LibreOffice is installed, skipping the fallback")
+            return
+        path = os.path.join(tmp, "thesis.docx")
+        make_docx(path)
+        pdf_path = convert_to_pdf(path, os.path.join(tmp, "thesis.pdf"))
+        with fitz.open(pdf_path) as pdf:
+            assert len(pdf) > 1
+            assert "Thesis title" in pdf[0].get_text() and "Table cell" in pdf[-1].get_text()
+
+        images = convert_document_to_images(path, max_width=400)
+        assert len(images) > 1 and all(image['width'] == 400 for image in images)
+        assert images[0]['text_content'].startswith("Thesis title")
+
+        with open(os.path.join(tmp, "old.doc"), "wb") as f:
+            f.write(b"binary word document")
+        try:
+            convert_to_pdf(os.path.join(tmp, "old.doc"), os.path.join(tmp, "old.pdf"))
+            assert False, "expected DocumentConversionError"
+        except DocumentConversionError:
+            pass
+
+def test_libreoffice_runs_sandboxed():
+    """soffice sees a copy of the file, a throwaway profile and no server secrets"""
+    with tempfile.TemporaryDirectory() as tmp, LibreOfficeSettings(fake_soffice(tmp)):
+        os.environ["OPENROUTER_API_KEY"] = "secret"
+        try:
+            path = os.path.join(tmp, "My thesis; rm -rf.doc")
+            with open(path, "wb") as f:
+                f.write(b"binary word document")
+            with fitz.open(convert_to_pdf(path, os.path.join(tmp, "out.pdf"))) as pdf:
+                assert len(pdf) == 3
+        finally:
+            del os.environ["OPENROUTER_API_KEY"]
+
+        with open(os.path.join(tmp, "report.json")) as f:
+            report = json.load(f)
+        assert "OPENROUTER_API_KEY" not in report
+        assert report["HOME"] == report["CWD"] != tmp
+        assert report["ARGS"].endswith(os.path.join(report["CWD"], "document.doc"))
+        assert f"-env:UserInstallation={Path(report['CWD'], 'profile').as_uri()}" in report["ARGS"]
+        # The converter is found through the host's PATH, whatever the platform
+        assert report["PATH"] == os.environ["PATH"]
+        assert not os.path.exists(report["CWD"])
+
+def test_libreoffice_is_killed_after_the_timeout():
+    with tempfile.TemporaryDirectory() as tmp, LibreOfficeSettings(fake_soffice(tmp, delay=30), timeout=1):
+        path = os.path.join(tmp, "thesis.docx")
+        make_docx(path, paragraphs=1)
+        start = time.time()
+        try:
+            convert_to_pdf(path, os.path.join(tmp, "out.pdf"))
+            assert False, "expected DocumentConversionError"
+        except DocumentConversionError as e:
+            assert "within 1 seconds" in str(e)
+        assert time.time() - start < 10
+
+def test_stored_documents_are_converted_once():
+    """The PDF is kept with the blob and previews render from it"""
+    with tempfile.TemporaryDirectory() as tmp, LibreOfficeSettings(fake_soffice(tmp)):
+        store = BlobStore(LocalStorage(os.path.join(tmp, "uploads")))
+        cache = PreviewCache(store, image_format='jpeg')
+        path = os.path.join(tmp, "thesis.docx")
+        make_docx(path, paragraphs=1)
+        with open(path, "rb") as f:
+            data = f.read()
+        location = store.new_location(hashlib.sha256(data).hexdigest(), ".docx")
+        store.storage.write_bytes(location, data)
+
+        assert cache.page_count(location) == 3
+        converted = store.derived_location(location, "document.pdf")
+        assert store.pdf_path(location) == converted
+        os.remove(os.path.join(tmp, "report.json"))
+        image = Image.open(io.BytesIO(cache.get_page(location, 3, 300)))
+        assert (image.format, image.width) == ('JPEG', 300)
+        assert not os.path.exists(os.path.join(tmp, "report.json")), "converted again"
+
+def test_fonts_are_loaded_once():
+    assert preview_font(14) is preview_font(14)
+    assert preview_font(14).getlength("Thesis") > 0
+
+if __name__ == "__main__":
+    print("🧪 Testing document conversion...")
+    test_docx_is_laid_out_without_libreoffice()
+    print("   ✅ DOCX laid out on PDF pages without LibreOffice")
+    test_libreoffice_runs_sandboxed()
+    print("   ✅ LibreOffice runs on a copy with a throwaway profile and no secrets")
+    test_libreoffice_is_killed_after_the_timeout()
+    print("   ✅ Hung LibreOffice conversions are killed")
+    test_stored_documents_are_converted_once()
+    print("   ✅ Stored documents converted once and previewed from the PDF")
+    test_fonts_are_loaded_once()
+    print("   ✅ Preview fonts loaded once")
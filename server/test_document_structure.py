@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Test document structure extraction: headings come from the PDF outline or
+the layout, sections know their parents and pages, reference entries are
+split whole, captions are found outside the contents list, and the result
+is cached per blob.
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import docx
+import fitz
+
+from file_processing.blob_store import BlobStore
+from file_processing.document_structure import (
+    STRUCTURE_VERSION, extract_document_structure, outline, section_text, sections_excerpt
+)
+from file_processing.storage import LocalStorage
+
+BODY = ("The study examines how students use digital learning tools in vocational education "
+        "and what effects the tools have on learning outcomes. ")
+REFERENCES = [
+    "Anderson, T. 2008. The theory and practice of online learning. 2nd edition. Edmonton: Athabasca University Press.",
+    "Finnish National Agency for Education 2021. Digital competence in vocational education. "
+    "Accessed 1.3.2024 https://www.oph.fi/en/digital-competence-vocational",
+    "Hattie, J. & Timperley, H. 2007. The power of feedback. Review of Educational Research 77 (1), 81-112.",
+    "Mäkinen, K. 2019. Oppimisympäristöt ammatillisessa koulutuksessa. Helsinki: Gaudeamus.",
+]
+OUTLINE = [
+    ("1", "Introduction", 1), ("2", "Theoretical framework", 1), ("2.1", "Digital learning", 2),
+    ("2.2", "Learning outcomes and their measurement in vocational schools", 2),
+    ("3", "Methodology", 1), ("4", "Conclusions", 1), (None, "References", 1), (None, "Appendices", 1),
+]
+
+class ThesisWriter:
+    """Lays out a thesis like a word processor would: running header, page numbers, wrapped lines"""
+
+    def __init__(self):
+        self.document = fitz.open()
+        self.toc = []
+        self.new_page()
+
+    def new_page(self):
+        self.page = self.document.new_page()
+        self.y = 90
+        self.page.insert_text((72, 40), "OAMK Bachelor's Thesis", fontsize=9)
+        self.page.insert_text((290, 810), str(len(self.document)), fontsize=9)
+
+    def write(self, text: str, size: float = 11, bold: bool = False, gap: float = 4, hanging: bool = False):
+        font = "hebo" if bold else "helv"
+        lines, line = [], ""
+        for word in text.split():
+            candidate = f"{line} {word}".strip()
+            if fitz.get_text_length(candidate, fontname=font, fontsize=size) > 451:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+        for number, line in enumerate(lines):
+            if self.y > 760:
+                self.new_page()
+            x = 90 if hanging and number else 72
+            self.page.insert_text((x, self.y), line, fontsize=size, fontname=font)
+            self.y += size * 1.4
+        self.y += gap
+
+    def heading(self, text: str, level: int):
+        if level == 1 or self.y > 650:
+            self.new_page()
+        self.toc.append([level, text, len(self.document)])
+        self.write(text, {1: 16, 2: 13}[level], bold=True, gap=8)
+
+def write_thesis(path: str, bookmarks: bool):
+    writer = ThesisWriter()
+    writer.write("Digital Learning Tools in Vocational Education", 20, bold=True)
+    writer.new_page()
+    writer.write("Contents", 16, bold=True)
+    for entry in ["1 Introduction ........ 3", "2 Theoretical framework ........ 4",
+                  "2.1 Digital learning ........ 4", "3 Methodology ........ 5",
+                  "References ........ 7", "Figure 1 Survey results ........ 5"]:
+        writer.write(entry)
+    writer.heading("1 Introduction", 1)
+    writer.write(BODY * 6)
+    writer.heading("2 Theoretical framework", 1)
+    writer.write(BODY * 3)
+    writer.heading("2.1 Digital learning", 2)
+    writer.write(BODY * 5)
+    writer.heading("2.2 Learning outcomes and their measurement in vocational schools", 2)
+    writer.write(BODY * 3)
+    writer.heading("3 Methodology", 1)
+    writer.write(BODY * 3)
+    writer.write("Figure 1. Survey results by age group")
+    writer.write(BODY * 2)
+    writer.write("Table 1: Participants of the study")
+    writer.heading("4 Conclusions", 1)
+    writer.write("Students who used the tools daily reached the learning outcomes more often. " * 4)
+    writer.heading("References", 1)
+    for reference in REFERENCES:
+        writer.write(reference, gap=6, hanging=True)
+    writer.heading("Appendices", 1)
+    writer.write("Appendix 1. Questionnaire")
+    if bookmarks:
+        writer.document.set_toc(writer.toc)
+    writer.document.save(path)
+    writer.document.close()
+
+def check_thesis(structure: dict):
+    # Layout headings also include the title page and the contents list
+    first = [s["title"] for s in structure["sections"]].index("Introduction")
+    sections = structure["sections"][first:]
+    assert [(s["number"], s["title"], s["level"]) for s in sections] == OUTLINE, outline(structure)
+    parents = [structure["sections"][s["parent"]]["title"] if s["parent"] is not None else None for s in sections]
+    assert parents == [None, None, "Theoretical framework", "Theoretical framework", None, None, None, None]
+    assert sections[0]["page_start"] == 3 and sections[-1]["page_start"] == sections[-1]["page_end"]
+    assert section_text(structure, first + 2).startswith("2.1 Digital learning\nThe study examines")
+    assert "OAMK Bachelor's Thesis" not in structure["text"]
+    assert section_text(structure, first + 5).endswith("the learning outcomes more often.")
+
+    references = structure["references"]
+    assert [r["text"] for r in references] == REFERENCES
+    assert [r["year"] for r in references] == ["2008", "2021", "2007", "2019"]
+    assert references[1]["url"] == "https://www.oph.fi/en/digital-competence-vocational"
+    assert references[0]["url"] is None and references[0]["page"] == sections[6]["page_start"]
+
+    captions = [(c["kind"], c["label"], c["title"], c["page"]) for c in structure["captions"]]
+    assert captions == [("figure", "Figure 1", "Survey results by age group", sections[4]["page_start"]),
+                        ("table", "Table 1", "Participants of the study", sections[4]["page_start"])]
+
+def test_pdf_headings_from_layout_and_outline():
+    """The same thesis gives the same structure with and without bookmarks"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for bookmarks in (False, True):
+            path = os.path.join(tmp, f"thesis-{bookmarks}.pdf")
+            write_thesis(path, bookmarks)
+            structure = extract_document_structure(path)
+            assert structure["source"] == "pdf" and structure["version"] == STRUCTURE_VERSION
+            assert structure["page_count"] == len(structure["pages"])
+            check_thesis(structure)
+
+def test_docx_and_text_structure():
+    """DOCX headings come from styles; text files from numbering; neither has pages"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "thesis.docx")
+        document = docx.Document()
+        document.add_heading("1 Introduction", 1)
+        document.add_paragraph(BODY)
+        document.add_heading("1.1 Background", 2)
+        document.add_paragraph(BODY)
+        document.add_heading("References", 1)
+        for reference in REFERENCES[:2]:
+            document.add_paragraph(reference)
+        document.add_paragraph("Statistics Finland 2023. Students and qualifications. www.stat.fi/en/students.")
+        document.save(path)
+
+        structure = extract_document_structure(path)
+        assert [(s["number"], s["title"], s["level"], s["parent"]) for s in structure["sections"]] == [
+            ("1", "Introduction", 1, None), ("1.1", "Background", 2, 0), (None, "References", 1, None)]
+        assert structure["sections"][0]["page_start"] is None
+        assert [r["text"] for r in structure["references"]][:2] == REFERENCES[:2]
+        # Scheme-less URLs are stored absolute so they can be fetched
+        assert structure["references"][2]["url"] == "https://www.stat.fi/en/students"
+
+        text_path = os.path.join(tmp, "thesis.txt")
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.write(f"1 Introduction\n{BODY}\n\n2 Methods\n{BODY}\n")
+        structure = extract_document_structure(text_path)
+        assert [s["title"] for s in structure["sections"]] == ["Introduction", "Methods"]
+        assert structure["page_count"] is None
+
+        try:
+            extract_document_structure(os.path.join(tmp, "slides.pptx"))
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+def test_sections_excerpt():
+    """Prompts get the outline and the sections they are about"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "thesis.pdf")
+        write_thesis(path, bookmarks=False)
+        structure = extract_document_structure(path)
+
+        excerpt = sections_excerpt(structure, r"theor", 6000)
+        assert excerpt.startswith("OUTLINE:\n")
+        assert "\n1 Introduction (p. 3)\n2 Theoretical framework (p. 4)\n  2.1 Digital learning" in excerpt
+        assert "2.2 Learning outcomes" in excerpt.split("OUTLINE:")[1]
+        assert excerpt.count("2.1 Digital learning\nThe study examines") == 1
+        assert "Students who used the tools daily" not in excerpt
+
+        excerpt = sections_excerpt(structure, r"conclusion", 6000)
+        assert "Students who used the tools daily" in excerpt and "2.1 Digital learning\nThe" not in excerpt
+        assert len(sections_excerpt(structure, None, 500)) == 500
+        assert structure["text"][:100] in sections_excerpt(structure, r"no such section", 6000)
+
+def test_structure_is_cached_per_blob():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BlobStore(LocalStorage(tmp))
+        path = os.path.join(tmp, "thesis.pdf")
+        write_thesis(path, bookmarks=True)
+        with open(path, "rb") as f:
+            data = f.read()
+        location = store.new_location(hashlib.sha256(data).hexdigest(), ".pdf")
+        store.storage.write_bytes(location, data)
+
+        structure = store.document_structure(location)
+        cache_location = store.derived_location(location, f"structure-v{STRUCTURE_VERSION}.json")
+        assert os.path.exists(cache_location)
+        os.remove(store.local_path(location))
+        assert store.document_structure(location) == structure
+
+if __name__ == "__main__":
+    print("🧪 Testing document structure extraction...")
+    test_pdf_headings_from_layout_and_outline()
+    print("   ✅ PDF headings from the layout and from bookmarks agree")
+    test_docx_and_text_structure()
+    print("   ✅ DOCX headings from styles, text headings from numbering")
+    test_sections_excerpt()
+    print("   ✅ Prompt excerpts contain the outline and matching sections")
+    test_structure_is_cached_per_blob()
+    print("   ✅ Structure built once per blob")
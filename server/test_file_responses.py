@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test thesis download responses: MIME types, ETags, 304 and byte ranges.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Importing the database package opens the configured database; keep the checked-in one untouched
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="thesis_ai_test_"), "thesis_ai.db")
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from api.file_responses import file_download_response, media_type_for, etag_matches, parse_byte_range
+
+def make_client(path: str, content_hash=None) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/file")
+    async def serve(request: Request, inline: bool = False):
+        return await file_download_response(request, path, "thesis.pdf", content_hash=content_hash, inline=inline)
+
+    return TestClient(app)
+
+def test_media_types_and_etag_matching():
+    """Known thesis formats get their MIME type; If-None-Match lists compare weakly"""
+    assert media_type_for("a.PDF") == "application/pdf"
+    assert media_type_for("a.doc") == "application/msword"
+    assert media_type_for("a.bin") == "application/octet-stream"
+    assert etag_matches('"a", W/"b"', '"b"') and etag_matches('*', '"b"') and not etag_matches('"a"', '"b"')
+
+def test_byte_range_parsing():
+    """Single ranges are clamped to the file; malformed and multiple ranges are ignored"""
+    assert parse_byte_range("bytes=100-199", 5000) == (100, 199)
+    assert parse_byte_range("bytes=4900-", 5000) == (4900, 4999)
+    assert parse_byte_range("bytes=4900-9999", 5000) == (4900, 4999)
+    assert parse_byte_range("bytes=-300", 5000) == (4700, 4999)
+    assert parse_byte_range("bytes=-9999", 5000) == (0, 4999)
+    for ignored in ("bytes=0-9,20-29", "bytes=9-0", "bytes=-", "items=0-9", "bytes=a-b"):
+        assert parse_byte_range(ignored, 5000) is None, ignored
+    for unsatisfiable in ("bytes=5000-", "bytes=6000-7000", "bytes=-0"):
+        try:
+            parse_byte_range(unsatisfiable, 5000)
+            assert False, f"expected {unsatisfiable} to be unsatisfiable"
+        except ValueError:
+            pass
+
+def test_conditional_and_range_requests():
+    """Repeat requests get 304 and partial requests 206 with the right bytes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "thesis.pdf")
+        data = os.urandom(5000)
+        with open(path, "wb") as f:
+            f.write(data)
+
+        client = make_client(path, content_hash="ab" * 32)
+        first = client.get("/file")
+        assert first.status_code == 200 and first.content == data
+        assert first.headers["etag"] == f'"{"ab" * 32}"'
+        assert first.headers["content-type"] == "application/pdf"
+        assert first.headers["content-disposition"].startswith("attachment")
+
+        assert client.get("/file", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+        assert client.get("/file", headers={"If-Modified-Since": first.headers["last-modified"]}).status_code == 304
+        # If-None-Match wins over If-Modified-Since
+        assert client.get("/file", headers={"If-None-Match": '"other"',
+                                            "If-Modified-Since": first.headers["last-modified"]}).status_code == 200
+
+        partial = client.get("/file?inline=true", headers={"Range": "bytes=100-199"})
+        assert partial.status_code == 206 and partial.content == data[100:200]
+        assert partial.headers["content-range"] == "bytes 100-199/5000"
+        assert partial.headers["content-length"] == "100" and partial.headers["etag"] == first.headers["etag"]
+        assert partial.headers["content-disposition"].startswith("inline")
+        assert partial.headers["content-type"] == "application/pdf"
+        assert client.get("/file", headers={"Range": "bytes=-10"}).content == data[-10:]
+        # A current If-Range gets the range, a stale one the whole, current file
+        for if_range in (first.headers["etag"], first.headers["last-modified"]):
+            resumed = client.get("/file", headers={"Range": "bytes=4000-", "If-Range": if_range})
+            assert resumed.status_code == 206 and resumed.content == data[4000:]
+        stale = client.get("/file", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+        assert stale.status_code == 200 and stale.content == data
+        assert client.get("/file", headers={"Range": "bytes=0-9,20-29"}).content == data
+        unsatisfiable = client.get("/file", headers={"Range": "bytes=5000-"})
+        assert unsatisfiable.status_code == 416 and unsatisfiable.headers["content-range"] == "bytes */5000"
+
+        # Files outside the blob store fall back to an mtime-based ETag
+        legacy = make_client(path).get("/file")
+        assert legacy.headers["etag"] != first.headers["etag"]
+        assert make_client(path).get("/file", headers={"If-None-Match": legacy.headers["etag"]}).status_code == 304
+
+if __name__ == "__main__":
+    print("🧪 Testing file download responses...")
+    test_media_types_and_etag_matching()
+    print("   ✅ MIME types and ETag matching")
+    test_byte_range_parsing()
+    print("   ✅ Range headers parsed and clamped")
+    test_conditional_and_range_requests()
+    print("   ✅ 304 for repeat views, 206 for byte ranges")
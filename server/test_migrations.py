@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test the versioned schema migrations.
+
+Covers a fresh database, a database created before versioning existed, and
+a failing migration, each on a throwaway file so thesis_ai.db is untouched.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import uuid
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Importing the database package opens the configured database; keep the checked-in one untouched
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="thesis_ai_test_"), "thesis_ai.db")
+
+from database.database import DatabaseManager, FeedbackRepository
+from database.migrations import MIGRATIONS, Migration, MigrationError, MigrationRunner
+
+def create_legacy_database(db_path: str):
+    """Create a database the way _init_database did before migrations, with a supervisor assignment in the JSON column"""
+    conn = sqlite3.connect(db_path)
+    MIGRATIONS[0].upgrade(conn, 100)
+    conn.execute(
+        "INSERT INTO users (id, username, email, full_name, hashed_password, role) VALUES ('st', 'student1', 's@x.com', 'Student', 'x', 'student')"
+    )
+    conn.execute(
+        "INSERT INTO users (id, username, email, full_name, hashed_password, role, assigned_students) VALUES ('sup', 'sup1', 'v@x.com', 'Supervisor', 'x', 'supervisor', '[\"student1\"]')"
+    )
+    conn.execute("INSERT INTO theses (id, student_id, filename, filepath) VALUES ('th', 'st', 'a.pdf', 'a.pdf')")
+    conn.executemany(
+        "INSERT INTO feedback (id, thesis_id, reviewer_id, content, is_ai_feedback) VALUES (?, 'th', 'sup', ?, 0)",
+        [(str(uuid.uuid4()), f"feedback about sample size {i}") for i in range(250)]
+    )
+    conn.commit()
+    conn.close()
+
+def test_fresh_database_reaches_latest_version():
+    """A new database is created at the latest schema version on first use, not when the manager is created"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "test.db"))
+        assert not os.path.exists(os.path.join(tmp, "test.db"))
+        with db.get_connection() as conn:
+            runner = MigrationRunner(conn)
+            assert runner.current_version() == runner.latest_version
+            assert runner.pending() == []
+        db.close()
+
+def test_legacy_database_is_upgraded():
+    """An unversioned database keeps its data and gets the new tables, indexes and backfills"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "legacy.db")
+        create_legacy_database(db_path)
+        db = DatabaseManager(db_path, migration_batch_size=100)
+        with db.get_connection() as conn:
+            assert MigrationRunner(conn).current_version() == MIGRATIONS[-1].version
+            assignments = conn.execute("SELECT supervisor_id, student_id FROM supervisor_assignments").fetchall()
+            assert [tuple(row) for row in assignments] == [('sup', 'st')]
+            assert conn.execute("SELECT count(*) FROM feedback_fts WHERE feedback_fts MATCH 'sample'").fetchone()[0] == 250
+            assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_theses_upload_date'").fetchone()
+        db.close()
+
+        # Starting again applies nothing and does not duplicate backfilled rows
+        db = DatabaseManager(db_path)
+        assert db.schema_version() == MIGRATIONS[-1].version
+        assert FeedbackRepository(db).has_feedback_by_reviewer('sup')
+        with db.get_connection() as conn:
+            assert conn.execute("SELECT count(*) FROM feedback_fts").fetchone()[0] == 250
+            # Backfilled rows are mapped to their feedback, so edits replace them
+            assert conn.execute("SELECT count(*) FROM fts_rowids WHERE fts_table = 'feedback_fts'").fetchone()[0] == 250
+            feedback_id = conn.execute("SELECT id FROM feedback LIMIT 1").fetchone()[0]
+        FeedbackRepository(db).update_feedback_content(feedback_id, "Revised text")
+        with db.get_connection() as conn:
+            assert conn.execute("SELECT count(*) FROM feedback_fts").fetchone()[0] == 250
+            assert conn.execute("SELECT count(*) FROM feedback_fts WHERE feedback_fts MATCH 'revised'").fetchone()[0] == 1
+        db.close()
+
+def test_failed_migration_rolls_back():
+    """A failing migration leaves neither its changes nor its version behind"""
+    def broken(conn, batch_size):
+        conn.execute("CREATE TABLE half_done (id INTEGER)")
+        raise RuntimeError("boom")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "test.db"))
+        runner = MigrationRunner(conn, MIGRATIONS + [Migration(len(MIGRATIONS) + 1, "broken", broken)])
+        try:
+            runner.migrate()
+            assert False, "migration should have failed"
+        except MigrationError:
+            pass
+        assert runner.current_version() == len(MIGRATIONS)
+        assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'half_done'").fetchone() is None
+        conn.close()
+
+if __name__ == "__main__":
+    print("🧪 Testing schema migrations...")
+    test_fresh_database_reaches_latest_version()
+    print("   ✅ Fresh database migrated to the latest version on first use")
+    test_legacy_database_is_upgraded()
+    print("   ✅ Unversioned database upgraded with data intact")
+    test_failed_migration_rolls_back()
+    print("   ✅ Failed migration rolled back")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test the preview image cache: pages are rendered once per content, width
+and page, and are removed with their blob.
+"""
+
+import hashlib
+import io
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import fitz
+from PIL import Image
+
+from file_processing.blob_store import BlobStore
+from file_processing.image_converter import convert_document_to_images, render_preview_page
+from file_processing.preview_cache import PreviewCache
+from file_processing.storage import LocalStorage
+
+def make_pdf(pages: int) -> bytes:
+    document = fitz.open()
+    for number in range(pages):
+        document.new_page().insert_text((72, 72), f"Page {number + 1}")
+    data = document.tobytes()
+    document.close()
+    return data
+
+def store_file(store: BlobStore, data: bytes, ext: str) -> str:
+    location = store.new_location(hashlib.sha256(data).hexdigest(), ext)
+    store.storage.write_bytes(location, data)
+    return location
+
+def test_pages_are_rendered_once():
+    """A page is rendered on first request and then read from the cache"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BlobStore(LocalStorage(tmp))
+        cache = PreviewCache(store, image_format='webp', quality=70)
+        location = store_file(store, make_pdf(3), ".pdf")
+
+        assert cache.page_count(location) == 3
+        image = Image.open(io.BytesIO(cache.get_page(location, 2, 400)))
+        assert (image.format, image.width) == ('WEBP', 400)
+        assert cache.etag(location, 2, 400) == f'"{store.content_hash_of(location)}-2-400-q70.webp"'
+
+        # Served from the cache from now on, per width
+        with open(store.derived_location(location, "previews/2-400-q70.webp"), "wb") as f:
+            f.write(b"cached")
+        assert cache.get_page(location, 2, 400) == b"cached"
+        assert Image.open(io.BytesIO(cache.get_page(location, 2, 300))).width == 300
+
+        for page in (0, 4):
+            try:
+                cache.get_page(location, page, 400)
+                assert False, "expected IndexError"
+            except IndexError:
+                pass
+
+def test_pages_render_straight_at_the_target_width():
+    """Every format comes out at the requested width, never above 2x the page"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "thesis.pdf")
+        with open(path, "wb") as f:
+            f.write(make_pdf(1))
+        for image_format, pil_format in (('png', 'PNG'), ('jpeg', 'JPEG'), ('webp', 'WEBP')):
+            for width, expected in ((800, 800), (5000, 1190)):  # A4 is 595pt wide
+                image = Image.open(io.BytesIO(render_preview_page(path, 1, width, image_format=image_format)))
+                assert (image.format, image.width) == (pil_format, expected)
+
+def test_pages_render_in_parallel():
+    """Missing pages are rendered on the worker processes and cached like single pages"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BlobStore(LocalStorage(tmp))
+        location = store_file(store, make_pdf(7), ".pdf")
+        serial = PreviewCache(store, image_format='png')
+        expected = {page: serial.get_page(location, page, 160) for page in (1, 2)}
+
+        cache = PreviewCache(store, image_format='png', workers=2)
+        try:
+            images = cache.get_pages(location, list(range(1, 8)), 160)
+            assert sorted(images) == list(range(1, 8))
+            assert all(images[page] == expected[page] for page in expected)
+            assert all(Image.open(io.BytesIO(image)).width == 160 for image in images.values())
+            assert os.path.exists(store.derived_location(location, "previews/7-160.png"))
+            try:
+                cache.get_pages(location, [6, 7, 8], 160)
+                assert False, "expected IndexError"
+            except IndexError:
+                pass
+        finally:
+            if cache._pool:
+                cache._pool.shutdown()
+
+def test_files_outside_the_store_are_not_cached():
+    """Files without a content hash are rendered every time"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BlobStore(LocalStorage(os.path.join(tmp, "uploads")))
+        cache = PreviewCache(store)
+        path = os.path.join(tmp, "legacy.pdf")
+        with open(path, "wb") as f:
+            f.write(make_pdf(1))
+        assert cache.etag(path, 1, 800) is None
+        assert Image.open(io.BytesIO(cache.get_page(path, 1, 800))).width == 800
+        assert not os.path.exists(os.path.join(tmp, "uploads"))
+
+        # The base64 preview still works for existing callers
+        images = convert_document_to_images(path)
+        assert [image['page'] for image in images] == [1]
+        assert images[0]['image'].startswith("data:image/png;base64,")
+
+        path = os.path.join(tmp, "long.pdf")
+        with open(path, "wb") as f:
+            f.write(make_pdf(12))
+        images = convert_document_to_images(path, first_page=9, last_page=20, max_width=200)
+        assert [image['page'] for image in images] == [9, 10, 11, 12]
+        assert all(image['width'] == 200 for image in images)
+
+if __name__ == "__main__":
+    print("🧪 Testing preview cache...")
+    test_pages_are_rendered_once()
+    print("   ✅ Pages rendered once per width and cached with the blob")
+    test_pages_render_straight_at_the_target_width()
+    print("   ✅ PNG, JPEG and WebP rendered at the target width")
+    test_pages_render_in_parallel()
+    print("   ✅ Pages rendered in parallel on worker processes")
+    test_files_outside_the_store_are_not_cached()
+    print("   ✅ Files outside the store rendered without caching")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test the file storage backends: the same operations on the local filesystem
+and, when TEST_S3_ENDPOINT_URL is set, on an S3-compatible service such as
+MinIO (TEST_S3_BUCKET, default thesis-ai-test, is created if missing).
+"""
+
+import os
+import sys
+import tempfile
+import urllib.request
+import uuid
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from file_processing.storage import LocalStorage, S3Storage
+
+CONTENT = os.urandom(300 * 1024 + 7)
+
+def check_backend(storage, tmp: str):
+    """Write, read, cache and delete files through a backend"""
+    location = storage.location(f"blobs/ab/{uuid.uuid4().hex}.pdf")
+    assert not storage.exists(location)
+    try:
+        storage.read_bytes(location)
+        assert False, "expected FileNotFoundError"
+    except FileNotFoundError:
+        pass
+
+    local_file = os.path.join(tmp, "upload.part")
+    with open(local_file, "wb") as f:
+        f.write(CONTENT)
+    storage.save_file(local_file, location)
+    assert not os.path.exists(local_file)
+    assert storage.exists(location)
+    assert storage.read_bytes(location) == CONTENT
+    assert b"".join(storage.iter_bytes(location, chunk_size=64 * 1024)) == CONTENT
+
+    path = storage.local_path(location)
+    assert path.endswith(".pdf")
+    with open(path, "rb") as f:
+        assert f.read() == CONTENT
+
+    derived = f"derived/{uuid.uuid4().hex}"
+    storage.write_bytes(storage.location(f"{derived}/text.txt"), b"text")
+    assert storage.read_bytes(storage.location(f"{derived}/text.txt")) == b"text"
+    storage.delete_prefix(storage.location(derived))
+    assert not storage.exists(storage.location(f"{derived}/text.txt"))
+
+    storage.delete(location)
+    assert not storage.exists(location)
+    storage.delete(location)
+    return location
+
+def test_local_storage():
+    """Locations are paths under the root and downloads go through the API"""
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = LocalStorage(os.path.join(tmp, "uploads"))
+        location = check_backend(storage, tmp)
+        assert location.startswith(os.path.join(tmp, "uploads", "blobs", "ab"))
+        assert storage.presigned_url(location, "thesis.pdf") is None
+
+def test_s3_storage():
+    """Objects round-trip through the bucket and presigned URLs serve them"""
+    endpoint_url = os.getenv('TEST_S3_ENDPOINT_URL')
+    if not endpoint_url:
+        print("   ⏭️  TEST_S3_ENDPOINT_URL not set, skipping S3")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = S3Storage(os.getenv('TEST_S3_BUCKET', 'thesis-ai-test'), prefix="test/",
+                            endpoint_url=endpoint_url, region=os.getenv('TEST_S3_REGION', 'us-east-1'),
+                            access_key_id=os.getenv('TEST_S3_ACCESS_KEY_ID', 'minioadmin'),
+                            secret_access_key=os.getenv('TEST_S3_SECRET_ACCESS_KEY', 'minioadmin'),
+                            cache_dir=os.path.join(tmp, "cache"), cache_max_bytes=len(CONTENT) * 2)
+        try:
+            storage.client.head_bucket(Bucket=storage.bucket)
+        except Exception:
+            storage.client.create_bucket(Bucket=storage.bucket)
+
+        location = storage.location(f"blobs/ab/{uuid.uuid4().hex}.pdf")
+        local_file = os.path.join(tmp, "upload.part")
+        with open(local_file, "wb") as f:
+            f.write(CONTENT)
+        storage.save_file(local_file, location)
+        url = storage.presigned_url(location, "thesis.pdf", inline=True)
+        with urllib.request.urlopen(url) as response:
+            assert response.read() == CONTENT
+            assert response.headers["Content-Disposition"] == 'inline; filename="thesis.pdf"'
+            assert response.headers["Content-Type"] == "application/pdf"
+
+        # The cache keeps the most recently used files within its limit
+        cached = [storage.local_path(location)]
+        for _ in range(2):
+            other = storage.location(f"blobs/cd/{uuid.uuid4().hex}.pdf")
+            storage.write_bytes(other, CONTENT)
+            cached.append(storage.local_path(other))
+        assert [os.path.exists(path) for path in cached] == [False, True, True]
+        storage.delete(location)
+
+        check_backend(storage, tmp)
+
+if __name__ == "__main__":
+    print("🧪 Testing storage backends...")
+    test_local_storage()
+    print("   ✅ Local filesystem storage")
+    test_s3_storage()
+    print("   ✅ S3-compatible storage")
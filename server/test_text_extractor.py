@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test page-by-page text extraction: pages come with their numbers, pages
+without text do not break extraction, a character budget stops it early,
+and the PDF engines agree, with tables going to pdfplumber.
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import fitz
+
+from config.config import config
+from file_processing import text_extractor
+from file_processing.blob_store import BlobStore
+from file_processing.storage import LocalStorage
+from file_processing.text_extractor import (
+    extract_text_from_file, iter_pdf_pages, iter_text_pages, page_has_ruled_table
+)
+
+TABLE = [("Name", "Score", "Grade"), ("Aino", "87", "4"), ("Mikko", "72", "3"), ("Liisa", "95", "5")]
+
+def write_pdf(path: str, pages: int, blank: tuple = ()):
+    document = fitz.open()
+    for number in range(1, pages + 1):
+        page = document.new_page()
+        if number not in blank:
+            page.insert_text((72, 72), f"Text of page {number}")
+    document.save(path)
+    document.close()
+
+def write_table_pdf(path: str):
+    """A paragraph and a ruled table: a row of cells per line of the grid"""
+    document = fitz.open()
+    page = document.new_page()
+    page.insert_text((72, 72), "Table 1 shows the results of the survey.")
+    left, top, cell_width, cell_height = 72, 100, 120, 24
+    for row_number, row in enumerate(TABLE):
+        for column_number, cell in enumerate(row):
+            rect = fitz.Rect(left + column_number * cell_width, top + row_number * cell_height,
+                             left + (column_number + 1) * cell_width, top + (row_number + 1) * cell_height)
+            page.draw_rect(rect, color=(0, 0, 0))
+            page.insert_text((rect.x0 + 4, rect.y1 - 8), cell)
+    document.save(path)
+    document.close()
+
+class CountExtractedPages:
+    """Count the pages the configured PDF engine extracts"""
+
+    def __enter__(self):
+        self.count = 0
+        self.engine = config.PDF_TEXT_ENGINE
+        self.original = text_extractor.PDF_TEXT_ENGINES[self.engine]
+
+        def counting_engine(file_path):
+            for page in self.original(file_path):
+                self.count += 1
+                yield page
+        text_extractor.PDF_TEXT_ENGINES[self.engine] = counting_engine
+        return self
+
+    def __exit__(self, *exc):
+        text_extractor.PDF_TEXT_ENGINES[self.engine] = self.original
+
+def test_pages_are_yielded_with_numbers():
+    """Every page is yielded in order, blank ones as empty text"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "thesis.pdf")
+        write_pdf(path, 4, blank=(2,))
+        pages = list(iter_text_pages(path))
+        assert [number for number, _ in pages] == [1, 2, 3, 4]
+        assert pages[1][1] == "" and pages[3][1] == "Text of page 4"
+        assert extract_text_from_file(path) == "Text of page 1\n\nText of page 3\nText of page 4"
+
+        text_path = os.path.join(tmp, "notes.txt")
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.write("Plain notes")
+        assert list(iter_text_pages(text_path)) == [(1, "Plain notes")]
+
+def test_extraction_stops_at_the_budget():
+    """Only the pages needed for max_chars are extracted"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "thesis.pdf")
+        write_pdf(path, 50)
+        with CountExtractedPages() as counter:
+            text = extract_text_from_file(path, max_chars=40)
+        assert text == "Text of page 1\nText of page 2\nText of pa"
+        assert counter.count == 3
+
+def test_blob_store_budget():
+    """A budget reads the cached text when there is one and caches nothing otherwise"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BlobStore(LocalStorage(tmp))
+        path = os.path.join(tmp, "thesis.pdf")
+        write_pdf(path, 20)
+        with open(path, "rb") as f:
+            data = f.read()
+        location = store.new_location(hashlib.sha256(data).hexdigest(), ".pdf")
+        store.storage.write_bytes(location, data)
+        cache_location = store.derived_location(location, "text.txt")
+
+        assert store.extract_text(location, max_chars=14) == "Text of page 1"
+        assert not os.path.exists(cache_location)
+        assert [number for number, _ in store.iter_text_pages(location)] == list(range(1, 21))
+
+        full_text = store.extract_text(location)
+        assert os.path.exists(cache_location)
+        with CountExtractedPages() as counter:
+            assert store.extract_text(location, max_chars=30) == full_text[:30]
+        assert counter.count == 0
+
+def test_engines_agree_on_prose():
+    """PyMuPDF and pdfplumber give the same words for running text"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "thesis.pdf")
+        document = fitz.open()
+        paragraph = "The results indicate that the proposed method improves the accuracy. " * 12
+        for _ in range(3):
+            document.new_page().insert_textbox(fitz.Rect(72, 72, 523, 770), paragraph, fontsize=11)
+        document.save(path)
+        document.close()
+
+        words = {engine: [text.split() for _, text in iter_pdf_pages(path, engine)]
+                 for engine in text_extractor.PDF_TEXT_ENGINES}
+        assert words['pymupdf'] == words['pdfplumber'] == words['auto']
+        assert words['auto'][0][:3] == ["The", "results", "indicate"]
+        try:
+            list(iter_pdf_pages(path, "ocr"))
+            assert False, "expected RuntimeError"
+        except RuntimeError:
+            pass
+
+def test_tables_fall_back_to_pdfplumber():
+    """Only pages with ruled tables go to pdfplumber, which keeps table rows on one line"""
+    with tempfile.TemporaryDirectory() as tmp:
+        table_path, prose_path = os.path.join(tmp, "table.pdf"), os.path.join(tmp, "prose.pdf")
+        write_table_pdf(table_path)
+        write_pdf(prose_path, 1)
+        with fitz.open(table_path) as table_pdf, fitz.open(prose_path) as prose_pdf:
+            assert page_has_ruled_table(table_pdf[0]) and not page_has_ruled_table(prose_pdf[0])
+
+        rows = [" ".join(row) for row in TABLE]
+        auto_lines = list(iter_pdf_pages(table_path, "auto"))[0][1].splitlines()
+        assert all(row in auto_lines for row in rows)
+        pymupdf_lines = list(iter_pdf_pages(table_path, "pymupdf"))[0][1].splitlines()
+        assert not any(row in pymupdf_lines for row in rows)
+        assert list(iter_pdf_pages(prose_path, "auto")) == [(1, "Text of page 1")]
+
+if __name__ == "__main__":
+    print("🧪 Testing text extraction...")
+    test_pages_are_yielded_with_numbers()
+    print("   ✅ Pages yielded with numbers, blank pages as empty text")
+    test_extraction_stops_at_the_budget()
+    print("   ✅ Extraction stops once the character budget is reached")
+    test_blob_store_budget()
+    print("   ✅ Budgeted extraction uses the cache without filling it")
+    test_engines_agree_on_prose()
+    print("   ✅ PyMuPDF and pdfplumber agree on running text")
+    test_tables_fall_back_to_pdfplumber()
+    print("   ✅ Pages with ruled tables extracted with pdfplumber")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test streamed thesis uploads: chunked saving, hashing, size limits and
+content-addressed deduplication.
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Importing the database package opens the configured database; keep the checked-in one untouched
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="thesis_ai_test_"), "thesis_ai.db")
+
+from fastapi import FastAPI, File, Request, UploadFile
+from fastapi.testclient import TestClient
+from starlette.datastructures import UploadFile as StarletteUploadFile
+
+from api.middleware import UploadSizeLimitMiddleware
+from database.async_database import AsyncRepository
+from database.database import DatabaseManager, ThesisRepository, UserRepository
+from file_processing.blob_store import BlobStore
+from file_processing.storage import LocalStorage
+from file_processing.upload_storage import receive_upload, UploadTooLargeError
+
+CONTENT = os.urandom(300 * 1024 + 7)
+
+def make_upload(data: bytes, size=None) -> StarletteUploadFile:
+    return StarletteUploadFile(io.BytesIO(data), size=size, filename="thesis.pdf")
+
+def test_receive_upload_streams_and_hashes():
+    """The file is written in chunks to a temporary file and hashed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        received = asyncio.run(receive_upload(make_upload(CONTENT), tmp, max_bytes=len(CONTENT),
+                                              chunk_size=64 * 1024))
+        assert received["size"] == len(CONTENT)
+        assert received["sha256"] == hashlib.sha256(CONTENT).hexdigest()
+        with open(received["temp_path"], "rb") as f:
+            assert f.read() == CONTENT
+        assert os.listdir(tmp) == [os.path.basename(received["temp_path"])]
+
+def test_receive_upload_enforces_limit():
+    """Oversized uploads fail up front or mid-stream and leave nothing behind"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for upload in (make_upload(CONTENT, size=len(CONTENT)), make_upload(CONTENT)):
+            try:
+                asyncio.run(receive_upload(upload, tmp, max_bytes=len(CONTENT) - 1, chunk_size=64 * 1024))
+                assert False, "expected UploadTooLargeError"
+            except UploadTooLargeError:
+                pass
+            assert os.listdir(tmp) == []
+
+def test_identical_uploads_share_a_blob():
+    """Same content is stored and extracted once, and pruned when no thesis is left"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "test.db"))
+        users, theses = UserRepository(db), ThesisRepository(db)
+        student = users.create_user({'username': 'st', 'email': 'st@x.com', 'full_name': 'St',
+                                     'hashed_password': 'x', 'role': 'student'})
+        store = BlobStore(LocalStorage(os.path.join(tmp, "uploads")))
+        blobs_dir = os.path.join(tmp, "uploads", "blobs")
+        text = b"Chapter one: methodology"
+
+        async def upload():
+            received = await store.receive(make_upload(text), max_bytes=0, chunk_size=8)
+            return await store.store(AsyncRepository(theses), {'student_id': student['id'], 'filename': 'a.TXT',
+                                                               'content_hash': received['sha256'],
+                                                               'size': received['size']}, received['temp_path'])
+
+        first, second = asyncio.run(upload()), asyncio.run(upload())
+        assert first['filepath'] == second['filepath'] and first['filepath'].endswith('.txt')
+        assert store.content_hash_of(first['filepath']) == hashlib.sha256(text).hexdigest()
+        assert theses.get_blob(first['content_hash'])['ref_count'] == 2
+        blob_files = [name for _, _, names in os.walk(blobs_dir) for name in names]
+        assert blob_files == [os.path.basename(first['filepath'])]
+
+        assert store.extract_text(first['filepath']) == text.decode()
+        # Served from the cache from now on
+        with open(store.derived_location(first['filepath'], "text.txt"), "w") as f:
+            f.write("cached")
+        assert store.extract_text(second['filepath']) == "cached"
+
+        theses.delete_thesis(first['id'])
+        assert store.prune(theses) == 0 and os.path.exists(second['filepath'])
+        theses.delete_thesis(second['id'])
+
+        # An upload arriving before the prune stores a file of its own
+        third = asyncio.run(upload())
+        assert third['filepath'] != second['filepath']
+        assert store.prune(theses) == 0
+        assert not os.path.exists(second['filepath']) and os.path.exists(third['filepath'])
+
+        theses.delete_thesis(third['id'])
+        assert store.prune(theses) == 1
+        assert not os.path.exists(third['filepath'])
+        assert not os.path.exists(store.derived_location(third['filepath'], "text.txt"))
+        assert theses.get_blob(first['content_hash']) is None
+        assert [name for _, _, names in os.walk(blobs_dir) for name in names] == []
+        db.close()
+
+def test_middleware_rejects_large_bodies():
+    """Bodies over the limit get 413 whether or not they declare a length"""
+    app = FastAPI()
+    received = []
+
+    @app.post("/thesis/upload")
+    async def upload(file: UploadFile = File(...)):
+        received.append(file.filename)
+        return {"ok": True}
+
+    @app.put("/thesis/uploads/{upload_id}")
+    async def upload_chunk(upload_id: str, request: Request):
+        return {"received": len(await request.body())}
+
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=100 * 1024, paths=["/thesis/upload"])
+    client = TestClient(app)
+
+    assert client.post("/thesis/upload", files={"file": ("small.pdf", b"x" * 1024)}).status_code == 200
+    response = client.post("/thesis/upload", files={"file": ("big.pdf", CONTENT)})
+    assert response.status_code == 413
+
+    def chunks():
+        yield b"x" * (64 * 1024)
+        yield b"x" * (64 * 1024)
+
+    response = client.post("/thesis/upload", content=chunks(),
+                           headers={"content-type": "multipart/form-data; boundary=b"})
+    assert response.status_code == 413
+    assert received == ["small.pdf"]
+    # Resumable upload chunks are not limited by the single-request upload path
+    assert client.put("/thesis/uploads/abc", content=CONTENT).json() == {"received": len(CONTENT)}
+
+if __name__ == "__main__":
+    print("🧪 Testing upload storage...")
+    test_receive_upload_streams_and_hashes()
+    print("   ✅ Chunked save with SHA-256")
+    test_receive_upload_enforces_limit()
+    print("   ✅ Size limit enforced without leftovers")
+    test_identical_uploads_share_a_blob()
+    print("   ✅ Identical uploads share one blob, extracted once and pruned when unused")
+    test_middleware_rejects_large_bodies()
+    print("   ✅ Oversized request bodies rejected with 413")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test the authenticated-user cache and its invalidation by UserRepository.
+
+Runs on a throwaway database so thesis_ai.db is untouched.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Importing the database package opens the configured database; keep the checked-in one untouched
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="thesis_ai_test_"), "thesis_ai.db")
+
+from database.database import DatabaseManager, UserRepository
+from database.user_cache import UserCache
+
+def test_expiry_and_eviction():
+    """Entries expire after the TTL and the least recently used one is evicted first"""
+    cache = UserCache(max_size=2, ttl=0.2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None  # evicted, 'a' was used more recently
+    time.sleep(0.25)
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 2 and stats['evictions'] == 1 and stats['expired'] == 1
+    assert stats['hit_rate'] == round(1 / 3, 4)
+
+def test_stale_load_is_not_cached():
+    """A value loaded before an invalidation is not stored afterwards"""
+    cache = UserCache()
+    generation = cache.generation
+    cache.invalidate('a')
+    cache.set('a', 'stale', generation)
+    assert cache.get('a') is None
+    assert UserCache(ttl=0).get('a') is None
+
+def test_repository_writes_invalidate():
+    """User and assignment writes drop the cached users they affect"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "test.db"))
+        cache = UserCache()
+        users = UserRepository(db, cache=cache)
+        sup = users.create_user({'username': 'sup', 'email': 'sup@x.com', 'full_name': 'Sup',
+                                 'hashed_password': 'x', 'role': 'supervisor'})
+        users.create_user({'username': 'st', 'email': 'st@x.com', 'full_name': 'St',
+                           'hashed_password': 'x', 'role': 'student'})
+
+        def cache_both():
+            for username in ('sup', 'st'):
+                cache.set(username, users.get_user_by_username(username))
+
+        cache_both()
+        users.update_user('st', {'full_name': 'Student'})
+        assert cache.get('st') is None and cache.get('sup') is not None
+
+        for write in (lambda: users.assign_supervisor('st', 'sup'),
+                      lambda: users.remove_assigned_student(sup['id'], 'st'),
+                      lambda: users.add_assigned_student(sup['id'], 'st'),
+                      lambda: users.delete_user('st')):
+            cache_both()
+            write()
+            # The supervisor's assigned_students changed too
+            assert cache.get('sup') is None and cache.get('st') is None
+        db.close()
+
+if __name__ == "__main__":
+    print("🧪 Testing user cache...")
+    test_expiry_and_eviction()
+    print("   ✅ TTL expiry and LRU eviction")
+    test_stale_load_is_not_cached()
+    print("   ✅ Loads racing a write are not cached")
+    test_repository_writes_invalidate()
+    print("   ✅ Repository writes invalidate cached users")